@@ -7,13 +7,21 @@
 //
 // For local dev:
 //   ADMIN_TOKEN=xxx API_URL=http://localhost:8787 node api/scripts/import-entries.js
+//
+// Only what changed since the last import (after python scripts/entry_changes.py):
+//   ADMIN_TOKEN=xxx API_URL=http://... node api/scripts/import-entries.js --changeset
+// posts the added and changed entries from data/entries_changeset.json, removes the
+// removed ids, then records the changeset's hashes in data/entries_imported.json.
 
-import { readFileSync } from "fs";
+import { readFileSync, writeFileSync, renameSync } from "fs";
 import { resolve, dirname } from "path";
 import { fileURLToPath } from "url";
 
 const __dirname = dirname(fileURLToPath(import.meta.url));
 const ENTRIES_PATH = resolve(__dirname, "../../site/data/entries.json");
+const CHANGESET_PATH = resolve(__dirname, "../../data/entries_changeset.json");
+const IMPORTED_PATH = resolve(__dirname, "../../data/entries_imported.json");
+const USE_CHANGESET = process.argv.includes("--changeset");
 
 const API_URL = process.env.API_URL;
 const ADMIN_TOKEN = process.env.ADMIN_TOKEN;
@@ -23,8 +31,17 @@ if (!API_URL || !ADMIN_TOKEN) {
   process.exit(1);
 }
 
-const entries = JSON.parse(readFileSync(ENTRIES_PATH, "utf-8"));
-console.log(`Loaded ${entries.length} entries from ${ENTRIES_PATH}`);
+let entries;
+let changeset = null;
+if (USE_CHANGESET) {
+  changeset = JSON.parse(readFileSync(CHANGESET_PATH, "utf-8"));
+  entries = [...changeset.added, ...changeset.changed];
+  const { added, changed, removed, unchanged } = changeset.counts;
+  console.log(`Changeset ${CHANGESET_PATH}: ${added} added, ${changed} changed, ${removed} removed, ${unchanged} unchanged`);
+} else {
+  entries = JSON.parse(readFileSync(ENTRIES_PATH, "utf-8"));
+  console.log(`Loaded ${entries.length} entries from ${ENTRIES_PATH}`);
+}
 
 // Import in batches to avoid request size limits
 const BATCH_SIZE = 50;
@@ -57,4 +74,33 @@ for (let i = START_AT; i < entries.length; i += BATCH_SIZE) {
   await sleep(500);
 }
 
-console.log(`Done! Total: ${totalImported} imported, ${totalUpdated} updated`);
+let totalRemoved = 0;
+if (changeset) {
+  const removed = changeset.removed;
+  for (let i = 0; i < removed.length; i += BATCH_SIZE) {
+    const batch = removed.slice(i, i + BATCH_SIZE);
+    const res = await fetch(`${API_URL}/api/entries/remove`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        Authorization: `Bearer ${ADMIN_TOKEN}`,
+      },
+      body: JSON.stringify(batch),
+    });
+
+    if (!res.ok) {
+      console.error(`Remove batch ${i}-${i + batch.length} failed:`, res.status, await res.text());
+      process.exit(1);
+    }
+
+    totalRemoved += (await res.json()).removed;
+    await sleep(500);
+  }
+
+  // Everything went through: the changeset's hashes are what D1 now holds
+  writeFileSync(`${IMPORTED_PATH}.tmp`, JSON.stringify(changeset.hashes));
+  renameSync(`${IMPORTED_PATH}.tmp`, IMPORTED_PATH);
+  console.log(`Recorded ${Object.keys(changeset.hashes).length} imported hashes in ${IMPORTED_PATH}`);
+}
+
+console.log(`Done! Total: ${totalImported} imported, ${totalUpdated} updated, ${totalRemoved} removed`);
@@ -1,5 +1,5 @@
 import { Hono } from "hono";
-import { eq } from "drizzle-orm";
+import { eq, inArray } from "drizzle-orm";
 import { schema } from "../db";
 import { requireAdmin } from "../middleware/auth";
 import type { Env } from "../types";
@@ -65,4 +65,24 @@ entries.post("/import", requireAdmin, async (c) => {
   return c.json({ imported, updated });
 });
 
+// POST /api/entries/remove — admin, delete entries by id (JSON array of ids)
+entries.post("/remove", requireAdmin, async (c) => {
+  const db = c.get("db");
+  const body = await c.req.json();
+
+  if (!Array.isArray(body) || !body.every((id) => Number.isInteger(id))) {
+    return c.json({ error: "Expected JSON array of entry ids" }, 400);
+  }
+  if (body.length === 0) {
+    return c.json({ removed: 0 });
+  }
+
+  const removed = await db
+    .delete(schema.entries)
+    .where(inArray(schema.entries.id, body))
+    .returning({ id: schema.entries.id });
+
+  return c.json({ removed: removed.length });
+});
+
 export { entries };
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Headword autocomplete index: a sorted key array with precomputed top-k.
+
+Type-ahead would otherwise fold and prefix-test every headword on each
+keystroke. build_site_data.py and import_vocabulary.py now also write
+site/data/autocomplete.json:
+
+    {"version": 1, "k": 10, "scan_limit": 256,
+     "keys": ["a", "abaka", ...],      # sorted, one row per (key, entry)
+     "ids": [12, 40, ...],             # the entry each key completes to
+     "scores": [9, 4, ...],            # precomputed rank score per row
+     "top": {"b": [812, 95, ...], "ba": [...], ...}}   # best rows per prefix
+
+Keys are headwords and variant forms, each "/" alternative on its own,
+accent-folded like the search index (search_index.fold), without leading
+dashes. A row scores its entry's weight (2 per English definition, 1 per
+Spanish definition and example, 3 for course vocabulary) plus
+HEADWORD_BONUS when the key is the headword rather than a variant.
+
+The keys starting with a prefix are one range of the array (two binary
+searches). Ranges of up to scan_limit rows are ranked when queried; for
+every prefix with a longer range, the k best rows are stored in "top", so
+no query looks at more than scan_limit rows. Completions are ordered by
+score, then shorter key, then key, and list each entry once.
+
+Usage:
+    python scripts/autocomplete_index.py                # rebuild from site/data/entries.json
+    python scripts/autocomplete_index.py --query "ni"   # build and complete a prefix
+    python scripts/bench_autocomplete.py                # latency at 5k and 1M keys
+"""
+
+import argparse
+from bisect import bisect_left
+
+from headword_index import alternatives
+from json_io import dump_json, iter_records
+from paths import SITE_DATA_DIR
+from search_index import fold
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+INDEX_PATH = SITE_DATA_DIR / "autocomplete.json"
+
+K = 10
+SCAN_LIMIT = 256
+HEADWORD_BONUS = 5
+
+
+def complete_key(text):
+    """Folded, single-spaced form without leading dashes ("-Quí" -> "qui")."""
+    return " ".join(fold(text).split()).lstrip("-— ")
+
+
+def entry_score(entry):
+    """Weight of an entry as a completion: how much there is to show for it."""
+    return (2 * len(entry.get("definitions_english") or ())
+            + len(entry.get("definitions_spanish") or ())
+            + len(entry.get("examples") or ())
+            + (3 if entry.get("source") else 0))
+
+
+def best_rows(keys, ids, scores, lo, hi, k):
+    """The k best rows in keys[lo:hi], one per entry: score, then shorter key, then key."""
+    ranked = sorted(range(lo, hi), key=lambda r: (-scores[r], len(keys[r]), keys[r]))
+    rows, seen = [], set()
+    for row in ranked:
+        if ids[row] not in seen:
+            seen.add(ids[row])
+            rows.append(row)
+            if len(rows) == k:
+                break
+    return rows
+
+
+def prefix_range(keys, prefix, lo=0):
+    """(lo, hi): the keys starting with prefix are keys[lo:hi]."""
+    lo = bisect_left(keys, prefix, lo)
+    return lo, bisect_left(keys, prefix + "\uffff", lo)
+
+
+class AutocompleteBuilder:
+    """Collects (key, entry, score) rows; encode() produces the JSON form."""
+
+    def __init__(self):
+        self.rows = {}  # (key, entry id) -> score
+
+    def add_key(self, key, entry_id, score):
+        if key:
+            row = (key, entry_id)
+            self.rows[row] = max(score, self.rows.get(row, score))
+
+    def add(self, entry):
+        score = entry_score(entry)
+        for alt in alternatives(entry.get("headword") or ""):
+            self.add_key(complete_key(alt), entry["id"], score + HEADWORD_BONUS)
+        for variant in entry.get("variant_forms") or ():
+            for alt in alternatives(variant):
+                self.add_key(complete_key(alt), entry["id"], score)
+
+    def encode(self, k=K, scan_limit=SCAN_LIMIT):
+        rows = sorted(self.rows.items())
+        keys = [key for (key, _), _ in rows]
+        ids = [entry_id for (_, entry_id), _ in rows]
+        scores = [score for _, score in rows]
+
+        # Walk down from the empty prefix while ranges stay longer than scan_limit
+        top = {}
+        pending = [""]
+        while pending:
+            children = []
+            for prefix in pending:
+                lo, hi = prefix_range(keys, prefix)
+                if hi - lo <= scan_limit:
+                    continue
+                if prefix:
+                    top[prefix] = best_rows(keys, ids, scores, lo, hi, k)
+                depth = len(prefix) + 1
+                i = lo
+                while i < hi:
+                    if len(keys[i]) < depth:
+                        i += 1
+                        continue
+                    child = keys[i][:depth]
+                    children.append(child)
+                    i = prefix_range(keys, child, i)[1]
+            pending = children
+        return {"version": 1, "k": k, "scan_limit": scan_limit,
+                "keys": keys, "ids": ids, "scores": scores, "top": top}
+
+
+def build_index(entries):
+    builder = AutocompleteBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder.encode()
+
+
+def write_index(index, path=INDEX_PATH):
+    dump_json(path, index)
+    return path
+
+
+class Autocomplete:
+    """Reference query engine over an encoded index (as written to autocomplete.json)."""
+
+    def __init__(self, index):
+        self.keys = index["keys"]
+        self.ids = index["ids"]
+        self.scores = index["scores"]
+        self.top = index["top"]
+        self.k = index["k"]
+
+    def complete(self, text, k=None):
+        """[(entry id, matched key), ...] for the best completions of text, at most k (<= the index's k)."""
+        prefix = complete_key(text)
+        if not prefix:
+            return []
+        k = min(k or self.k, self.k)
+        rows = self.top.get(prefix)
+        if rows is None:
+            lo, hi = prefix_range(self.keys, prefix)
+            rows = best_rows(self.keys, self.ids, self.scores, lo, hi, k)
+        return [(self.ids[row], self.keys[row]) for row in rows[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the headword autocomplete index, or query it")
+    parser.add_argument("--query", help="Complete a prefix against the freshly built index")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    index = build_index(entries)
+    if args.query:
+        by_id = {e["id"]: e for e in entries}
+        for entry_id, key in Autocomplete(index).complete(args.query):
+            print(f"  {entry_id:>5}  {key:<24} {by_id[entry_id]['headword']}")
+        return
+    path = write_index(index)
+    print(f"Wrote {path}: {len(index['keys'])} keys, {len(index['top'])} precomputed prefixes, "
+          f"{path.stat().st_size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
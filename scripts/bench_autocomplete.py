@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark autocomplete_index.Autocomplete against a prefix scan.
+
+The scan is what type-ahead does without the index, with the keys
+already folded: test every key for the prefix, then rank the matches by
+the same rule (score, shorter key, key; one row per entry). Queries are
+every prefix of a sample of keys, as typed, so one-letter prefixes are
+included.
+
+Runs on the keys of site/data/entries.json (~5k entries, headwords and
+variant forms) and on --large synthetic Shipibo-like keys with random
+scores (bench_near_duplicates.synthetic_words). The index must return
+exactly what the scan returns: on every query for the real keys, and on
+the queries the scan is timed on (--scan-queries) for the synthetic ones.
+
+Usage:
+    python scripts/bench_autocomplete.py
+    python scripts/bench_autocomplete.py --large 200000 --scan-queries 20
+"""
+
+import argparse
+import json
+import random
+import time
+
+from autocomplete_index import ENTRIES_PATH, K, Autocomplete, AutocompleteBuilder, build_index, complete_key
+from bench_near_duplicates import synthetic_words
+from bench_timing import latencies, summary
+from json_io import iter_records
+
+
+def scan(index, text, k=K):
+    """Completions without the prefix structure: test every key."""
+    prefix = complete_key(text)
+    keys, ids = index.keys, index.ids
+    matches = [row for row, key in enumerate(keys) if key.startswith(prefix)]
+    scores = {row: index.scores[row] for row in matches}
+    ranked = sorted(matches, key=lambda r: (-scores[r], len(keys[r]), keys[r]))
+    rows, seen = [], set()
+    for row in ranked:
+        if ids[row] not in seen:
+            seen.add(ids[row])
+            rows.append(row)
+            if len(rows) == k:
+                break
+    return [(ids[row], keys[row]) for row in rows]
+
+
+def synthetic_index(count, seed=3):
+    rng = random.Random(seed)
+    builder = AutocompleteBuilder()
+    for entry_id, word in enumerate(synthetic_words(count)):
+        builder.add_key(word, entry_id, rng.randint(0, 20))
+    return builder
+
+
+def keystroke_queries(keys, words=40, seed=4):
+    rng = random.Random(seed)
+    queries = []
+    for key in rng.sample(keys, min(words, len(keys))):
+        queries += [key[:n] for n in range(1, len(key) + 1)]
+    return queries
+
+
+def run(name, encode, scan_queries, check_all):
+    t0 = time.perf_counter()
+    encoded = encode()
+    build = time.perf_counter() - t0
+    text = json.dumps(encoded, separators=(",", ":")).encode()
+    index = Autocomplete(encoded)
+    print(f"\n{name}: {len(index.keys)} keys, {len(index.top)} precomputed prefixes; "
+          f"built in {build:.1f} s, {len(text) / 1e6:.2f} MB")
+
+    queries = keystroke_queries(index.keys)
+    step = max(1, len(queries) // scan_queries)
+    sampled = queries[::step][:scan_queries]
+    for query in queries if check_all else sampled:
+        assert index.complete(query) == scan(index, query), f"mismatch on {query!r}"
+    print(f"  completions match the scan on {len(queries) if check_all else len(sampled)} queries")
+
+    print(f"  {'per query, ms':<24} {'queries':>7} {'median':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'index':<24} {len(queries):>7} {summary(latencies(index.complete, queries))}")
+    print(f"  {'index (same queries)':<24} {len(sampled):>7} {summary(latencies(index.complete, sampled))}")
+    print(f"  {'scan':<24} {len(sampled):>7} {summary(latencies(lambda q: scan(index, q), sampled))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the autocomplete index against a prefix scan")
+    parser.add_argument("--large", type=int, default=1_000_000, help="Synthetic key count")
+    parser.add_argument("--scan-queries", type=int, default=30, help="Queries to time the scan on, per size")
+    args = parser.parse_args()
+
+    run(ENTRIES_PATH.name, lambda: build_index(iter_records(ENTRIES_PATH)), args.scan_queries, check_all=True)
+    builder = synthetic_index(args.large)
+    run("synthetic", builder.encode, args.scan_queries, check_all=False)
+
+
+if __name__ == "__main__":
+    main()
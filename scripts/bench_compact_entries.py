@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compact columnar entries (compact_entries.py) against entries.json.
+
+For site/data/entries.json and a copy scaled up --scale times (entries
+repeated with new ids), reports the size of both encodings raw, gzipped
+and (when the brotli module is installed) brotli-compressed, and the
+median time to parse each: json.loads (and orjson.loads when installed)
+for entries.json, the same plus decode() for the compact file. Every run
+checks that decode() gives back the original entries.
+
+Usage:
+    python scripts/bench_compact_entries.py
+    python scripts/bench_compact_entries.py --scale 50 --repeat 3
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+from compact_entries import ENTRIES_PATH, decode, encode
+from json_io import iter_records
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def plain_json(entries):
+    """entries.json as build_site_data.py writes it: one compact record per line."""
+    return ("[\n" + ",\n".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) for e in entries)
+            + "\n]\n").encode()
+
+
+def median_time(fn, text, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def sizes(text):
+    row = [len(text), len(gzip.compress(text, 9))]
+    if brotli:
+        row.append(len(brotli.compress(text)))
+    return "".join(f"{n / 1e6:>10.2f}" for n in row)
+
+
+def run(name, entries, repeat):
+    plain = plain_json(entries)
+    t0 = time.perf_counter()
+    compact = json.dumps(encode(entries), ensure_ascii=False, separators=(",", ":")).encode()
+    encode_time = time.perf_counter() - t0
+    assert decode(json.loads(compact)) == entries, "compact encoding does not round-trip"
+
+    print(f"\n{name}: {len(entries)} entries (compact encode {encode_time:.2f} s, round-trip ok)")
+    print(f"  {'MB':<22}{'raw':>10}{'gzip':>10}" + (f"{'brotli':>10}" if brotli else ""))
+    print(f"  {'entries.json':<22}{sizes(plain)}")
+    print(f"  {'compact':<22}{sizes(compact)}")
+
+    loaders = [("json", json.loads)] + ([("orjson", orjson.loads)] if orjson else [])
+    print(f"  {'parse, ms':<22}{'plain':>10}{'compact':>10}")
+    for label, loads in loaders:
+        plain_ms = median_time(loads, plain, repeat) * 1e3
+        compact_ms = median_time(lambda text: decode(loads(text)), compact, repeat) * 1e3
+        print(f"  {label + ' (+ decode)':<22}{plain_ms:>10.1f}{compact_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact columnar entries against entries.json")
+    parser.add_argument("--scale", type=int, default=20, help="Size multiplier for the scaled run")
+    parser.add_argument("--repeat", type=int, default=5, help="Parses per measurement (median)")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    run(ENTRIES_PATH.name, entries, args.repeat)
+    scaled = [dict(e, id=i) for i, e in enumerate(entries * args.scale)]
+    run(f"{ENTRIES_PATH.name} x{args.scale}", scaled, max(1, args.repeat // 2))
+
+
+if __name__ == "__main__":
+    main()
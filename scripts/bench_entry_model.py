@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the slotted entry model (entry_model.py) against plain dicts.
+
+For an entry file (default data/entries_with_vocabulary.json) and the
+merged vocabulary, measures memory held by the loaded records (tracemalloc,
+after parsing) and the time to load (parse + from_dict) and serialize
+(to_dict + dumps), best of --repeat runs. Also checks that every record
+round-trips (entries missing a core field get it back as null/empty).
+
+Usage:
+    python scripts/bench_entry_model.py
+    python scripts/bench_entry_model.py --repeat 10 site/data/entries.json
+"""
+
+import argparse
+import gc
+import tracemalloc
+from pathlib import Path
+
+import json_io
+from bench_timing import best_of
+from entry_model import Entry, VocabSuffix, VocabWord
+from paths import DATA_DIR, ROOT
+
+
+def held_mb(build):
+    """Memory still allocated by the object build() returns, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return held / 1e6
+
+
+def round_trips(original, written):
+    """Every original key comes back unchanged; added keys are only empty core fields."""
+    return (all(k in written and written[k] == v for k, v in original.items())
+            and all(written[k] in (None, [], 0) for k in written.keys() - original.keys()))
+
+
+def bench(name, raw, split, repeat):
+    """split(parsed JSON) -> [(records, model class)]; compares dicts with the model."""
+    def load_dicts():
+        return json_io.loads(raw)
+
+    def load_models():
+        return [[cls.from_dict(d) for d in records] for records, cls in split(json_io.loads(raw))]
+
+    dicts = load_dicts()
+    objects = load_models()
+    for (records, cls), converted in zip(split(dicts), objects):
+        mismatched = sum(1 for d, o in zip(records, converted) if not round_trips(d, o.to_dict()))
+        if mismatched:
+            print(f"  {name}: {mismatched} {cls.__name__} records do not round-trip")
+
+    rows = {
+        "dict MB": held_mb(load_dicts),
+        "model MB": held_mb(load_models),
+        "load dict": best_of(load_dicts, repeat),
+        "load model": best_of(load_models, repeat),
+        "dump dict": best_of(lambda: json_io.dumps(dicts), repeat),
+        "dump model": best_of(lambda: json_io.dumps([[o.to_dict() for o in group] for group in objects]), repeat),
+    }
+    count = sum(len(group) for group in objects)
+    print(f"  {name:<30} {count:>6} {rows['dict MB']:>8.2f} {rows['model MB']:>9.2f} "
+          f"{rows['load dict']:>10.1f} {rows['load model']:>11.1f} {rows['dump dict']:>10.1f} {rows['dump model']:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry_model records against plain dicts")
+    parser.add_argument("entries", nargs="?", default=str(DATA_DIR / "entries_with_vocabulary.json"),
+                        help="Entry file (default data/entries_with_vocabulary.json)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is reported)")
+    args = parser.parse_args()
+
+    entries_path = Path(args.entries) if Path(args.entries).is_absolute() else ROOT / args.entries
+    vocab_path = DATA_DIR / "vocabulary_merged.json"
+    backend = "orjson" if json_io.HAVE_ORJSON else "stdlib json"
+    print(f"json backend: {backend}; memory held after load in MB, times in ms (best of {args.repeat})\n")
+    print(f"  {'file':<30} {'records':>6} {'dict MB':>8} {'model MB':>9} "
+          f"{'load dict':>10} {'load model':>11} {'dump dict':>10} {'dump model':>11}")
+
+    bench(entries_path.name, entries_path.read_bytes(),
+          lambda data: [(data, Entry)], args.repeat)
+    if vocab_path.exists():
+        bench(vocab_path.name, vocab_path.read_bytes(),
+              lambda data: [(data["words"], VocabWord), (data["suffixes"], VocabSuffix)], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
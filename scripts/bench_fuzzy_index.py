@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark fuzzy_index.FuzzyIndex against a scan of every key.
+
+The scan is the lookup without deletion neighbourhoods: bounded
+Levenshtein from the query to every key. Queries are keys with typos
+applied to their original spelling: one or two random insertions,
+deletions, substitutions or transpositions, a doubled letter, and for
+the real keys a dropped or added accent and c/k swaps (which the spelling
+key absorbs). The index must return exactly the keys and distances the
+scan does, on every query for the real keys and on the queries the scan
+is timed on (--scan-queries) for the synthetic ones.
+
+Runs on the keys of site/data/entries.json, then on growing numbers of
+synthetic Shipibo-like words (bench_near_duplicates.synthetic_words) to
+show how build time, size and latency scale.
+
+Usage:
+    python scripts/bench_fuzzy_index.py
+    python scripts/bench_fuzzy_index.py --sizes 10000,100000,300000 --scan-queries 20
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from bench_near_duplicates import synthetic_words
+from bench_timing import latencies, summary
+from fuzzy_index import ENTRIES_PATH, FuzzyIndex, FuzzyIndexBuilder, allowed_distance, spell_key
+from json_io import iter_records
+from near_duplicates import bounded_levenshtein
+
+LETTERS = "abeiknorstxy"
+ACCENTS = {"a": "á", "e": "é", "i": "í", "o": "ó", "u": "ú"}
+
+
+def scan(index, text):
+    """{row: distance} by comparing the query with every key."""
+    key = spell_key(text)
+    if not key:
+        return {}
+    distance = allowed_distance(key, index.max_distance, index.chars_per_edit)
+    found = {}
+    for row, other in enumerate(index.keys):
+        d = bounded_levenshtein(key, other, distance)
+        if d <= distance:
+            found[row] = d
+    return found
+
+
+def typo(word, rng):
+    """word with one learner-style slip: an edit, a doubled letter, an accent or a c/k swap."""
+    chars = list(word)
+    pos = rng.randrange(len(chars))
+    op = rng.randrange(7)
+    if op == 0:
+        chars[pos] = rng.choice(LETTERS)
+    elif op == 1:
+        chars.insert(pos, rng.choice(LETTERS))
+    elif op == 2 and len(chars) > 3:
+        del chars[pos]
+    elif op == 3 and pos + 1 < len(chars):
+        chars[pos], chars[pos + 1] = chars[pos + 1], chars[pos]
+    elif op == 4:
+        chars.insert(pos, chars[pos])
+    elif op == 5 and chars[pos] in ACCENTS:
+        chars[pos] = ACCENTS[chars[pos]]
+    else:
+        return word.replace("k", "c", 1) if "k" in word else word.replace("c", "k", 1)
+    return "".join(chars)
+
+
+def typo_queries(words, count=200, seed=6):
+    rng = random.Random(seed)
+    queries = []
+    for word in rng.sample(words, min(count, len(words))):
+        for _ in range(rng.randint(1, 2)):
+            word = typo(word, rng)
+        queries.append(word)
+    return queries
+
+
+def run(name, builder, words, scan_queries, check_all):
+    t0 = time.perf_counter()
+    encoded = builder.encode()
+    build = time.perf_counter() - t0
+    text = json.dumps(encoded, separators=(",", ":")).encode()
+    index = FuzzyIndex(encoded)
+    print(f"\n{name}: {len(index.keys)} keys, {len(index.deletes)} deletions; built in {build:.1f} s, "
+          f"{len(text) / 1e6:.2f} MB ({len(gzip.compress(text)) / 1e6:.2f} MB gzipped)")
+
+    queries = typo_queries(words)
+    step = max(1, len(queries) // scan_queries)
+    sampled = queries[::step][:scan_queries]
+    for query in queries if check_all else sampled:
+        assert index.matches(query) == scan(index, query), f"mismatch on {query!r}"
+    found = sum(1 for query in queries if index.matches(query))
+    print(f"  matches equal the scan on {len(queries) if check_all else len(sampled)} queries; "
+          f"{found}/{len(queries)} typo queries find something")
+
+    print(f"  {'per query, ms':<24} {'queries':>7} {'median':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'index':<24} {len(queries):>7} {summary(latencies(index.lookup, queries))}")
+    print(f"  {'index (same queries)':<24} {len(sampled):>7} {summary(latencies(index.lookup, sampled))}")
+    print(f"  {'scan':<24} {len(sampled):>7} {summary(latencies(lambda q: scan(index, q), sampled))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the typo-tolerant index against a scan of every key")
+    parser.add_argument("--sizes", default="10000,100000", help="Synthetic key counts, comma-separated")
+    parser.add_argument("--scan-queries", type=int, default=20, help="Queries to time the scan on, per size")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    builder = FuzzyIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    headwords = [e["headword"].lstrip("-— ") for e in entries if len(e["headword"].lstrip("-— ")) > 2]
+    run(ENTRIES_PATH.name, builder, headwords, args.scan_queries, check_all=True)
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        words = synthetic_words(size)
+        builder = FuzzyIndexBuilder()
+        for entry_id, word in enumerate(words):
+            builder.add_key(word, entry_id, 0)
+        run(f"synthetic {size}", builder, words, args.scan_queries, check_all=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON load/dump on the real data files: stdlib json vs json_io.
+
+For each file, times parsing and serializing (best of --repeat runs) with
+the stdlib settings the scripts used before (json.load, json.dump with
+indent=2) and with json_io (orjson when installed), and compares the
+size of pretty and compact output.
+
+Usage:
+    python scripts/bench_json_io.py
+    python scripts/bench_json_io.py --repeat 10 data/vocabulary_merged.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import json_io
+from bench_timing import best_of
+from paths import DATA_DIR, ROOT, SITE_DATA_DIR
+
+DEFAULT_FILES = [
+    DATA_DIR / "entries_vision.json",
+    DATA_DIR / "entries_with_vocabulary.json",
+    SITE_DATA_DIR / "entries.json",
+    DATA_DIR / "vocabulary_merged.json",
+    DATA_DIR / "icaros_merged.json",
+]
+
+
+def bench_file(path, repeat):
+    raw = path.read_bytes()
+    obj = json.loads(raw)
+    return {
+        "size_kb": len(raw) / 1024,
+        "load_std": best_of(lambda: json.loads(raw.decode("utf-8")), repeat),
+        "load_io": best_of(lambda: json_io.loads(raw), repeat),
+        "dump_std": best_of(lambda: json.dumps(obj, ensure_ascii=False, indent=2), repeat),
+        "dump_io_pretty": best_of(lambda: json_io.dumps(obj, pretty=True), repeat),
+        "dump_io_compact": best_of(lambda: json_io.dumps(obj), repeat),
+        "pretty_kb": len(json_io.dumps(obj, pretty=True).encode("utf-8")) / 1024,
+        "compact_kb": len(json_io.dumps(obj).encode("utf-8")) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stdlib json vs json_io on the data files")
+    parser.add_argument("files", nargs="*", help="JSON files (default: the large data files)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    files = [Path(f) if Path(f).is_absolute() else ROOT / f for f in args.files] or DEFAULT_FILES
+    backend = "orjson" if json_io.HAVE_ORJSON else "stdlib json (orjson not installed)"
+    print(f"json_io backend: {backend}; best of {args.repeat} runs, times in ms\n")
+    print(f"  {'file':<32} {'KB':>6} {'load std':>9} {'load io':>8} {'dump std':>9} "
+          f"{'io pretty':>10} {'io compact':>11} {'compact KB':>11}")
+
+    for path in files:
+        if not path.exists():
+            print(f"  {path.name:<32} (missing)")
+            continue
+        r = bench_file(path, args.repeat)
+        print(f"  {path.name:<32} {r['size_kb']:>6.0f} {r['load_std']:>9.1f} {r['load_io']:>8.1f} "
+              f"{r['dump_std']:>9.1f} {r['dump_io_pretty']:>10.1f} {r['dump_io_compact']:>11.1f} "
+              f"{r['compact_kb']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
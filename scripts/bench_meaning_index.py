@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark meaning_index.MeaningIndex against scanning the definitions.
+
+Two scans: the substring test of site/app.js searchEntries() (what the
+site does now, which neither stems nor ranks), and a stemmed scan that
+stems every definition of every entry per query and scores it the way
+the index does. At the real size, the index must return exactly what the
+stemmed scan returns, scores included, on every query.
+
+Queries are single words and short phrases from the English and Spanish
+definitions, each also in inflected forms ("cure" -> "cures", "cured",
+"curing"). The groups below show that inflections of one word find the
+same entries.
+
+Runs on site/data/entries.json (~5k entries) and on --large synthetic
+entries (bench_search_index.synthetic_entries: the real definitions,
+cycled under new ids).
+
+Usage:
+    python scripts/bench_meaning_index.py
+    python scripts/bench_meaning_index.py --large 100000 --scan-queries 20
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from bench_search_index import linear_scan, synthetic_entries
+from bench_timing import latencies, summary
+from json_io import iter_records
+from meaning_index import ENTRIES_PATH, LANGUAGES, MeaningIndex, build_index, stems
+
+GROUPS = [
+    ["cure", "cures", "cured", "curing", "curar", "curarse", "curando", "curación"],
+    ["drink", "drinks", "drinking", "beber", "bebiendo"],
+    ["fish", "fishes", "fishing", "pescar", "pescando"],
+    ["sing", "sings", "singing", "cantar", "cantando"],
+]
+
+
+def stem_scan(entries, query):
+    """{entry id: score} from stemming every definition: what lookup() returns, without the index."""
+    found = {}
+    for lang in LANGUAGES:
+        query_stems = stems(query, lang)
+        if not query_stems:
+            continue
+        for entry in entries:
+            best = {}
+            for field_lang, field in LANGUAGES.items():
+                for i, definition in enumerate(entry.get(field) or ()):
+                    words = stems(definition, field_lang)
+                    score = 3 if len(words) == 1 else 2 if i == 0 else 1
+                    for stem in words & query_stems:
+                        best[stem] = max(score, best.get(stem, 0))
+            if len(best) == len(query_stems):
+                total = sum(best.values())
+                found[entry["id"]] = max(total, found.get(entry["id"], 0))
+    return found
+
+
+def word_queries(entries, words=40, seed=5):
+    """Definition words and two-word phrases, plus English inflections of the words."""
+    rng = random.Random(seed)
+    queries = []
+    for field in LANGUAGES.values():
+        texts = [d for e in entries for d in e.get(field) or ()]
+        for _ in range(words):
+            tokens = [t for t in rng.choice(texts).lower().split() if t.isalpha() and len(t) > 3]
+            if tokens:
+                queries.append(rng.choice(tokens))
+            if len(tokens) > 1:
+                queries.append(" ".join(rng.sample(tokens, 2)))
+    inflected = [q + suffix for q in queries[:words] if " " not in q for suffix in ("s", "ing", "ed")]
+    return queries + inflected
+
+
+def run(name, entries, queries, scan_queries, check=False):
+    t0 = time.perf_counter()
+    encoded = build_index(entries)
+    build = time.perf_counter() - t0
+    text = json.dumps(encoded, separators=(",", ":")).encode()
+    index = MeaningIndex(json.loads(text))
+    stem_count = sum(len(t["stems"]) for t in encoded["languages"].values())
+    print(f"\n{name}: {len(entries)} entries, {stem_count} stems; built in {build:.1f} s, "
+          f"{len(text) / 1e6:.2f} MB ({len(gzip.compress(text)) / 1e6:.2f} MB gzipped)")
+
+    if check:
+        for query in queries + [word for group in GROUPS for word in group]:
+            assert dict(index.lookup(query, limit=None)) == stem_scan(entries, query), f"mismatch on {query!r}"
+        print(f"  results and scores match the stemmed scan on all {len(queries)} queries and the groups")
+
+    step = max(1, len(queries) // scan_queries)
+    sampled = queries[::step][:scan_queries]
+    print(f"  {'per query, ms':<24} {'queries':>7} {'median':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'index':<24} {len(queries):>7} {summary(latencies(index.lookup, queries))}")
+    print(f"  {'index (same queries)':<24} {len(sampled):>7} {summary(latencies(index.lookup, sampled))}")
+    print(f"  {'substring scan (app.js)':<24} {len(sampled):>7} "
+          f"{summary(latencies(lambda q: linear_scan(entries, q), sampled))}")
+    print(f"  {'stemmed scan':<24} {len(sampled):>7} "
+          f"{summary(latencies(lambda q: stem_scan(entries, q), sampled))}")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the meaning index against scanning the definitions")
+    parser.add_argument("--large", type=int, default=200_000, help="Synthetic entry count")
+    parser.add_argument("--scan-queries", type=int, default=10, help="Queries to time the scans on, per size")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    queries = word_queries(entries)
+    index = run(ENTRIES_PATH.name, entries, queries, args.scan_queries, check=True)
+
+    print(f"\n  {'query':<12} {'index':>6} {'app.js':>7}  shared with the group's first word")
+    for group in GROUPS:
+        first = {entry_id for entry_id, _ in index.lookup(group[0], limit=None)}
+        for word in group:
+            found = {entry_id for entry_id, _ in index.lookup(word, limit=None)}
+            print(f"  {word:<12} {len(found):>6} {len(linear_scan(entries, word, limit=None)):>7}  {len(found & first)}")
+
+    run("synthetic", synthetic_entries(entries, args.large), queries, args.scan_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark near_duplicates.find_near_duplicates against an all-pairs scan.
+
+Times the blocked finder on the merged vocabulary (data/vocabulary_merged.json,
+canonical keys) and on synthetic vocabularies of Shipibo-like words
+(CV(C) syllables from the language's consonants and vowels) with a share of
+copies carrying one or two random edits, as OCR and LLM drift would. On
+sizes up to --brute-max, the all-pairs scan is run too and both must return
+the same pairs; above that, its time is extrapolated from the largest
+measured size (it is quadratic).
+
+Usage:
+    python scripts/bench_near_duplicates.py
+    python scripts/bench_near_duplicates.py --sizes 1000 10000 100000 --brute-max 5000
+"""
+
+import argparse
+import random
+import time
+
+from json_io import load_json
+from near_duplicates import allowed_distance, bounded_levenshtein, find_near_duplicates
+from orthography import canonical_key
+from paths import DATA_DIR
+
+ONSETS = ["", "b", "ch", "j", "k", "m", "n", "p", "r", "s", "sh", "t", "ts", "w", "x", "y"]
+VOWELS = "aeio"
+CODAS = ["", "", "", "n", "s", "sh", "x", "k"]
+LETTERS = "abchijkmnoprstwxy"
+
+
+def synthetic_words(count, drift=0.1, seed=1):
+    """count distinct words; about drift of them are edited copies of earlier ones."""
+    rng = random.Random(seed)
+    words, seen = [], set()
+    while len(words) < count:
+        if words and rng.random() < drift:
+            chars = list(rng.choice(words))
+            for _ in range(rng.randint(1, 2)):
+                pos = rng.randrange(len(chars))
+                op = rng.randrange(3)
+                if op == 0:
+                    chars[pos] = rng.choice(LETTERS)
+                elif op == 1:
+                    chars.insert(pos, rng.choice(LETTERS))
+                elif len(chars) > 3:
+                    del chars[pos]
+            word = "".join(chars)
+        else:
+            word = "".join(rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS)
+                           for _ in range(rng.randint(2, 5)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def brute_force(words):
+    """The same pairs as find_near_duplicates, comparing every pair."""
+    pairs = []
+    for j, word in enumerate(words):
+        for i in range(j):
+            other = words[i]
+            k = allowed_distance(min(len(word), len(other)))
+            if k == 0 or word.startswith(other) or other.startswith(word):
+                continue
+            distance = bounded_levenshtein(other, word, k)
+            if distance <= k:
+                pairs.append((i, j, distance))
+    pairs.sort()
+    return pairs
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark blocked near-duplicate detection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Synthetic vocabulary sizes")
+    parser.add_argument("--brute-max", type=int, default=5000,
+                        help="Largest size to also run the all-pairs scan on")
+    args = parser.parse_args()
+
+    print(f"  {'vocabulary':<26} {'words':>7} {'pairs':>6} {'blocked s':>10} {'all-pairs s':>12}")
+
+    vocab_path = DATA_DIR / "vocabulary_merged.json"
+    if vocab_path.exists():
+        keys = [canonical_key(w["shipibo"]) for w in load_json(vocab_path)["words"]]
+        pairs, blocked = timed(find_near_duplicates, keys)
+        expected, brute = timed(brute_force, keys)
+        assert pairs == expected, "blocked and all-pairs results differ"
+        print(f"  {vocab_path.name:<26} {len(keys):>7} {len(pairs):>6} {blocked:>10.3f} {brute:>12.3f}")
+
+    per_pair = None  # all-pairs seconds per comparison, for extrapolating
+    for size in args.sizes:
+        words = synthetic_words(size)
+        pairs, blocked = timed(find_near_duplicates, words)
+        if size <= args.brute_max:
+            expected, brute = timed(brute_force, words)
+            assert pairs == expected, f"blocked and all-pairs results differ at {size}"
+            per_pair = brute / (size * (size - 1) / 2)
+            brute_col = f"{brute:>12.3f}"
+        elif per_pair:
+            brute_col = f"{'~' + format(per_pair * size * (size - 1) / 2, '.0f'):>12}"
+        else:
+            brute_col = f"{'-':>12}"
+        print(f"  {'synthetic':<26} {size:>7} {len(pairs):>6} {blocked:>10.3f} {brute_col}")
+
+
+if __name__ == "__main__":
+    main()
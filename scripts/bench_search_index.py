@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark search_index.SearchIndex against the linear scan in site/app.js.
+
+The linear scan is searchEntries() ported as is: for every entry, lowercase
+the headword and each definition and test for the query as a substring,
+then keep the first 50. Queries are what typing produces: every prefix of
+a sample of headwords and English definition words, so one-letter queries
+(the slowest for both) are included.
+
+Runs on site/data/entries.json (~5k entries) and on a synthetic set of
+--large entries: copies of the real entries with new ids and a random
+syllable added to the headword, sharing the definition lists. At the real
+size, the index must return exactly the entries a word-prefix scan (fold,
+tokenize, test every token) returns. The scan is timed on at most
+--scan-queries queries per size, spread over the query list.
+
+Usage:
+    python scripts/bench_search_index.py
+    python scripts/bench_search_index.py --large 100000 --scan-queries 20
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+
+from bench_timing import latencies, summary
+from json_io import iter_records
+from search_index import ENTRIES_PATH, SearchIndex, build_index, tokenize
+
+SYLLABLES = ["ba", "bo", "ki", "ko", "ma", "ni", "no", "ra", "sha", "shi", "ta", "ti", "xo", "ya"]
+
+
+def linear_scan(entries, query, limit=50):
+    """site/app.js searchEntries(), line for line."""
+    q = query.lower()
+    found = []
+    for entry in entries:
+        if (q in entry["headword"].lower()
+                or any(q in d.lower() for d in entry.get("definitions_english") or ())
+                or any(q in d.lower() for d in entry.get("definitions_spanish") or ())):
+            found.append(entry["id"])
+    return found[:limit]
+
+
+def prefix_scan(entries, query):
+    """Ids the index should find: every query token is a prefix of some word of the entry."""
+    tokens = tokenize(query)
+    found = set()
+    for entry in entries:
+        words = set(tokenize(entry["headword"]))
+        for text in (entry.get("definitions_english") or []) + (entry.get("definitions_spanish") or []):
+            words.update(tokenize(text))
+        if all(any(w.startswith(t) for w in words) for t in tokens):
+            found.add(entry["id"])
+    return found
+
+
+def synthetic_entries(entries, count, seed=1):
+    """count entries cycled from the real ones, with new ids and altered headwords."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        base = entries[i % len(entries)]
+        headword = base["headword"] if i < len(entries) else base["headword"] + rng.choice(SYLLABLES)
+        out.append({"id": i, "headword": headword,
+                    "definitions_english": base.get("definitions_english"),
+                    "definitions_spanish": base.get("definitions_spanish")})
+    return out
+
+
+def keystroke_queries(entries, words=25, seed=2):
+    """Every prefix of a sample of headwords and English words, as typed."""
+    rng = random.Random(seed)
+    sample = [rng.choice(entries)["headword"] for _ in range(words)]
+    english = [d for e in entries for d in e.get("definitions_english") or ()]
+    sample += [rng.choice(english).split()[0] for _ in range(words)]
+    queries = []
+    for word in sample:
+        word = word.strip("-( ").lower()
+        queries += [word[:n] for n in range(1, len(word) + 1)]
+    return [q for q in queries if q.strip()]
+
+
+def run(name, entries, queries, scan_queries, check=False):
+    t0 = time.perf_counter()
+    encoded = build_index(entries)
+    build = time.perf_counter() - t0
+    text = json.dumps(encoded, separators=(",", ":")).encode()
+    t0 = time.perf_counter()
+    index = SearchIndex(json.loads(text))
+    load = time.perf_counter() - t0
+    print(f"\n{name}: {len(entries)} entries, {len(encoded['terms'])} terms; index built in {build:.1f} s, "
+          f"{len(text) / 1e6:.2f} MB ({len(gzip.compress(text)) / 1e6:.2f} MB gzipped), parsed in {load:.2f} s")
+
+    if check:
+        for query in queries:
+            assert set(index.search(query, limit=None)) == prefix_scan(entries, query), f"mismatch on {query!r}"
+        print(f"  index results match the word-prefix scan on all {len(queries)} queries")
+
+    step = max(1, len(queries) // scan_queries)
+    sampled = queries[::step][:scan_queries]
+    print(f"  {'per query, ms':<24} {'queries':>7} {'median':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'index':<24} {len(queries):>7} {summary(latencies(index.search, queries))}")
+    print(f"  {'index (same queries)':<24} {len(sampled):>7} {summary(latencies(index.search, sampled))}")
+    print(f"  {'linear scan':<24} {len(sampled):>7} "
+          f"{summary(latencies(lambda q: linear_scan(entries, q), sampled))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search index against the linear scan")
+    parser.add_argument("--large", type=int, default=500_000, help="Synthetic entry count")
+    parser.add_argument("--scan-queries", type=int, default=30,
+                        help="Queries to time the linear scan on, per size")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    queries = keystroke_queries(entries)
+    run(ENTRIES_PATH.name, entries, queries, args.scan_queries, check=True)
+    run("synthetic", synthetic_entries(entries, args.large), queries, args.scan_queries)
+
+
+if __name__ == "__main__":
+    main()
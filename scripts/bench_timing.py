@@ -0,0 +1,38 @@
+"""
+Timing helpers shared by the bench_*.py scripts.
+
+Usage:
+    from bench_timing import best_of, latencies, summary
+    print(f"build {best_of(build, 5):.1f} ms")
+    print(f"  {'index':<24} {len(queries):>7} {summary(latencies(index.lookup, queries))}")
+"""
+
+import statistics
+import time
+
+
+def best_of(fn, repeat):
+    """Fastest of repeat calls to fn(), in ms."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def latencies(fn, queries):
+    """Seconds taken by fn(query) for each query."""
+    times = []
+    for query in queries:
+        t0 = time.perf_counter()
+        fn(query)
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def summary(times):
+    """Median, p95 and max of latencies(), in ms, as aligned columns."""
+    times = sorted(times)
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    return f"{statistics.median(times) * 1e3:>9.3f} {p95 * 1e3:>9.3f} {times[-1] * 1e3:>9.3f}"
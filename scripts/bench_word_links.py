@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark word_links.WordLinks against the entry scans in site/app.js.
+
+Two scans, ported as is: findDictEntry() (the first entry whose
+lowercased headword equals the word, leading dash removed) and the chat
+context of buildChatContext() (every entry whose headword contains a
+word of the message, or is contained in one). Words are every token of
+the icaro texts and example sentences, as the site shows them; messages
+are icaro song lines.
+
+On site/data/entries.json, every word the findDictEntry() scan finds must
+open an entry spelled the same way through the links (among homographs,
+the links pick the heavier one), and the bench reports how many more
+words the links resolve (new orthography, inflected forms). Then the scans and the
+lookups are timed there and on --large synthetic entries
+(bench_search_index.synthetic_entries).
+
+Usage:
+    python scripts/bench_word_links.py
+    python scripts/bench_word_links.py --large 100000 --scan-queries 20
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bench_search_index import synthetic_entries
+from bench_timing import latencies, summary
+from json_io import iter_records
+from search_index import tokenize
+from word_links import ENTRIES_PATH, WordLinkBuilder, WordLinks, icaro_texts, load_icaros
+
+
+def find_dict_entry(entries, word):
+    """The scan of site/app.js findDictEntry() (all it did before the links), line for line."""
+    lower = word.lower()
+    if lower[:1] in ("-", "—"):
+        lower = lower[1:]
+    return next((e for e in entries if e["headword"].lower() == lower), None)
+
+
+def linked_entry(links, by_id, word):
+    """site/app.js findDictEntry() with the links: the linked entry spelled as the word, else the first."""
+    lower = word.lower()
+    if lower[:1] in ("-", "—"):
+        lower = lower[1:]
+    linked = [by_id[i] for i in links.lookup(word) if i in by_id]
+    return next((e for e in linked if e["headword"].lower() == lower), linked[0] if linked else None)
+
+
+def chat_matches(entries, message):
+    """The entry scan of site/app.js buildChatContext()."""
+    words = message.lower().split()
+    return [e["id"] for e in entries
+            if any(len(w) > 2 and (w in e["headword"].lower() or e["headword"].lower() in w) for w in words)]
+
+
+def chat_links(links, message):
+    """The same context from the links: one lookup per word."""
+    found = {}
+    for word in message.lower().split():
+        if len(word) > 2:
+            found.update(dict.fromkeys(links.lookup(word)))
+    return list(found)
+
+
+def site_words(entries, icaros):
+    texts = [text for icaro in icaros for text in icaro_texts(icaro)]
+    texts += [ex.get("shipibo") for e in entries for ex in e.get("examples") or () if isinstance(ex, dict)]
+    return sorted({token for text in texts for token in tokenize(text)})
+
+
+def build(entries, icaros):
+    builder = WordLinkBuilder()
+    for entry in entries:
+        builder.add(entry)
+    builder.add_icaros(icaros)
+    return builder.encode()
+
+
+def run(name, entries, icaros, words, messages, scan_queries, check=False):
+    t0 = time.perf_counter()
+    encoded = build(entries, icaros)
+    elapsed = time.perf_counter() - t0
+    text = json.dumps(encoded, separators=(",", ":")).encode()
+    links = WordLinks(encoded)
+    print(f"\n{name}: {len(entries)} entries, {len(encoded['words'])} words linked "
+          f"({len(encoded['stems'])} through a stem); built in {elapsed:.1f} s, {len(text) / 1e6:.2f} MB")
+
+    if check:
+        by_id = {e["id"]: e for e in entries}
+        scanned = linked = homographs = 0
+        for word in words:
+            entry = find_dict_entry(entries, word)
+            linked += bool(links.lookup(word))
+            if entry:
+                scanned += 1
+                picked = linked_entry(links, by_id, word)
+                assert picked and picked["headword"].lower() == entry["headword"].lower(), \
+                    f"{word!r}: findDictEntry finds {entry['headword']!r}, links {picked and picked['headword']!r}"
+                homographs += picked["id"] != entry["id"]
+        print(f"  {len(words)} site words: findDictEntry finds {scanned}, the links {linked} "
+              f"(each scan hit spelled the same; {homographs} a heavier homograph)")
+
+    rng = random.Random(7)
+    sampled = rng.sample(words, min(scan_queries, len(words)))
+    sampled_messages = messages[:scan_queries]
+    print(f"  {'per lookup, ms':<24} {'queries':>7} {'median':>9} {'p95':>9} {'max':>9}")
+    print(f"  {'links: word':<24} {len(words):>7} {summary(latencies(links.lookup, words))}")
+    print(f"  {'findDictEntry scan':<24} {len(sampled):>7} "
+          f"{summary(latencies(lambda w: find_dict_entry(entries, w), sampled))}")
+    print(f"  {'links: chat message':<24} {len(messages):>7} "
+          f"{summary(latencies(lambda m: chat_links(links, m), messages))}")
+    print(f"  {'chat scan':<24} {len(sampled_messages):>7} "
+          f"{summary(latencies(lambda m: chat_matches(entries, m), sampled_messages))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the word links against the app.js entry scans")
+    parser.add_argument("--large", type=int, default=500_000, help="Synthetic entry count")
+    parser.add_argument("--scan-queries", type=int, default=30, help="Words and messages to time the scans on")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    icaros = load_icaros()
+    words = site_words(entries, icaros)
+    messages = [text for icaro in icaros for section in (icaro.get("song") or {}).get("sections") or ()
+                for text in (line.get("text") or "" for line in section.get("lines") or ())]
+    run(ENTRIES_PATH.name, entries, icaros, words, messages, args.scan_queries, check=True)
+    run("synthetic", synthetic_entries(entries, args.large), icaros, words, messages, args.scan_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Build bulk SQL for the D1 entries table, plus a SQLite copy for local testing.
+
+/api/entries/import upserts entries one row (and one findFirst) at a time.
+This writes the same rows as a few multi-row upserts instead:
+
+    INSERT INTO entries (id, headword, part_of_speech, data) VALUES (...), (...)
+    ON CONFLICT (id) DO UPDATE SET ... WHERE <anything differs>;
+
+Each statement stays under D1's 100 KB statement limit (--max-statement-bytes)
+and uses literals only, so bound-parameter limits do not apply. Rows that
+did not change are not touched, so their updated_at stays put. The data
+column holds what routes/entries.ts stores and splices back into GET
+/api/entries: the entry minus id, headword and part_of_speech, in its key
+order, serialized like JSON.stringify (compact, non-ASCII kept as is).
+
+Outputs (data/d1/):
+  - entries-001.sql, ... — the statements, split into files of at most
+    --max-file-bytes, for: npx wrangler d1 execute <db> --remote --file ...
+  - entries.sqlite — every api/drizzle migration applied in journal
+    order, then the full entry set loaded, and read back through the
+    GET splice to check every entry round-trips
+
+Usage:
+    python scripts/build_d1_sql.py                 # all entries
+    python scripts/build_d1_sql.py --replace       # also delete rows first (full reload)
+    python scripts/build_d1_sql.py --changeset     # only data/entries_changeset.json (entry_changes.py)
+    python scripts/build_d1_sql.py --no-sqlite
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+
+from json_io import iter_records, load_json
+from paths import DATA_DIR, ROOT, SITE_DATA_DIR
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+CHANGESET_PATH = DATA_DIR / "entries_changeset.json"
+MIGRATIONS_DIR = ROOT / "api" / "drizzle"
+WRANGLER_TOML = ROOT / "api" / "wrangler.toml"
+OUTPUT_DIR = DATA_DIR / "d1"
+
+MAX_STATEMENT_BYTES = 100_000  # D1's limit on one SQL statement
+MAX_ROWS = 500                 # rows per INSERT, well inside SQLite's limits
+MAX_FILE_BYTES = 1_000_000
+
+INSERT = "INSERT INTO entries (id, headword, part_of_speech, data) VALUES\n"
+UPSERT = (
+    "\nON CONFLICT (id) DO UPDATE SET headword = excluded.headword, "
+    "part_of_speech = excluded.part_of_speech, data = excluded.data, "
+    "updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')\n"
+    "WHERE entries.headword IS NOT excluded.headword "
+    "OR entries.part_of_speech IS NOT excluded.part_of_speech "
+    "OR entries.data IS NOT excluded.data;"
+)
+
+
+def js_json(value):
+    """JSON text as JSON.stringify writes it (entries hold no floats, where the two differ)."""
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def sql_text(value):
+    return "NULL" if value is None else "'" + value.replace("'", "''") + "'"
+
+
+def entry_row(entry):
+    """(id, headword, part_of_speech, data) as the import route stores them."""
+    rest = {k: v for k, v in entry.items() if k not in ("id", "headword", "part_of_speech")}
+    return entry["id"], entry["headword"], entry.get("part_of_speech") or None, js_json(rest)
+
+
+def upsert_statements(entries, max_bytes=MAX_STATEMENT_BYTES, max_rows=MAX_ROWS):
+    """Yield multi-row upserts of entries, each at most max_bytes of UTF-8."""
+    overhead = len(INSERT.encode()) + len(UPSERT.encode())
+    values, size = [], overhead
+    for entry in entries:
+        entry_id, headword, pos, data = entry_row(entry)
+        value = f"({int(entry_id)},{sql_text(headword)},{sql_text(pos)},{sql_text(data)})"
+        value_size = len(value.encode()) + 2  # ",\n"
+        if overhead + value_size > max_bytes:
+            raise ValueError(f"entry {entry_id} alone exceeds {max_bytes} bytes of SQL")
+        if values and (size + value_size > max_bytes or len(values) >= max_rows):
+            yield INSERT + ",\n".join(values) + UPSERT
+            values, size = [], overhead
+        values.append(value)
+        size += value_size
+    if values:
+        yield INSERT + ",\n".join(values) + UPSERT
+
+
+def delete_statements(ids, chunk=1000):
+    """Yield DELETEs for the given entry ids."""
+    ids = list(ids)
+    for i in range(0, len(ids), chunk):
+        yield f"DELETE FROM entries WHERE id IN ({','.join(str(int(x)) for x in ids[i:i + chunk])});"
+
+
+def write_sql_files(statements, out_dir=OUTPUT_DIR, max_file_bytes=MAX_FILE_BYTES):
+    """Write statements to entries-NNN.sql files; returns the paths written."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob("entries-*.sql"):
+        old.unlink()
+    paths, chunk, size = [], [], 0
+
+    def flush():
+        path = out_dir / f"entries-{len(paths) + 1:03d}.sql"
+        path.write_text("\n\n".join(chunk) + "\n", encoding="utf-8")
+        paths.append(path)
+
+    for statement in statements:
+        statement_size = len(statement.encode()) + 2
+        if chunk and size + statement_size > max_file_bytes:
+            flush()
+            chunk, size = [], 0
+        chunk.append(statement)
+        size += statement_size
+    if chunk:
+        flush()
+    return paths
+
+
+def migration_files(migrations_dir=MIGRATIONS_DIR):
+    """The drizzle migrations in journal order."""
+    journal = load_json(migrations_dir / "meta" / "_journal.json")
+    return [migrations_dir / f"{e['tag']}.sql" for e in sorted(journal["entries"], key=lambda e: e["idx"])]
+
+
+def spliced_entries(conn):
+    """Entries as GET /api/entries assembles them: the columns, then data spliced in."""
+    rows = conn.execute("SELECT id, headword, part_of_speech, data FROM entries ORDER BY headword")
+    for entry_id, headword, pos, data in rows:
+        head = f'{{"id":{entry_id},"headword":{js_json(headword)},"part_of_speech":{js_json(pos) if pos else "null"},'
+        yield json.loads(head + data[1:])
+
+
+def build_sqlite(path, statements):
+    """Apply the migrations and statements to a fresh SQLite file; returns the connection."""
+    tmp = f"{path}.tmp.{os.getpid()}"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+    conn = sqlite3.connect(tmp)
+    try:
+        for migration in migration_files():
+            conn.executescript(migration.read_text(encoding="utf-8"))
+        for statement in statements:
+            conn.execute(statement)
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.unlink(tmp)
+        raise
+    conn.close()
+    os.replace(tmp, path)
+    return sqlite3.connect(path)
+
+
+def check_round_trip(conn, entries):
+    """Count entries that do not come back unchanged through the GET splice."""
+    by_id = {e["id"]: e for e in entries}
+    mismatched = sum(1 for e in spliced_entries(conn) if by_id.pop(e["id"], None) != e)
+    return mismatched + len(by_id)
+
+
+def database_name():
+    match = re.search(r'database_name\s*=\s*"([^"]+)"', WRANGLER_TOML.read_text(encoding="utf-8"))
+    return match.group(1) if match else "<database>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build bulk SQL and a SQLite file for the D1 entries table")
+    parser.add_argument("--changeset", action="store_true",
+                        help=f"Only the entries in {CHANGESET_PATH.name} (added, changed, removed)")
+    parser.add_argument("--replace", action="store_true", help="Delete every entry row before inserting")
+    parser.add_argument("--no-sqlite", action="store_true", help="Skip the local SQLite file")
+    parser.add_argument("--max-statement-bytes", type=int, default=MAX_STATEMENT_BYTES)
+    parser.add_argument("--max-file-bytes", type=int, default=MAX_FILE_BYTES)
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    print(f"Loaded {len(entries)} entries from {ENTRIES_PATH}")
+
+    if args.changeset:
+        changeset = load_json(CHANGESET_PATH)
+        print(f"Changeset: {changeset['counts']}")
+        statements = list(delete_statements(changeset["removed"]))
+        statements += upsert_statements(changeset["added"] + changeset["changed"], args.max_statement_bytes)
+    else:
+        statements = ["DELETE FROM entries;"] if args.replace else []
+        statements += upsert_statements(entries, args.max_statement_bytes)
+
+    paths = write_sql_files(statements, max_file_bytes=args.max_file_bytes)
+    total = sum(p.stat().st_size for p in paths)
+    print(f"Wrote {len(statements)} statements ({total / 1e6:.1f} MB) in {len(paths)} file(s) to {OUTPUT_DIR}")
+
+    if not args.no_sqlite:
+        sqlite_path = OUTPUT_DIR / "entries.sqlite"
+        conn = build_sqlite(sqlite_path, upsert_statements(entries, args.max_statement_bytes))
+        mismatched = check_round_trip(conn, entries)
+        conn.close()
+        print(f"Wrote {sqlite_path} ({len(entries)} entries, "
+              + ("all round-trip through the GET splice)" if not mismatched else f"{mismatched} do NOT round-trip)"))
+        if mismatched:
+            raise SystemExit(1)
+
+    print("\nApply with:")
+    for path in paths:
+        print(f"  npx wrangler d1 execute {database_name()} --remote --file {path.relative_to(ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
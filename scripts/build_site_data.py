@@ -1,27 +1,42 @@
 #!/usr/bin/env python3
-"""Build static JSON data for the Shipibo Dictionary site."""
+"""
+Build static JSON data for the Shipibo Dictionary site.
+
+Streams the extracted entries into site/data/entries.json, with ids from
+the id ledger (entry_ids.py), and writes the files the site derives from
+them (SiteData); with --follow it tails an input still being written.
+
+Usage:
+    python scripts/build_site_data.py
+    python scripts/build_site_data.py data/entries_translated.json
+    python scripts/build_site_data.py data/entries_translated.jsonl --follow
+    python scripts/build_site_data.py --compact
+"""
 
-import json
 import sys
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-OUTPUT = ROOT / "site" / "data" / "entries.json"
+from entry_ids import IdLedger
+from json_io import JsonArrayWriter, dump_json, iter_records
+from paths import DATA_DIR, ROOT, SITE_DATA_DIR
+
+OUTPUT = SITE_DATA_DIR / "entries.json"
 
 # Input file priority: CLI arg > vision pipeline > old pipeline
 _INPUT_CANDIDATES = [
-    ROOT / "data" / "entries_vision.json",
-    ROOT / "data" / "entries_vision_section_a.json",
-    ROOT / "data" / "entries_section_a_translated.json",
+    DATA_DIR / "entries_vision.json",
+    DATA_DIR / "entries_vision_section_a.json",
+    DATA_DIR / "entries_section_a_translated.json",
 ]
 
 
-def resolve_input():
-    if len(sys.argv) > 1:
-        p = Path(sys.argv[1])
+def resolve_input(args, follow=False):
+    if args:
+        p = Path(args[0])
         if not p.is_absolute():
             p = ROOT / p
-        if not p.exists():
+        # A followed input may not exist yet: iter_records waits for its writer
+        if not follow and not p.exists():
             print(f"Error: input file not found: {p}")
             sys.exit(1)
         return p
@@ -36,36 +51,110 @@ def strip_accents(s):
     return s.translate(str.maketrans("áéíóúÁÉÍÓÚ", "aeiouAEIOU"))
 
 
+def site_entry(entry, entry_id):
+    """Convert one extracted entry to the site's entry format."""
+    return {
+        "id": entry_id,
+        "headword": strip_accents(entry.get("headword", "")),
+        "part_of_speech": entry.get("part_of_speech"),
+        "variant_forms": entry.get("variant_forms", []),
+        "etymology": entry.get("etymology"),
+        "scientific_name": entry.get("scientific_name"),
+        "definitions_spanish": entry.get("definitions_spanish", []),
+        "definitions_english": entry.get("definitions_english", []),
+        "examples": entry.get("examples", []),
+        "synonyms": entry.get("synonyms", []),
+        "cross_references": entry.get("cross_references", []),
+        "grammatical_notes": entry.get("grammatical_notes"),
+        "page_number": entry.get("page_number"),
+    }
+
+
+class SiteData:
+    """The site files derived from the entries, fed one site entry at a time.
+
+    The builders are imported here rather than at the top, so importing
+    build_site_data (import_vocabulary.py does) stays within the
+    check-imports budget.
+    """
+
+    def __init__(self, compact=False):
+        from autocomplete_index import AutocompleteBuilder
+        from compact_entries import CompactEncoder
+        from entry_shards import EntryShardWriter
+        from meaning_index import MeaningIndexBuilder
+        from search_index import SearchIndexBuilder
+        from word_links import WordLinkBuilder
+
+        self.search = SearchIndexBuilder()
+        self.autocomplete = AutocompleteBuilder()
+        self.meaning = MeaningIndexBuilder()
+        self.links = WordLinkBuilder()
+        self.shards = EntryShardWriter()
+        self.compact = CompactEncoder() if compact else None
+
+    def add(self, entry):
+        self.search.add(entry)
+        self.autocomplete.add(entry)
+        self.meaning.add(entry)
+        self.links.add(entry)
+        self.shards.add(entry)
+        if self.compact:
+            self.compact.add(entry)
+
+    def close(self):
+        """Write the derived files, then publish them with entries.json."""
+        from autocomplete_index import INDEX_PATH as AUTOCOMPLETE_PATH
+        from compact_entries import COMPACT_PATH
+        from meaning_index import INDEX_PATH as MEANING_INDEX_PATH
+        from search_index import INDEX_PATH as SEARCH_INDEX_PATH
+        from site_artifacts import VERSIONS_PATH, publish
+        from word_links import LINKS_PATH, load_icaros
+
+        index = self.search.encode()
+        dump_json(SEARCH_INDEX_PATH, index)
+        print(f"Wrote {SEARCH_INDEX_PATH} ({len(index['terms'])} terms)")
+        completions = self.autocomplete.encode()
+        dump_json(AUTOCOMPLETE_PATH, completions)
+        print(f"Wrote {AUTOCOMPLETE_PATH} ({len(completions['keys'])} keys)")
+        meanings = self.meaning.encode()
+        dump_json(MEANING_INDEX_PATH, meanings)
+        print(f"Wrote {MEANING_INDEX_PATH} ({sum(len(t['stems']) for t in meanings['languages'].values())} stems)")
+        self.links.add_icaros(load_icaros())
+        links = self.links.encode()
+        dump_json(LINKS_PATH, links)
+        print(f"Wrote {LINKS_PATH} ({len(links['words'])} words linked)")
+        print(f"Wrote {len(self.shards.close()['shards'])} shards to {self.shards.out_dir}")
+        names = [OUTPUT.name, SEARCH_INDEX_PATH.name, AUTOCOMPLETE_PATH.name, MEANING_INDEX_PATH.name,
+                 LINKS_PATH.name]
+        if self.compact:
+            dump_json(COMPACT_PATH, self.compact.encode())
+            print(f"Wrote {COMPACT_PATH}")
+            names.append(COMPACT_PATH.name)
+        changed = publish(names)
+        print(f"Wrote {VERSIONS_PATH} (changed: {', '.join(changed) if changed else 'none'})")
+
+
 def main():
-    input_file = resolve_input()
-    print(f"Input: {input_file}")
-    entries = json.loads(input_file.read_text())
-    print(f"Loaded {len(entries)} entries")
-
-    print(f"Processing {len(entries)} entries")
-
-    result = []
-    for i, entry in enumerate(entries):
-        out = {
-            "id": i,
-            "headword": strip_accents(entry.get("headword", "")),
-            "part_of_speech": entry.get("part_of_speech"),
-            "variant_forms": entry.get("variant_forms", []),
-            "etymology": entry.get("etymology"),
-            "scientific_name": entry.get("scientific_name"),
-            "definitions_spanish": entry.get("definitions_spanish", []),
-            "definitions_english": entry.get("definitions_english", []),
-            "examples": entry.get("examples", []),
-            "synonyms": entry.get("synonyms", []),
-            "cross_references": entry.get("cross_references", []),
-            "grammatical_notes": entry.get("grammatical_notes"),
-            "page_number": entry.get("page_number"),
-        }
-        result.append(out)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    follow = "--follow" in sys.argv
+    input_file = resolve_input(args, follow)
+    print(f"Input: {input_file}" + (" (following)" if follow else ""))
+
+    ledger = IdLedger.load()  # before OUTPUT is rewritten: a new ledger is seeded from it
+    id_for = ledger.allocator()
 
     OUTPUT.parent.mkdir(parents=True, exist_ok=True)
-    OUTPUT.write_text(json.dumps(result, ensure_ascii=False))
-    print(f"Wrote {len(result)} entries to {OUTPUT}")
+    derived = SiteData(compact="--compact" in sys.argv)
+    with JsonArrayWriter(OUTPUT, pretty=True) as out:  # tracked in git: keep it diffable
+        for entry in iter_records(input_file, follow=follow):
+            entry_id = id_for(strip_accents(entry.get("headword", "")), entry.get("part_of_speech"))
+            record = site_entry(entry, entry_id)
+            out.write(record)
+            derived.add(record)
+    ledger.save()
+    print(f"Wrote {out.count} entries to {OUTPUT} ({ledger.added} new ids)")
+    derived.close()
 
 
 if __name__ == "__main__":
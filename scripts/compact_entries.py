@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Compact columnar encoding of the site entries, with its decoder.
+
+site/data/entries.json repeats every field name in every entry, spells out
+each empty [] and null, and repeats the same part-of-speech and source
+strings thousands of times. entries.compact.json stores one column per
+field instead:
+
+    {"version": 1, "count": 5228, "strings": ["noun", "Source: ...", ...],
+     "columns": [
+       {"name": "id", "values": [0, 1, ...]},                          # every row
+       {"name": "part_of_speech", "omit": "null", "interned": true,
+        "rows": [0, 1, 3, ...], "values": [4, 4, 0, ...]},             # sparse
+       {"name": "examples", "omit": "empty", "record_keys": ["shipibo", "spanish", "english"],
+        "rows": [...], "values": [[["Ainbo ...", "La mujer ...", "The woman ..."]], ...]},
+       {"name": "source", "omit": "missing", ...}]}
+
+- A column leaves out its most common empty value ("omit": null or []),
+  or the rows that lack the field altogether ("missing", e.g. source);
+  it then lists the rows it does hold, delta-coded.
+- String columns whose values repeat (four uses per distinct value or
+  more) hold indexes into the shared "strings" table.
+- Lists of records (examples) are stored as arrays in the column's most
+  common key order; a record with other keys stays an object.
+
+decode() rebuilds entries equal to the originals, including which fields
+are null, empty or absent. build_site_data.py --compact writes the file
+along with entries.json; bench_compact_entries.py compares size and parse
+time with the plain JSON.
+
+Usage:
+    python scripts/compact_entries.py           # encode site/data/entries.json
+    python scripts/compact_entries.py --check   # and verify it decodes to the same entries
+"""
+
+import argparse
+from collections import Counter
+from itertools import accumulate
+
+from json_io import dump_json, iter_records, load_json
+from paths import SITE_DATA_DIR
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+COMPACT_PATH = SITE_DATA_DIR / "entries.compact.json"
+
+MIN_USES_TO_INTERN = 4
+
+
+class CompactEncoder:
+    """Collects entries row by row; encode() produces the columnar form."""
+
+    def __init__(self):
+        self.count = 0
+        self.columns = {}  # field -> {row: value}, fields in first-seen order
+
+    def add(self, entry):
+        for name, value in entry.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = {}
+            column[self.count] = value
+        self.count += 1
+
+    def encode(self):
+        strings, string_ids = [], {}
+
+        def intern(value):
+            index = string_ids.get(value)
+            if index is None:
+                index = string_ids[value] = len(strings)
+                strings.append(value)
+            return index
+
+        columns = [self._encode_column(name, values, intern) for name, values in self.columns.items()]
+        return {"version": 1, "count": self.count, "strings": strings, "columns": columns}
+
+    def _encode_column(self, name, values, intern):
+        column = {"name": name}
+        if len(values) < self.count:
+            column["omit"] = "missing"
+        else:
+            empties = Counter("null" if v is None else "empty" for v in values.values() if v is None or v == [])
+            if empties:
+                column["omit"] = empties.most_common(1)[0][0]
+        if column.get("omit") == "null":
+            values = {row: v for row, v in values.items() if v is not None}
+        elif column.get("omit") == "empty":
+            values = {row: v for row, v in values.items() if v != []}
+        held = list(values.values())
+
+        strs = [v for v in held if isinstance(v, str)]
+        if strs and len(strs) == len(held) and len(strs) >= MIN_USES_TO_INTERN * len(set(strs)):
+            column["interned"] = True
+            held = [intern(v) for v in held]
+        else:
+            keys = _record_keys(held)
+            if keys:
+                column["record_keys"] = list(keys)
+                held = [[[record[k] for k in keys] if tuple(record) == keys else record for record in v]
+                        for v in held]
+
+        if len(values) < self.count:
+            rows = list(values)
+            column["rows"] = [row - prev for row, prev in zip(rows, [0] + rows[:-1])]
+        column["values"] = held
+        return column
+
+
+def _record_keys(values):
+    """The most common key tuple, when every value is a list of dicts."""
+    keys = Counter()
+    for value in values:
+        if not isinstance(value, list):
+            return None
+        for record in value:
+            if not isinstance(record, dict):
+                return None
+            keys[tuple(record)] += 1
+    return keys.most_common(1)[0][0] if keys else None
+
+
+def encode(entries):
+    encoder = CompactEncoder()
+    for entry in entries:
+        encoder.add(entry)
+    return encoder.encode()
+
+
+def decode(data):
+    """The entries as they were before encode()."""
+    count, strings = data["count"], data["strings"]
+    entries = [{} for _ in range(count)]
+    for column in data["columns"]:
+        name, values = column["name"], column["values"]
+        if column.get("interned"):
+            values = [strings[i] for i in values]
+        elif "record_keys" in column:
+            keys = column["record_keys"]
+            values = [[dict(zip(keys, record)) if isinstance(record, list) else record for record in value]
+                      for value in values]
+        if "rows" not in column:
+            for entry, value in zip(entries, values):
+                entry[name] = value
+            continue
+        held = dict(zip(accumulate(column["rows"]), values))
+        omit = column["omit"]
+        if omit == "missing":
+            for row, value in held.items():
+                entries[row][name] = value
+        elif omit == "null":
+            for row, entry in enumerate(entries):
+                entry[name] = held.get(row)
+        else:
+            for row, entry in enumerate(entries):
+                entry[name] = held[row] if row in held else []
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the compact columnar encoding of the site entries")
+    parser.add_argument("--check", action="store_true", help="Verify the file decodes to the same entries")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    dump_json(COMPACT_PATH, encode(entries))
+    before, after = ENTRIES_PATH.stat().st_size, COMPACT_PATH.stat().st_size
+    print(f"Wrote {COMPACT_PATH} ({len(entries)} entries, {after / 1e6:.2f} MB, "
+          f"{after / before:.0%} of {ENTRIES_PATH.name})")
+    if args.check:
+        if decode(load_json(COMPACT_PATH)) != entries:
+            raise SystemExit("Decoded entries differ from the originals")
+        print("Decoded entries match the originals")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,20 @@ set -euo pipefail
 # Usage: ./scripts/deploy-site.sh [--staging]
 #
 # How it works:
-# 1. Copies site/ to a temp build directory
-# 2. Gets the current git short hash
-# 3. Appends ?v=HASH to asset references in index.html
-# 4. Sets CACHE_NAME to "onanti-HASH" in service-worker.js
-# 5. Deploys from the temp dir
-# 6. Cleans up
+# 1. Publishes content-hashed, precompressed data (site/data/v/,
+#    site/data/versions.json) and lists the data files that differ from
+#    the deployed versions.json
+# 2. Copies site/ to a temp build directory
+# 3. Gets the current git short hash
+# 4. Appends ?v=HASH to asset references in index.html
+# 5. Sets CACHE_NAME to "onanti-HASH" in service-worker.js
+# 6. Deploys from the temp dir
+# 7. Cleans up
 #
 # Source files stay clean — local dev works without version strings.
+# Hashed data files keep their names while unchanged, so wrangler (which
+# skips files the project already has) does not upload them again, and
+# the service worker's data cache survives the new CACHE_NAME.
 
 PROJECT="shipibo-dictionary"
 BRANCH="main"
@@ -26,6 +32,10 @@ SITE_DIR="$PROJECT_ROOT/site"
 HASH="$(git -C "$PROJECT_ROOT" rev-parse --short HEAD)"
 BUILD_DIR="$(mktemp -d)"
 
+echo "==> Publishing site data"
+python3 "$PROJECT_ROOT/scripts/site_artifacts.py"
+python3 "$PROJECT_ROOT/scripts/site_artifacts.py" --compare "https://$PROJECT.pages.dev/data/versions.json"
+
 echo "==> Building with hash: $HASH"
 echo "==> Build dir: $BUILD_DIR"
 
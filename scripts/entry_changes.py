@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Emit the entries that changed since the last D1 import.
+
+Compares site/data/entries.json with data/entries_imported.json, the
+content hash of every entry as of the last successful import ({id: hash}),
+and writes data/entries_changeset.json:
+
+    {"counts": {...}, "added": [entry, ...], "changed": [entry, ...],
+     "removed": [id, ...], "hashes": {id: hash, ...}}
+
+Ids are stable (entry_ids.py), so an entry whose content did not change
+has the same id and hash as before and is left out. api/scripts/
+import-entries.js --changeset posts only added and changed entries,
+deletes the removed ids, and then writes "hashes" to
+data/entries_imported.json as the new baseline.
+
+Hashes are over the entry serialized with sorted keys by the standard
+json module, so they do not depend on the JSON backend.
+
+Usage:
+    python scripts/entry_changes.py                  # write the changeset
+    python scripts/entry_changes.py --dry-run        # only print counts
+    python scripts/entry_changes.py --mark-imported  # D1 already matches: record current hashes as the baseline
+"""
+
+import argparse
+import json
+from datetime import datetime
+
+from input_hash import input_hash
+from json_io import dump_json, iter_records, load_json
+from paths import DATA_DIR, SITE_DATA_DIR
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+IMPORTED_PATH = DATA_DIR / "entries_imported.json"
+CHANGESET_PATH = DATA_DIR / "entries_changeset.json"
+
+
+def content_hash(entry):
+    """Hash of an entry's full content, independent of key order and JSON backend."""
+    return input_hash(json.dumps(entry, sort_keys=True, ensure_ascii=False, separators=(",", ":")))
+
+
+def build_changeset(entries, imported):
+    """Diff entries against {id (str): hash} from the last import."""
+    added, changed = [], []
+    hashes = {}
+    for entry in entries:
+        key = str(entry["id"])
+        digest = content_hash(entry)
+        hashes[key] = digest
+        if key not in imported:
+            added.append(entry)
+        elif imported[key] != digest:
+            changed.append(entry)
+    removed = sorted(int(key) for key in imported.keys() - hashes.keys())
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "counts": {"added": len(added), "changed": len(changed), "removed": len(removed),
+                   "unchanged": len(hashes) - len(added) - len(changed)},
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "hashes": hashes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit entries changed since the last D1 import")
+    parser.add_argument("--dry-run", action="store_true", help="Print counts without writing the changeset")
+    parser.add_argument("--mark-imported", action="store_true",
+                        help="Record the current entries as imported (after a full import) and exit")
+    args = parser.parse_args()
+
+    imported = load_json(IMPORTED_PATH) if IMPORTED_PATH.exists() else {}
+    if not imported:
+        print(f"No {IMPORTED_PATH.name}: every entry counts as added")
+    changeset = build_changeset(iter_records(ENTRIES_PATH), imported)
+
+    if args.mark_imported:
+        dump_json(IMPORTED_PATH, changeset["hashes"])
+        print(f"Wrote {IMPORTED_PATH} ({len(changeset['hashes'])} entries)")
+        return
+
+    counts = changeset["counts"]
+    print(f"Added: {counts['added']}, changed: {counts['changed']}, "
+          f"removed: {counts['removed']}, unchanged: {counts['unchanged']}")
+    if args.dry_run:
+        print("[Dry run — no files written]")
+        return
+    dump_json(CHANGESET_PATH, changeset)
+    print(f"Wrote {CHANGESET_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Stable entry ids from a persistent headword -> id ledger.
+
+Entry ids are public: site URLs (#/entry/<id>), bookmarks and D1 rows all
+refer to them. They used to be list positions, so one new word shifted
+thousands of ids. build_site_data.py and import_vocabulary.py now take
+ids from data/entry_ids.json instead, which maps an identity key to the
+id it was first given:
+
+    "<headword>|<part of speech>"       e.g. "jene|noun"
+    "<headword>|<part of speech>#<n>"   the nth homograph in source order
+
+An entry keeps its id however the list is sorted or grown; a new entry
+gets the next unused id, and ids of removed entries are never handed out
+again (they come back if the entry does). When the ledger does not exist
+yet, it is seeded from the ids already in site/data/entries.json, so the
+deployed ids stay valid. Keep the ledger under version control with the
+site data.
+
+Usage:
+    ledger = IdLedger.load()
+    id_for = ledger.allocator()   # one per pass over a full entry list
+    for entry in entries:
+        entry["id"] = id_for(entry["headword"], entry["part_of_speech"])
+    ledger.save()
+"""
+
+from collections import Counter
+
+from json_io import dump_json, iter_records, load_json
+from paths import DATA_DIR, SITE_DATA_DIR
+
+LEDGER_PATH = DATA_DIR / "entry_ids.json"
+SEED_PATH = SITE_DATA_DIR / "entries.json"
+
+
+class IdLedger:
+    """Identity key -> entry id, plus the next id to hand out."""
+
+    def __init__(self, ids=None, next_id=0, path=LEDGER_PATH):
+        self.ids = ids or {}
+        self.next_id = max(next_id, max(self.ids.values(), default=-1) + 1)
+        self.path = path
+        self.added = 0  # keys allocated since load
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path=LEDGER_PATH, seed=SEED_PATH):
+        """Load the ledger, or seed a new one from the ids in an existing entry file."""
+        if path.exists():
+            data = load_json(path)
+            return cls(data["ids"], data["next_id"], path)
+        ledger = cls(path=path)
+        if seed and seed.exists():
+            id_for = ledger.allocator()
+            for record in iter_records(seed):
+                if record.get("id") is not None:
+                    id_for(record.get("headword", ""), record.get("part_of_speech"), record["id"])
+            ledger.added = 0
+            print(f"Seeded id ledger from {seed} ({len(ledger.ids)} ids)")
+        return ledger
+
+    def allocator(self):
+        """Return id_for(headword, part_of_speech) for one pass over a full entry list.
+
+        Homographs are told apart by their order within the pass, so pass
+        the entries in a stable order (dictionary order, or a stable sort of it).
+        """
+        seen = Counter()
+
+        def id_for(headword, part_of_speech, seed_id=None):
+            base = f"{headword}|{part_of_speech or ''}"
+            seen[base] += 1
+            key = base if seen[base] == 1 else f"{base}#{seen[base]}"
+            entry_id = self.ids.get(key)
+            if entry_id is None:
+                entry_id = self.next_id if seed_id is None else seed_id
+                self.ids[key] = entry_id
+                self.next_id = max(self.next_id, entry_id + 1)
+                self.added += 1
+                self.dirty = True
+            return entry_id
+
+        return id_for
+
+    def save(self):
+        """Write the ledger if any id was allocated."""
+        if self.dirty:
+            dump_json(self.path, {"next_id": self.next_id, "ids": dict(sorted(self.ids.items()))}, pretty=True)
+            self.dirty = False
@@ -0,0 +1,256 @@
+"""
+Compact in-memory model for dictionary entries and course vocabulary.
+
+Scripts that hold every entry at once (import_vocabulary.py, benchmarks,
+later indexes) use these classes instead of plain dicts. Each uses
+__slots__; list fields loaded from JSON are stored as tuples (empty ones
+share the single empty tuple); and categorical strings (part of speech,
+source notes, "basic_course:1.2"-style source tags) are interned, so
+thousands of records share one copy. On entries_with_vocabulary.json that
+roughly halves the memory of the dict version, at the price of a slower
+load and dump (from_dict/to_dict run in Python; see bench_entry_model.py).
+
+from_dict()/to_dict() convert to and from the JSON shape. Keys a record
+does not know (the vision output has a few misspelled ones) are kept in
+.extra and written back after the known fields, and an example that is
+not exactly {shipibo, spanish, english} stays a plain dict. Entries
+always write their core fields; id, source and extra only when set.
+
+Records built in code get fresh lists, so they can be appended to;
+records loaded from JSON hold tuples, so assign to change them.
+
+Usage:
+    from entry_model import Entry, load_entries, dump_entries
+    entries = load_entries(SITE_DATA_DIR / "entries.json")
+    entries[0].definitions_english = ["water"]
+    dump_entries(SITE_DATA_DIR / "entries.json", entries)
+"""
+
+import sys
+
+from json_io import JsonArrayWriter, iter_records
+
+_intern = sys.intern
+
+
+def _interned(value):
+    return _intern(value) if value.__class__ is str else value
+
+
+def _interned_all(values):
+    return tuple(_intern(v) if v.__class__ is str else v for v in values) if values else ()
+
+
+def _extra(d, known):
+    if d.keys() <= known:
+        return None
+    return {k: v for k, v in d.items() if k not in known}
+
+
+class Example:
+    """A usage example: Shipibo sentence with Spanish and English translations."""
+
+    __slots__ = ("shipibo", "spanish", "english")
+    KEYS = frozenset(__slots__)
+
+    def __init__(self, shipibo, spanish=None, english=None):
+        self.shipibo = shipibo
+        self.spanish = spanish
+        self.english = english
+
+    @classmethod
+    def from_value(cls, value):
+        """An Example for a well-formed example dict; anything else is kept as-is."""
+        if value.__class__ is not dict or value.keys() != cls.KEYS:
+            return value
+        example = cls.__new__(cls)
+        example.shipibo = value["shipibo"]
+        example.spanish = value["spanish"]
+        example.english = value["english"]
+        return example
+
+    def to_dict(self):
+        return {"shipibo": self.shipibo, "spanish": self.spanish, "english": self.english}
+
+    def __eq__(self, other):
+        return isinstance(other, Example) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Example({self.shipibo!r})"
+
+
+def _example_dict(example):
+    return example.to_dict() if example.__class__ is Example else example
+
+
+class Entry:
+    """A dictionary entry in the site format (site/data/entries.json)."""
+
+    __slots__ = (
+        "id", "headword", "part_of_speech", "variant_forms", "etymology", "scientific_name",
+        "definitions_spanish", "definitions_english", "examples", "synonyms", "cross_references",
+        "grammatical_notes", "page_number", "source", "extra",
+    )
+    KEYS = frozenset(__slots__) - {"extra"}
+
+    def __init__(self, headword, id=None, part_of_speech=None, variant_forms=None, etymology=None,
+                 scientific_name=None, definitions_spanish=None, definitions_english=None,
+                 examples=None, synonyms=None, cross_references=None, grammatical_notes=None,
+                 page_number=0, source=None, extra=None):
+        self.id = id
+        self.headword = headword
+        self.part_of_speech = _interned(part_of_speech)
+        self.variant_forms = [] if variant_forms is None else variant_forms
+        self.etymology = etymology
+        self.scientific_name = scientific_name
+        self.definitions_spanish = [] if definitions_spanish is None else definitions_spanish
+        self.definitions_english = [] if definitions_english is None else definitions_english
+        self.examples = [] if examples is None else examples
+        self.synonyms = [] if synonyms is None else synonyms
+        self.cross_references = [] if cross_references is None else cross_references
+        self.grammatical_notes = grammatical_notes
+        self.page_number = page_number
+        self.source = _interned(source)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        entry = cls.__new__(cls)
+        entry.id = get("id")
+        entry.headword = get("headword", "")
+        entry.part_of_speech = _interned(get("part_of_speech"))
+        entry.variant_forms = tuple(get("variant_forms") or ())
+        entry.etymology = get("etymology")
+        entry.scientific_name = get("scientific_name")
+        entry.definitions_spanish = tuple(get("definitions_spanish") or ())
+        entry.definitions_english = tuple(get("definitions_english") or ())
+        entry.examples = tuple(map(Example.from_value, get("examples") or ()))
+        entry.synonyms = tuple(get("synonyms") or ())
+        entry.cross_references = tuple(get("cross_references") or ())
+        entry.grammatical_notes = get("grammatical_notes")
+        entry.page_number = get("page_number", 0)
+        entry.source = _interned(get("source"))
+        entry.extra = _extra(d, cls.KEYS)
+        return entry
+
+    def to_dict(self):
+        d = {} if self.id is None else {"id": self.id}
+        d["headword"] = self.headword
+        d["part_of_speech"] = self.part_of_speech
+        d["variant_forms"] = list(self.variant_forms)
+        d["etymology"] = self.etymology
+        d["scientific_name"] = self.scientific_name
+        d["definitions_spanish"] = list(self.definitions_spanish)
+        d["definitions_english"] = list(self.definitions_english)
+        d["examples"] = [_example_dict(x) for x in self.examples]
+        d["synonyms"] = list(self.synonyms)
+        d["cross_references"] = list(self.cross_references)
+        d["grammatical_notes"] = self.grammatical_notes
+        d["page_number"] = self.page_number
+        if self.source is not None:
+            d["source"] = self.source
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Entry({self.id!r}, {self.headword!r})"
+
+
+class VocabWord:
+    """A course vocabulary word (vocabulary_merged.json "words")."""
+
+    __slots__ = ("shipibo", "part_of_speech", "meaning", "sources", "context", "extra")
+    KEYS = frozenset(__slots__) - {"extra"}
+
+    def __init__(self, shipibo, part_of_speech=None, meaning="", sources=None, context=None, extra=None):
+        self.shipibo = shipibo
+        self.part_of_speech = _interned(part_of_speech)
+        self.meaning = meaning
+        self.sources = [] if sources is None else sources
+        self.context = context
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        word = cls.__new__(cls)
+        word.shipibo = get("shipibo", "")
+        word.part_of_speech = _interned(get("part_of_speech"))
+        word.meaning = get("meaning", "")
+        word.sources = _interned_all(get("sources"))
+        word.context = get("context")
+        word.extra = _extra(d, cls.KEYS)
+        return word
+
+    def to_dict(self):
+        d = {
+            "shipibo": self.shipibo,
+            "part_of_speech": self.part_of_speech,
+            "meaning": self.meaning,
+            "sources": list(self.sources),
+        }
+        if self.context is not None:
+            d["context"] = self.context
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"VocabWord({self.shipibo!r})"
+
+
+class VocabSuffix:
+    """A course suffix (vocabulary_merged.json "suffixes")."""
+
+    __slots__ = ("form", "meaning", "usage", "examples", "sources", "extra")
+    KEYS = frozenset(__slots__) - {"extra"}
+
+    def __init__(self, form, meaning="", usage="", examples=None, sources=None, extra=None):
+        self.form = form
+        self.meaning = meaning
+        self.usage = usage
+        self.examples = [] if examples is None else examples
+        self.sources = [] if sources is None else sources
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d):
+        get = d.get
+        suffix = cls.__new__(cls)
+        suffix.form = get("form", "")
+        suffix.meaning = get("meaning", "")
+        suffix.usage = get("usage", "")
+        suffix.examples = tuple(get("examples") or ())
+        suffix.sources = _interned_all(get("sources"))
+        suffix.extra = _extra(d, cls.KEYS)
+        return suffix
+
+    def to_dict(self):
+        d = {
+            "form": self.form,
+            "meaning": self.meaning,
+            "usage": self.usage,
+            "examples": list(self.examples),
+            "sources": list(self.sources),
+        }
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"VocabSuffix({self.form!r})"
+
+
+def load_entries(path):
+    """Load an entry file (.json or .jsonl, streamed) as a list of Entry."""
+    return [Entry.from_dict(d) for d in iter_records(path)]
+
+
+def dump_entries(path, entries):
+    """Write entries as a one-record-per-line JSON array. Returns the count."""
+    with JsonArrayWriter(path) as out:
+        for entry in entries:
+            out.write(entry.to_dict())
+    return out.count
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Letter-sharded site entries with a manifest, for lazy loading.
+
+The site downloads every entry before it renders anything, though the
+browse view only ever shows one initial letter at a time. build_site_data.py
+and import_vocabulary.py now also write the entries split by initial letter
+to site/data/shards/:
+
+    entries-a.json, entries-b.json, ...   one JSON array per letter
+    entries-d-h.json                      a run of small letters and the next one
+    manifest.json
+
+    {"version": 1, "entries": 5228,
+     "shards": [{"file": "entries-a.json", "letters": ["a", "ã"], "count": 236,
+                 "bytes": 81234, "hash": "3f1c..."}, ...]}
+
+A letter is what the browse view files an entry under (site/app.js
+computeLetters: the headword's first character after a leading dash,
+lowercased); accented letters go to the shard of their base letter, and
+anything else to "other". A letter with fewer than MIN_SHARD_ENTRIES
+entries is combined with the letters after it (a small last run with the
+run before), so no request is for a handful of entries. Each shard keeps
+the order entries were written in.
+
+The shards are for a loader that paints the browse view from the
+manifest and the one shard holding the letter on screen; site/app.js does
+not have one yet and still loads every entry from /api/entries. The hash
+is over the file's bytes, so such a loader can fetch shards as
+<file>?v=<hash> and cache each one until it changes.
+
+Usage:
+    python scripts/entry_shards.py   # rebuild from site/data/entries.json
+"""
+
+import re
+import unicodedata
+
+from input_hash import input_hash
+from json_io import JsonArrayWriter, dump_json, iter_records
+from paths import SITE_DATA_DIR
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+SHARDS_DIR = SITE_DATA_DIR / "shards"
+MANIFEST_PATH = SHARDS_DIR / "manifest.json"
+
+MIN_SHARD_ENTRIES = 100
+
+_KEY_RE = re.compile(r"[a-z0-9]")
+
+
+def browse_letter(headword):
+    """The letter the browse view lists an entry under ("" for none)."""
+    clean = headword[1:] if headword[:1] in ("-", "—") else headword
+    return clean[:1].lower()
+
+
+def shard_key(letter):
+    """File key for a letter: its base letter, or "other"."""
+    base = unicodedata.normalize("NFD", letter)[:1]
+    return base if _KEY_RE.fullmatch(base) else "other"
+
+
+class EntryShardWriter:
+    """Streams site entries into per-letter shard files; close() writes the manifest."""
+
+    def __init__(self, out_dir=SHARDS_DIR, min_entries=MIN_SHARD_ENTRIES):
+        self.out_dir = out_dir
+        self.min_entries = min_entries
+        self.writers = {}  # shard key -> JsonArrayWriter
+        self.letters = {}  # shard key -> set of browse letters
+        self.count = 0
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for old in out_dir.glob("entries-*.json"):
+            old.unlink()
+
+    def add(self, entry):
+        letter = browse_letter(entry.get("headword") or "")
+        key = shard_key(letter)
+        writer = self.writers.get(key)
+        if writer is None:
+            writer = self.writers[key] = JsonArrayWriter(self.out_dir / f"entries-{key}.json")
+            self.letters[key] = set()
+        writer.write(entry)
+        if letter:
+            self.letters[key].add(letter)
+        self.count += 1
+
+    def close(self):
+        """Finish the shards, combine small ones, and write the manifest; returns it."""
+        for writer in self.writers.values():
+            writer.close()
+        keys = sorted(k for k in self.writers if k != "other") + (["other"] if "other" in self.writers else [])
+        shards = [self._combine(group) for group in self._groups(keys)]
+        manifest = {"version": 1, "entries": self.count, "shards": shards}
+        dump_json(self.out_dir / MANIFEST_PATH.name, manifest)
+        return manifest
+
+    def _groups(self, keys):
+        """Runs of consecutive keys, each closed once it holds min_entries entries."""
+        groups, size = [[]], 0
+        for key in keys:
+            groups[-1].append(key)
+            size += self.writers[key].count
+            if size >= self.min_entries:
+                groups.append([])
+                size = 0
+        last = groups.pop()
+        if last and groups:
+            groups[-1] += last
+        elif last:
+            groups.append(last)
+        return groups
+
+    def _combine(self, group):
+        if len(group) == 1:
+            path = self.writers[group[0]].path
+        else:
+            path = self.out_dir / f"entries-{group[0]}-{group[-1]}.json"
+            with JsonArrayWriter(path) as out:
+                for key in group:
+                    part = self.writers[key].path
+                    out.write_many(iter_records(part))
+                    part.unlink()
+        data = path.read_bytes()
+        return {
+            "file": path.name,
+            "letters": sorted(set().union(*(self.letters[k] for k in group))),
+            "count": sum(self.writers[k].count for k in group),
+            "bytes": len(data),
+            "hash": input_hash(data),
+        }
+
+
+def main():
+    shards = EntryShardWriter()
+    for entry in iter_records(ENTRIES_PATH):
+        shards.add(entry)
+    manifest = shards.close()
+    print(f"Wrote {len(manifest['shards'])} shards of {manifest['entries']} entries to {SHARDS_DIR}")
+    for shard in manifest["shards"]:
+        print(f"  {shard['file']:<22} {shard['count']:>6} entries {shard['bytes'] / 1e3:>8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,15 +9,15 @@ Usage:
 """
 
 import argparse
-import json
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
-BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "data"
-COURSE_DIR = BASE_DIR / "courses" / "basic_course"
+from json_io import dump_json
+from paths import COURSES_DIR, DATA_DIR
+
+COURSE_DIR = COURSES_DIR / "basic_course"
 
 MODULE_DIRS = {
     1: COURSE_DIR / "Module 1",
@@ -104,8 +104,7 @@ def main():
         "files": results,
     }
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    dump_json(output_file, output, pretty=True)
 
     print(f"\nSaved to {output_file}")
 
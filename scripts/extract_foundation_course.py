@@ -8,11 +8,11 @@ so we render pages as images and send them to Claude's vision API.
 Usage:
     python scripts/extract_foundation_course.py
     python scripts/extract_foundation_course.py --restart  # ignore cache
+    python scripts/extract_foundation_course.py --incremental  # redo pages whose inputs changed
 """
 
 import argparse
 import base64
-import json
 import os
 import sys
 import time
@@ -23,12 +23,18 @@ import pymupdf
 from dotenv import load_dotenv
 import anthropic
 
-BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "data"
-COURSE_DIR = BASE_DIR / "courses" / "foundation_course"
+from input_hash import input_hash
+from json_io import dump_json, load_json
+from paths import COURSES_DIR, DATA_DIR, ENV_FILE
+from structured_output import VOCABULARY_TOOL, request_items
+
+COURSE_DIR = COURSES_DIR / "foundation_course"
 CACHE_DIR = DATA_DIR / "foundation_course_parsed"
 
-load_dotenv(BASE_DIR / ".env")
+load_dotenv(ENV_FILE)
+
+VISION_MODEL = "claude-haiku-4-5-20251001"
+ZOOM = 2.0
 
 VOCAB_PROMPT = """You are extracting Shipibo-Konibo language vocabulary from a course PDF page.
 
@@ -61,33 +67,31 @@ For each PREFIX:
 - "usage": grammatical note
 - "examples": array of examples
 
-Return JSON:
-{{
-  "words": [...],
-  "suffixes": [...],
-  "prefixes": [],
-  "page_description": "brief description of what this page contains"
-}}
+Record everything with the record_vocabulary tool: the "words", "suffixes" and "prefixes" arrays,
+plus "page_description" (a brief description of what this page contains).
 
-If the page has no extractable vocabulary (e.g. it's a cover page, image-only art, etc.), return empty arrays.
-Return ONLY valid JSON."""
+If the page has no extractable vocabulary (e.g. it's a cover page, image-only art, etc.), record empty arrays."""
 
 
-def render_page_to_base64(doc, page_num: int, zoom: float = 2.0) -> str:
-    """Render a PDF page to a base64-encoded PNG."""
+def render_page_png(doc, page_num: int, zoom: float = ZOOM) -> bytes:
+    """Render a PDF page to PNG bytes."""
     page = doc[page_num]
     mat = pymupdf.Matrix(zoom, zoom)
     pix = page.get_pixmap(matrix=mat)
-    png_bytes = pix.tobytes("png")
-    return base64.standard_b64encode(png_bytes).decode("utf-8")
+    return pix.tobytes("png")
+
+
+def page_input_hash(png_bytes: bytes) -> str:
+    """Hash a page's inputs: image bytes, prompt, model and zoom."""
+    return input_hash(png_bytes, VOCAB_PROMPT, VISION_MODEL, ZOOM)
 
 
-def parse_page_with_vision(client: anthropic.Anthropic, image_b64: str, pdf_name: str, page_num: int) -> dict:
-    """Send a page image to Claude vision API for vocabulary extraction."""
+def parse_page_with_vision(client: anthropic.Anthropic, image_b64: str, pdf_name: str, page_num: int) -> dict | None:
+    """Send a page image to Claude vision API for vocabulary extraction (None on an API error)."""
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=4096,
+        result, _ = request_items(
+            client,
+            VOCABULARY_TOOL,
             messages=[{
                 "role": "user",
                 "content": [
@@ -105,36 +109,18 @@ def parse_page_with_vision(client: anthropic.Anthropic, image_b64: str, pdf_name
                     },
                 ],
             }],
+            model=VISION_MODEL,
+            max_tokens=4096,
+            label=f"{pdf_name} p{page_num}",
         )
-
-        response_text = response.content[0].text.strip()
-
-        if response_text.startswith("{"):
-            json_text = response_text
-        else:
-            start = response_text.find("{")
-            end = response_text.rfind("}") + 1
-            if start >= 0 and end > start:
-                json_text = response_text[start:end]
-            else:
-                print(f"    Warning: No JSON in response for {pdf_name} p{page_num}")
-                return {"words": [], "suffixes": [], "prefixes": []}
-
-        result = json.loads(json_text)
-        result.setdefault("words", [])
-        result.setdefault("suffixes", [])
-        result.setdefault("prefixes", [])
         return result
 
-    except json.JSONDecodeError as e:
-        print(f"    Warning: JSON parse error for {pdf_name} p{page_num}: {e}")
-        return {"words": [], "suffixes": [], "prefixes": []}
     except anthropic.APIError as e:
         print(f"    Warning: API error for {pdf_name} p{page_num}: {e}")
-        return {"words": [], "suffixes": [], "prefixes": []}
+        return None
 
 
-def process_pdf(client: anthropic.Anthropic, pdf_path: Path, restart: bool = False):
+def process_pdf(client: anthropic.Anthropic, pdf_path: Path, restart: bool = False, incremental: bool = False):
     """Process all pages of a PDF through vision API."""
     pdf_name = pdf_path.stem
     doc = pymupdf.open(str(pdf_path))
@@ -146,10 +132,18 @@ def process_pdf(client: anthropic.Anthropic, pdf_path: Path, restart: bool = Fal
 
     for page_num in range(num_pages):
         cache_file = CACHE_DIR / f"{pdf_name}_page{page_num + 1}.json"
+        png_bytes = None
+        result = None
 
         if cache_file.exists() and not restart:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                result = json.load(f)
+            result = load_json(cache_file)
+            if incremental:
+                png_bytes = render_page_png(doc, page_num)
+                if result.get("input_hash") != page_input_hash(png_bytes):
+                    print(f"  Page {page_num + 1}/{num_pages} (inputs changed, re-extracting)")
+                    result = None
+
+        if result is not None:
             w = len(result.get("words", []))
             s = len(result.get("suffixes", []))
             p = len(result.get("prefixes", []))
@@ -160,15 +154,21 @@ def process_pdf(client: anthropic.Anthropic, pdf_path: Path, restart: bool = Fal
 
         print(f"  Page {page_num + 1}/{num_pages}...", end=" ", flush=True)
 
-        image_b64 = render_page_to_base64(doc, page_num)
+        if png_bytes is None:
+            png_bytes = render_page_png(doc, page_num)
+        image_b64 = base64.standard_b64encode(png_bytes).decode("utf-8")
         result = parse_page_with_vision(client, image_b64, pdf_name, page_num + 1)
+        if result is None:
+            # Not cached, so the next run (--incremental included) extracts it again
+            print("failed, not cached")
+            continue
 
         result["pdf"] = pdf_path.name
         result["page"] = page_num + 1
+        result["input_hash"] = page_input_hash(png_bytes)
         result["parsed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        dump_json(cache_file, result)
 
         w = len(result.get("words", []))
         s = len(result.get("suffixes", []))
@@ -186,6 +186,8 @@ def process_pdf(client: anthropic.Anthropic, pdf_path: Path, restart: bool = Fal
 def main():
     parser = argparse.ArgumentParser(description="Extract foundation course vocabulary via vision")
     parser.add_argument("--restart", action="store_true", help="Ignore cached results")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-extract only pages whose input hash (image, prompt, model, zoom) changed")
     args = parser.parse_args()
 
     if not os.environ.get("ANTHROPIC_API_KEY"):
@@ -209,7 +211,7 @@ def main():
             print(f"Warning: {pdf_path} not found, skipping")
             continue
 
-        results = process_pdf(client, pdf_path, args.restart)
+        results = process_pdf(client, pdf_path, args.restart, args.incremental)
 
         for r in results:
             source_tag = f"{pdf_path.stem}:p{r.get('page', '?')}"
@@ -239,8 +241,7 @@ def main():
     }
 
     output_file = DATA_DIR / "foundation_course_vocabulary.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    dump_json(output_file, output, pretty=True)
 
     print(f"\nSaved: {output_file}")
     print(f"  Words: {len(all_words)}")
@@ -5,9 +5,13 @@ import json
 import re
 import os
 
+from json_io import dump_json
+from paths import DATA_DIR, SITE_DATA_DIR
+from structured_output import validate_icaro
+
 TASK_DIR = "/private/tmp/claude-501/-Users-brett-code-shipibo-dictionary/tasks"
-OUTPUT_DATA = "/Users/brett/code/shipibo_dictionary/data/icaros.json"
-OUTPUT_SITE = "/Users/brett/code/shipibo_dictionary/site/data/icaros.json"
+OUTPUT_DATA = DATA_DIR / "icaros.json"
+OUTPUT_SITE = SITE_DATA_DIR / "icaros.json"
 
 # File definitions: (filename, line_index of assistant text, is_array)
 FILES = [
@@ -79,6 +83,12 @@ def main():
 
         data = extract_json_from_text(best_text, is_array)
 
+        # Validate each icaro individually so one bad item doesn't drop the file
+        for icaro in (data if is_array else [data]):
+            errors = validate_icaro(icaro)
+            if errors:
+                print(f"  Warning: icaro {icaro.get('id', '?')} failed validation: {'; '.join(errors[:3])}")
+
         if is_array:
             print(f"  Extracted {len(data)} icaros (ids: {[d['id'] for d in data]})")
             all_icaros.extend(data)
@@ -94,8 +104,7 @@ def main():
     # Write output files
     for outpath in [OUTPUT_DATA, OUTPUT_SITE]:
         os.makedirs(os.path.dirname(outpath), exist_ok=True)
-        with open(outpath, 'w') as f:
-            json.dump(all_icaros, f, indent=2, ensure_ascii=False)
+        dump_json(outpath, all_icaros, pretty=True)  # both are tracked in git
         print(f"Wrote {outpath}")
 
 
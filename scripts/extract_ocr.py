@@ -5,14 +5,15 @@ Step 1: Extract raw OCR text from PDF and cache it.
 This separates OCR (slow, deterministic) from parsing (fast, iterative).
 """
 
-import json
 import sys
-from pathlib import Path
 
 import pymupdf
 import pytesseract
 from PIL import Image
 
+from json_io import dump_json
+from paths import DATA_DIR, PDF_PATH
+
 
 def extract_page_image(doc, page_num: int, zoom: float = 2.0) -> Image.Image:
     """Extract a page as a PIL Image."""
@@ -46,8 +47,8 @@ def extract_all_pages(pdf_path: str, start_page: int, end_page: int) -> dict:
 
 
 def main():
-    pdf_path = Path(__file__).parent.parent / 'shipibo.pdf'
-    data_dir = Path(__file__).parent.parent / 'data'
+    pdf_path = PDF_PATH
+    data_dir = DATA_DIR
     data_dir.mkdir(exist_ok=True)
 
     doc = pymupdf.open(str(pdf_path))
@@ -79,8 +80,7 @@ def main():
     pages = extract_all_pages(str(pdf_path), start_page, end_page)
 
     # Save to JSON
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(pages, f, ensure_ascii=False, indent=2)
+    dump_json(output_file, pages, pretty=True)
 
     print(f"Saved {len(pages)} pages of OCR text to {output_file}")
 
@@ -10,33 +10,13 @@ import json
 import re
 import sys
 from pathlib import Path
-from dataclasses import dataclass, field, asdict
 from typing import Optional
 
 import pymupdf
 import pytesseract
 from PIL import Image
 
-
-@dataclass
-class Example:
-    shipibo: str
-    spanish: str
-
-
-@dataclass
-class Entry:
-    headword: str
-    part_of_speech: Optional[str] = None
-    variant_forms: list[str] = field(default_factory=list)
-    etymology: Optional[str] = None
-    definitions_spanish: list[str] = field(default_factory=list)
-    definitions_english: list[str] = field(default_factory=list)
-    examples: list[dict] = field(default_factory=list)
-    synonyms: list[str] = field(default_factory=list)
-    cross_references: list[str] = field(default_factory=list)
-    grammatical_notes: Optional[str] = None
-    page_number: int = 0
+from entry_model import Entry
 
 
 def extract_page_image(doc, page_num: int, zoom: float = 2.0) -> Image.Image:
@@ -255,7 +235,7 @@ def parse_single_entry(text: str, page_num: int) -> Optional[Entry]:
 def entries_to_json(entries: list[Entry]) -> str:
     """Convert entries to JSON string."""
     return json.dumps(
-        [asdict(e) for e in entries],
+        [e.to_dict() for e in entries],
         ensure_ascii=False,
         indent=2
     )
@@ -12,6 +12,7 @@ import base64
 import io
 import json
 import os
+import socket
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -24,11 +25,14 @@ from PIL import Image
 from dotenv import load_dotenv
 import anthropic
 
-load_dotenv(Path(__file__).parent.parent / '.env')
+from input_hash import input_hash, load_stamps, save_stamps
+from json_io import dump_json, dump_jsonl, iter_records, jsonl_sibling, load_json
+from paths import DATA_DIR, ENV_FILE, PDF_PATH
+from progress_journal import ProgressJournal
+from structured_output import TRANSLATED_ENTRIES_TOOL, request_items
+from work_queue import POLL_SECONDS, LeaseKeeper, WorkQueue
 
-ROOT = Path(__file__).resolve().parent.parent
-PDF_PATH = ROOT / "shipibo.pdf"
-DATA_DIR = ROOT / "data"
+load_dotenv(ENV_FILE)
 
 # Dictionary spans PDF pages 85–549 (1-indexed)
 DICT_START = 85
@@ -42,6 +46,34 @@ SECTION_A_END = 98
 SAMPLE_START = 85
 SAMPLE_END = 87
 
+VISION_MODEL = "claude-sonnet-4-5-20250929"
+ZOOM = 2.0  # page render scale; part of each page's input hash
+
+# Shared work queue for multi-process runs (--queue)
+DEFAULT_QUEUE = DATA_DIR / "entries_vision.queue.sqlite"
+
+# Page tiling: pages whose estimated output exceeds the threshold are split
+# into column (and half-page) tiles so no single request runs long or hits
+# max_tokens. Estimates come from previous vision runs, else OCR text length.
+MAX_TOKENS = 16384
+TILE_THRESHOLD = 4500      # estimated output tokens before a page is split (~1.5x a typical page)
+TILE_OVERLAP = 0.06        # fraction of page width/height shared at tile seams
+CHARS_PER_TOKEN = 3        # rough JSON output chars per token (accented Spanish/Shipibo)
+OCR_TOKENS_PER_CHAR = 0.9  # vision output is ~2.7x the OCR text length (structured + translated)
+# OCR caches keyed by PDF page number (ocr_section_a.json uses section-relative pages)
+OCR_CACHE_FILES = ["ocr_full.json", "ocr_sample.json"]
+
+TILE_PROMPT_SUFFIX = """
+
+## This image is a TILE of the page ({tile})
+
+The page was cut into overlapping tiles, so text at the edges of this image may be cut off.
+- Include every entry whose bold headword is visible in this tile
+- If an entry's headword is cut off at the top or side edge, skip it — the neighbouring tile has it
+- If an entry continues past the bottom or side edge, extract whatever is visible
+
+Record the entries:"""
+
 VISION_PROMPT = """You are extracting entries from a scanned page of a Shipibo-Spanish dictionary.
 
 ## How to identify dictionary entries
@@ -79,48 +111,224 @@ Entries may also have multiple "-Úsase" usage notes describing different gramma
 
 ## Rules
 
-- Return ONLY a valid JSON array of entry objects — no markdown, no explanation
+- Record the entries with the record_entries tool — no other output
 - Include every distinct headword entry visible on the page
 - When an entry has multiple numbered definitions (1:, 2:), include ALL in definitions_spanish and definitions_english
 - When a suffix like "-a" has multiple grammatical uses (each with "-Úsase..."), combine them as multiple definitions in ONE entry, unless the dictionary clearly marks them as separate entries (separate bold headwords with separate POS markers)
 - Read the page carefully — the text is in two columns, read left column fully then right column
 
-Return the JSON array:"""
+Record the entries:"""
+
+
+def load_page_cost_history(data_dir):
+    """Estimate output tokens per page from previous vision runs.
+
+    Returns dict of page_num -> estimated tokens, taking the largest estimate
+    when a page appears in several output files.
+    """
+    history = {}
+    for path in sorted(data_dir.glob("entries_vision*.json")):
+        try:
+            entries = load_json(path)
+        except (json.JSONDecodeError, OSError):
+            continue
+        per_page = {}
+        for entry in entries:
+            page_num = entry.get('page_number')
+            if page_num is None:
+                continue
+            size = len(json.dumps(entry, ensure_ascii=False))
+            per_page[page_num] = per_page.get(page_num, 0) + size
+        for page_num, chars in per_page.items():
+            history[page_num] = max(history.get(page_num, 0), chars // CHARS_PER_TOKEN)
+    return history
+
+
+def load_ocr_lengths(data_dir):
+    """Load OCR text length per page from any cached OCR output."""
+    lengths = {}
+    for name in OCR_CACHE_FILES:
+        path = data_dir / name
+        if not path.exists():
+            continue
+        pages = load_json(path)
+        for page_num, text in pages.items():
+            lengths.setdefault(int(page_num), len(text))
+    return lengths
+
 
+def estimate_page_cost(page_num, history, ocr_lengths):
+    """Estimate output tokens for a page, or None if there is nothing to go on."""
+    if page_num in history:
+        return history[page_num]
+    if page_num in ocr_lengths:
+        return int(ocr_lengths[page_num] * OCR_TOKENS_PER_CHAR)
+    return None
+
+
+def plan_tiles(page_numbers, threshold, data_dir=DATA_DIR):
+    """Decide how many tiles each page is split into.
+
+    Pages estimated under the threshold go as one request, up to twice the
+    threshold are split into the two dictionary columns, and anything
+    heavier into column halves (4 tiles).
+    """
+    history = load_page_cost_history(data_dir)
+    ocr_lengths = load_ocr_lengths(data_dir)
+    plan = {}
+    for page_num in page_numbers:
+        cost = estimate_page_cost(page_num, history, ocr_lengths)
+        if cost is None or cost <= threshold:
+            plan[page_num] = 1
+        elif cost <= threshold * 2:
+            plan[page_num] = 2
+        else:
+            plan[page_num] = 4
+    return plan
 
-def extract_page_images_streaming(pdf_path, page_numbers, queue, zoom=2.0):
+
+def page_tiles(rect, n_tiles, overlap=TILE_OVERLAP):
+    """Return (label, clip_rect) tiles covering a page, overlapping at the seams.
+
+    A clip of None means the full page.
+    """
+    if n_tiles <= 1:
+        return [("full page", None)]
+
+    x0, y0, x1, y1 = rect.x0, rect.y0, rect.x1, rect.y1
+    mid_x = (x0 + x1) / 2
+    pad_x = rect.width * overlap
+    columns = [
+        ("left column", x0, min(mid_x + pad_x, x1)),
+        ("right column", max(mid_x - pad_x, x0), x1),
+    ]
+    if n_tiles == 2:
+        return [(label, pymupdf.Rect(cx0, y0, cx1, y1)) for label, cx0, cx1 in columns]
+
+    mid_y = (y0 + y1) / 2
+    pad_y = rect.height * overlap
+    halves = [
+        ("top half", y0, min(mid_y + pad_y, y1)),
+        ("bottom half", max(mid_y - pad_y, y0), y1),
+    ]
+    return [
+        (f"{col_label}, {half_label}", pymupdf.Rect(cx0, hy0, cx1, hy1))
+        for col_label, cx0, cx1 in columns
+        for half_label, hy0, hy1 in halves
+    ]
+
+
+def render_page_tiles(doc, page_num, n_tiles=1, zoom=ZOOM):
+    """Render a page (or its tiles) as a list of (tile_label, base64 PNG) pairs."""
+    page = doc[page_num - 1]  # Convert 1-indexed to 0-indexed
+    mat = pymupdf.Matrix(zoom, zoom)
+    rendered = []
+    for label, clip in page_tiles(page.rect, n_tiles):
+        pix = page.get_pixmap(matrix=mat, clip=clip)
+        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        rendered.append((label, base64.standard_b64encode(buf.getvalue()).decode("utf-8")))
+    return rendered
+
+
+def extract_page_images_streaming(pdf_path, page_numbers, queue, zoom=ZOOM, tile_plan=None):
     """Extract page images as base64 PNGs, pushing each to a queue as it's ready.
 
-    Sends (page_num, base64_string) tuples. Sends None as sentinel when done.
+    Pages listed in tile_plan with more than one tile are rendered as clipped
+    tiles instead of a single image. Sends (page_num, tile_label, n_tiles,
+    base64_string) tuples. Sends None as sentinel when done.
     """
+    tile_plan = tile_plan or {}
     doc = pymupdf.open(str(pdf_path))
     for page_num in page_numbers:
-        page_idx = page_num - 1  # Convert 1-indexed to 0-indexed
-        if page_idx < 0 or page_idx >= len(doc):
+        if page_num < 1 or page_num > len(doc):
             print(f"  Warning: page {page_num} out of range (PDF has {len(doc)} pages)")
             continue
-        page = doc[page_idx]
-        mat = pymupdf.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        queue.put((page_num, base64.standard_b64encode(buf.getvalue()).decode("utf-8")))
+        tiles = render_page_tiles(doc, page_num, tile_plan.get(page_num, 1), zoom)
+        for label, img_b64 in tiles:
+            queue.put((page_num, label, len(tiles), img_b64))
     doc.close()
     queue.put(None)  # sentinel
 
 
-def process_page(client, page_num, img_b64, max_retries=5):
+def compute_page_hashes(pdf_path, page_numbers, zoom=ZOOM):
+    """Hash each page's inputs: rendered page pixels, prompts (page and tile), tool schema, model and zoom."""
+    hashes = {}
+    doc = pymupdf.open(str(pdf_path))
+    mat = pymupdf.Matrix(zoom, zoom)
+    tool = json.dumps(TRANSLATED_ENTRIES_TOOL, sort_keys=True)
+    for page_num in page_numbers:
+        if 1 <= page_num <= len(doc):
+            pix = doc[page_num - 1].get_pixmap(matrix=mat)
+            hashes[page_num] = input_hash(pix.samples, VISION_PROMPT, TILE_PROMPT_SUFFIX, tool, VISION_MODEL, zoom)
+    doc.close()
+    return hashes
+
+
+def tile_prompt(tile_label):
+    """Return the vision prompt for a tile (or the plain prompt for a full page)."""
+    if tile_label == "full page":
+        return VISION_PROMPT
+    base = VISION_PROMPT.rsplit("Record the entries:", 1)[0].rstrip()
+    return base + TILE_PROMPT_SUFFIX.format(tile=tile_label)
+
+
+def _tiles_adjacent(i, j, n_tiles):
+    """Whether tiles i and j of a page (in page_tiles order) share a seam."""
+    if n_tiles == 4:
+        # left top, left bottom, right top, right bottom: one coordinate apart
+        return abs(i // 2 - j // 2) + abs(i % 2 - j % 2) == 1
+    return abs(i - j) == 1
+
+
+def merge_tile_entries(tile_results):
+    """Merge entries from the tiles of one page, de-duplicating at the seams.
+
+    Tiles are merged in reading order. An entry that appears in two tiles
+    sharing a seam (because it straddles it) is kept once, preferring the
+    more complete copy — the one with the most extracted content. Entries
+    with the same headword in one tile, or in tiles with no seam between
+    them, are homographs and all kept; so are entries without a headword.
+    """
+    merged = []  # [entry, tiles it was seen in]
+    for tile, entries in enumerate(tile_results):
+        for entry in entries:
+            key = (entry.get('headword') or '').lower().strip()
+            if not key:
+                print(f"  Warning: tile {tile + 1}/{len(tile_results)} has an entry without a headword")
+                merged.append([entry, {tile}])
+                continue
+            copy = next((m for m in merged
+                         if tile not in m[1] and (m[0].get('headword') or '').lower().strip() == key
+                         and any(_tiles_adjacent(tile, t, len(tile_results)) for t in m[1])), None)
+            if copy is None:
+                merged.append([entry, {tile}])
+                continue
+            copy[1].add(tile)
+            if len(json.dumps(entry, ensure_ascii=False)) > len(json.dumps(copy[0], ensure_ascii=False)):
+                copy[0] = entry
+    return [entry for entry, _ in merged]
+
+
+class PageFailed(Exception):
+    """A page (or tile) got no result from the API: an API error, or rate limited on every attempt."""
+
+
+def process_page(client, page_num, img_b64, max_retries=5, prompt=VISION_PROMPT, label=None):
     """Send a page image to Claude vision API and return parsed entries.
 
-    Retries on rate limit (429) errors with exponential backoff.
+    Retries on rate limit (429) errors with exponential backoff. Raises
+    PageFailed when no attempt succeeds, so callers can retry the page
+    instead of recording it with no entries.
     """
+    name = f"Page {page_num}" + (f" ({label})" if label else "")
     for attempt in range(max_retries + 1):
         t0 = time.time()
         try:
-            response = client.messages.create(
-                model="claude-sonnet-4-5-20250929",
-                max_tokens=16384,
+            payload, usage = request_items(
+                client,
+                TRANSLATED_ENTRIES_TOOL,
                 messages=[{
                     "role": "user",
                     "content": [
@@ -134,72 +342,167 @@ def process_page(client, page_num, img_b64, max_retries=5):
                         },
                         {
                             "type": "text",
-                            "text": VISION_PROMPT,
+                            "text": prompt,
                         },
                     ],
                 }],
+                model=VISION_MODEL,
+                max_tokens=MAX_TOKENS,
+                label=name,
             )
 
             elapsed = time.time() - t0
-            response_text = response.content[0].text.strip()
-
-            # Parse JSON from response
-            if response_text.startswith('['):
-                json_text = response_text
-            else:
-                start = response_text.find('[')
-                end = response_text.rfind(']') + 1
-                if start >= 0 and end > start:
-                    json_text = response_text[start:end]
-                else:
-                    print(f"  Page {page_num}: Could not find JSON in response ({elapsed:.1f}s)")
-                    return page_num, [], elapsed
-
-            entries = json.loads(json_text)
+            entries = payload["entries"]
 
             # Add page_number to each entry
             for entry in entries:
                 entry['page_number'] = page_num
 
-            tokens_in = response.usage.input_tokens
-            tokens_out = response.usage.output_tokens
-            print(f"  Page {page_num}: {len(entries)} entries ({elapsed:.1f}s, {tokens_in}+{tokens_out} tokens)")
+            tokens_in = usage["input_tokens"]
+            tokens_out = usage["output_tokens"]
+            print(f"  {name}: {len(entries)} entries ({elapsed:.1f}s, {tokens_in}+{tokens_out} tokens)")
+            if usage["stop_reason"] == "max_tokens":
+                print(f"  {name}: hit max_tokens — consider a lower --tile-threshold")
             return page_num, entries, elapsed
 
-        except json.JSONDecodeError as e:
-            elapsed = time.time() - t0
-            print(f"  Page {page_num}: JSON parse error ({elapsed:.1f}s): {e}")
-            return page_num, [], elapsed
         except anthropic.RateLimitError:
             wait = 30 * (2 ** attempt)  # 30s, 60s, 120s, 240s, 480s
-            print(f"  Page {page_num}: rate limited, waiting {wait}s (attempt {attempt + 1}/{max_retries + 1})")
+            print(f"  {name}: rate limited, waiting {wait}s (attempt {attempt + 1}/{max_retries + 1})")
             time.sleep(wait)
         except anthropic.APIError as e:
             elapsed = time.time() - t0
-            print(f"  Page {page_num}: API error ({elapsed:.1f}s): {e}")
-            return page_num, [], elapsed
+            raise PageFailed(f"{name}: API error ({elapsed:.1f}s): {e}") from e
+
+    raise PageFailed(f"{name}: still rate limited after {max_retries + 1} attempts")
+
+
+def run_queue_worker(client, work_queue, page_numbers, n_threads, tile_plan, page_hashes=None):
+    """Pull pages from a shared SQLite work queue until every page is done or failed.
+
+    Each thread leases one page at a time, renders it (or its tiles), sends
+    it to the API and stores the result in the queue. Leases are kept alive
+    by a heartbeat thread; if this process dies, its pages are reclaimed by
+    other workers once the lease expires: a thread with nothing to lease
+    keeps polling while any page is still leased.
+    """
+    page_hashes = page_hashes or {}
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    keeper = LeaseKeeper(work_queue).start()
+
+    def worker_loop(thread_idx):
+        me = f"{worker_id}:{thread_idx}"
+        doc = pymupdf.open(str(PDF_PATH))
+        done = 0
+        while True:
+            page_num = work_queue.lease(me, page_numbers)
+            if page_num is None:
+                if not work_queue.counts(page_numbers).get('leased', 0):
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+            keeper.hold(page_num, me)
+            try:
+                tiles = render_page_tiles(doc, page_num, tile_plan.get(page_num, 1))
+                if len(tiles) == 1:
+                    _, entries, _ = process_page(client, page_num, tiles[0][1])
+                else:
+                    with ThreadPoolExecutor(max_workers=len(tiles)) as tile_pool:
+                        tile_futures = [
+                            tile_pool.submit(process_page, client, page_num, img_b64,
+                                             prompt=tile_prompt(label), label=label)
+                            for label, img_b64 in tiles
+                        ]
+                        entries = merge_tile_entries([f.result()[1] for f in tile_futures])
+                        print(f"  Page {page_num}: merged {len(tiles)} tiles into {len(entries)} entries")
+                work_queue.complete(page_num, me, entries, page_hashes.get(page_num))
+                done += 1
+            except Exception as e:
+                # PageFailed included: the queue retries the page, then marks it failed
+                print(f"  Page {page_num}: worker error, releasing lease: {e}")
+                work_queue.release(page_num, me)
+            finally:
+                keeper.drop(page_num)
+        doc.close()
+        return done
+
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        processed = sum(executor.map(worker_loop, range(n_threads)))
+    keeper.stop()
+    return processed
+
+
+def run_from_queue(args, page_numbers, output_file, page_hashes):
+    """Work through this range via the shared queue; the last worker writes the output."""
+    work_queue = WorkQueue(Path(args.queue))
+    if args.restart:
+        work_queue.reset(page_numbers)
+    work_queue.enqueue(page_numbers)
+    retried = work_queue.retry_failed(page_numbers)
+    if retried:
+        print(f"  Queue: retrying {retried} pages that failed last time")
+    if args.incremental:
+        # Redo results extracted from other inputs, and take unchanged pages from the output
+        stale = work_queue.invalidate(page_hashes)
+        stamps = load_stamps(output_file.with_suffix('.inputs.json'))
+        clean = {p for p in page_numbers if stamps.get(str(p)) == page_hashes.get(p)}
+        kept = {p: [] for p in clean}
+        for entry in iter_records(output_file):
+            if entry.get('page_number') in kept:
+                kept[entry['page_number']].append(entry)
+        for page_num, entries in kept.items():
+            work_queue.complete(page_num, "incremental", entries, page_hashes[page_num])
+        print(f"  Incremental: {len(clean)} pages unchanged, {len(stale)} queued results out of date")
+    print(f"  Queue: {work_queue.path} {work_queue.counts(page_numbers)}")
+
+    tile_plan = {} if args.no_tiling else plan_tiles(page_numbers, args.tile_threshold)
+    client = anthropic.Anthropic()
+
+    print(f"\nProcessing pages from the work queue with {args.workers} threads...")
+    t0 = time.time()
+    processed = run_queue_worker(client, work_queue, page_numbers, args.workers, tile_plan, page_hashes)
+    counts = work_queue.counts(page_numbers)
+    print(f"\nThis worker processed {processed} pages in {time.time() - t0:.1f}s (queue: {counts})")
 
-    # All retries exhausted
-    print(f"  Page {page_num}: failed after {max_retries + 1} attempts")
-    return page_num, [], 0
+    if counts.get('pending', 0) or counts.get('leased', 0):
+        print("Other workers still hold pages — the last one to finish writes the output")
+        return
+    if counts.get('failed', 0):
+        failed = sorted(set(page_numbers) - set(work_queue.results(page_numbers)))
+        print(f"Warning: {len(failed)} pages failed after retries: {failed}")
 
+    results = work_queue.results(page_numbers)
+    all_entries = [e for page_num in sorted(results) for e in results[page_num]]
+    all_entries.sort(key=lambda e: (e.get('page_number', 0), e.get('headword', '')))
+
+    # Several workers may get here at once: both writes go to a temp file and rename
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    save_entries(output_file, all_entries)
+    save_stamps(output_file.with_suffix('.inputs.json'), {p: page_hashes.get(p) for p in results})
+    print(f"\nDone! Saved {len(all_entries)} entries from {len(results)} pages to {output_file}")
 
-def load_progress(progress_file):
-    """Load progress from a previous run. Returns set of completed page numbers and entries."""
-    if not progress_file.exists():
-        return set(), []
-    with open(progress_file, 'r', encoding='utf-8') as f:
-        progress = json.load(f)
-    return set(progress.get('completed_pages', [])), progress.get('entries', [])
 
+def save_entries(output_file, entries):
+    """Write the pretty .json output and its .jsonl variant for streaming readers."""
+    dump_json(output_file, entries, pretty=True)
+    dump_jsonl(jsonl_sibling(output_file), entries)
 
-def save_progress(progress_file, completed_pages, entries):
-    """Save progress to disk."""
-    with open(progress_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'completed_pages': sorted(completed_pages),
-            'entries': entries,
-        }, f, ensure_ascii=False)
+
+def load_progress(journal, legacy_progress_file=None):
+    """Replay the progress journal. Returns {page_num: record}.
+
+    A whole-file .progress.json left by an older run is folded into the
+    journal (one record per page) and removed.
+    """
+    if legacy_progress_file is not None and legacy_progress_file.exists():
+        progress = load_json(legacy_progress_file)
+        by_page = {p: [] for p in progress.get('completed_pages', [])}
+        for entry in progress.get('entries', []):
+            by_page.setdefault(entry['page_number'], []).append(entry)
+        for page_num, entries in sorted(by_page.items()):
+            journal.append({'page': page_num, 'entries': entries})
+        legacy_progress_file.unlink()
+
+    return journal.replay()
 
 
 def main():
@@ -219,9 +522,23 @@ def main():
     parser.add_argument('--force', action='store_true',
                         help='Overwrite existing output file')
     parser.add_argument('--restart', action='store_true',
-                        help='Ignore progress file and start fresh')
+                        help='Ignore progress journal and start fresh')
     parser.add_argument('--output', type=str, default=None,
                         help='Output file path (default: auto-determined)')
+    parser.add_argument('--tile-threshold', type=int, default=TILE_THRESHOLD,
+                        help=f'Estimated output tokens above which a page is split into tiles (default: {TILE_THRESHOLD})')
+    parser.add_argument('--no-tiling', action='store_true',
+                        help='Always send whole pages, never tiles')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Re-extract only pages whose inputs (page image, prompts, tool schema, model, '
+                             'zoom) changed since the existing output was written. Runs without it '
+                             'skip hashing and leave the pages they write unstamped')
+    parser.add_argument('--stamp-only', action='store_true',
+                        help='Record current input hashes for the existing output without re-extracting '
+                             '(adopt it as the baseline for --incremental)')
+    parser.add_argument('--queue', nargs='?', const=str(DEFAULT_QUEUE), default=None,
+                        help='Pull pages from a shared SQLite work queue so several processes can '
+                             f'run the same extraction (default path: {DEFAULT_QUEUE.name})')
     args = parser.parse_args()
 
     # Determine page range
@@ -240,7 +557,8 @@ def main():
         default_output = DATA_DIR / 'entries_vision.json'
 
     output_file = Path(args.output) if args.output else default_output
-    progress_file = output_file.with_suffix('.progress.json')
+    progress_file = output_file.with_suffix('.progress.json')  # legacy whole-file progress
+    journal = ProgressJournal(output_file.with_suffix('.journal.jsonl'), key='page')
     page_numbers = list(range(start_page, end_page + 1))
 
     print(f"Shipibo Dictionary Vision Extraction")
@@ -248,8 +566,29 @@ def main():
     print(f"  Output: {output_file}")
     print(f"  Workers: {args.workers}")
 
+    # Page results are stamped with a hash of their inputs, which takes rendering
+    # every page: only done when --incremental or --stamp-only will use the stamps
+    stamps_file = output_file.with_suffix('.inputs.json')
+    page_hashes = {}
+    if args.incremental or args.stamp_only:
+        print("  Hashing page inputs...")
+        page_hashes = compute_page_hashes(PDF_PATH, page_numbers)
+
+    if args.stamp_only:
+        if not output_file.exists():
+            print(f"\nNo output to stamp: {output_file}")
+            sys.exit(1)
+        save_stamps(stamps_file, page_hashes)
+        print(f"Stamped {len(page_hashes)} pages in {stamps_file}")
+        return
+
+    if args.incremental and not output_file.exists():
+        # First build (e.g. pipeline.py on a fresh tree): nothing to keep, extract every page
+        print(f"\n--incremental: no existing output yet ({output_file}), extracting every page")
+        args.incremental = False
+
     # Check for existing output
-    if output_file.exists() and not args.force:
+    if output_file.exists() and not (args.force or args.incremental):
         print(f"\nOutput file already exists: {output_file}")
         print("Use --force to overwrite or --restart to ignore progress")
         sys.exit(1)
@@ -259,23 +598,49 @@ def main():
         print("\nError: ANTHROPIC_API_KEY not set (check .env file)")
         sys.exit(1)
 
-    # Load progress
+    # Multi-process mode: pages are leased from a shared SQLite queue
+    if args.queue:
+        run_from_queue(args, page_numbers, output_file, page_hashes)
+        return
+
+    # Load progress (journaled pages whose inputs have changed since are redone)
     completed_pages, existing_entries = set(), []
-    if not args.restart:
-        completed_pages, existing_entries = load_progress(progress_file)
+    page_stamps = {}
+    if args.restart:
+        journal.discard()
+        if progress_file.exists():
+            progress_file.unlink()
+    else:
+        for page_num, record in sorted(load_progress(journal, progress_file).items()):
+            current = page_hashes.get(page_num)
+            if current is not None and record.get('input_hash', current) != current:
+                continue
+            completed_pages.add(page_num)
+            existing_entries.extend(record['entries'])
+            page_stamps[page_num] = current
         if completed_pages:
             print(f"  Resuming: {len(completed_pages)} pages already done, {len(existing_entries)} entries")
 
+    # Incremental: keep pages from the existing output whose input hash is unchanged
+    if args.incremental:
+        stamps = load_stamps(stamps_file)
+        clean = {p for p in page_numbers
+                 if p not in completed_pages and stamps.get(str(p)) == page_hashes.get(p)}
+        existing_entries.extend(e for e in iter_records(output_file) if e.get('page_number') in clean)
+        completed_pages |= clean
+        page_stamps.update({p: page_hashes[p] for p in clean})
+        print(f"  Incremental: {len(clean)} pages unchanged, "
+              f"{len(page_numbers) - len(completed_pages)} to re-extract")
+
     remaining_pages = [p for p in page_numbers if p not in completed_pages]
     if not remaining_pages:
         print("\nAll pages already processed!")
         # Write final output from progress
         output_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(existing_entries, f, ensure_ascii=False, indent=2)
+        save_entries(output_file, existing_entries)
+        save_stamps(stamps_file, page_stamps)
         print(f"Wrote {len(existing_entries)} entries to {output_file}")
-        if progress_file.exists():
-            progress_file.unlink()
+        journal.discard()
         return
 
     # Process pages with Claude vision API (concurrent)
@@ -285,10 +650,21 @@ def main():
     total_pages = len(page_numbers)
     done_count = len(completed_pages)
 
+    # Split heavy pages into tiles so requests finish in similar time
+    if args.no_tiling:
+        tile_plan = {}
+    else:
+        tile_plan = plan_tiles(remaining_pages, args.tile_threshold)
+        tiled = {p: n for p, n in tile_plan.items() if n > 1}
+        if tiled:
+            print(f"  Tiling {len(tiled)} heavy pages: "
+                  + ", ".join(f"{p}×{n}" for p, n in sorted(tiled.items())))
+
     image_queue = Queue(maxsize=args.workers * 2)  # bound memory usage
     producer = Thread(
         target=extract_page_images_streaming,
         args=(PDF_PATH, remaining_pages, image_queue),
+        kwargs={'tile_plan': tile_plan},
         daemon=True,
     )
 
@@ -298,6 +674,10 @@ def main():
 
     with ThreadPoolExecutor(max_workers=args.workers) as executor:
         futures = {}
+        tile_results = {}  # page_num -> {tile_label: entries}
+        tile_counts = {}   # page_num -> number of tiles expected
+        tile_order = {}    # page_num -> tile labels in reading order
+        failed_pages = set()  # pages with a tile that got no result: not journaled or stamped
         images_done = False
 
         while not images_done or futures:
@@ -307,9 +687,15 @@ def main():
                 if item is None:
                     images_done = True
                     break
-                page_num, img_b64 = item
-                future = executor.submit(process_page, client, page_num, img_b64)
-                futures[future] = page_num
+                page_num, label, n_tiles, img_b64 = item
+                tile_counts[page_num] = n_tiles
+                tile_order.setdefault(page_num, []).append(label)
+                if n_tiles == 1:
+                    future = executor.submit(process_page, client, page_num, img_b64)
+                else:
+                    future = executor.submit(process_page, client, page_num, img_b64,
+                                             prompt=tile_prompt(label), label=label)
+                futures[future] = (page_num, label)
 
             # Collect completed results
             done_futures = [f for f in futures if f.done()]
@@ -319,16 +705,36 @@ def main():
                 done_futures = [f for f in futures if f.done()]
 
             for future in done_futures:
-                del futures[future]
-                page_num, entries, elapsed = future.result()
+                page_num, label = futures.pop(future)
+                try:
+                    _, entries, elapsed = future.result()
+                except PageFailed as e:
+                    print(f"  {e}")
+                    failed_pages.add(page_num)
+                    entries = []
+
+                # Wait for every tile of a page before recording it
+                tiles = tile_results.setdefault(page_num, {})
+                tiles[label] = entries
+                if len(tiles) < tile_counts[page_num]:
+                    continue
+                del tile_results[page_num]
+                labels = tile_order.pop(page_num)
+                if page_num in failed_pages:
+                    print(f"  Page {page_num}: failed, not recorded (the next run retries it)")
+                    continue
+                if len(labels) > 1:
+                    entries = merge_tile_entries([tiles[l] for l in labels])
+                    print(f"  Page {page_num}: merged {len(tiles)} tiles into {len(entries)} entries")
+
                 all_entries.extend(entries)
                 completed_pages.add(page_num)
                 done_count += 1
 
-                # Save progress every 5 pages or on the last page
+                # Record the finished page before moving on
+                journal.append({'page': page_num, 'input_hash': page_hashes.get(page_num), 'entries': entries})
+                page_stamps[page_num] = page_hashes.get(page_num)
                 pages_left = total_pages - done_count
-                if done_count % 5 == 0 or pages_left == 0:
-                    save_progress(progress_file, completed_pages, all_entries)
 
                 if pages_left > 0:
                     print(f"  Progress: {done_count}/{total_pages} pages ({pages_left} remaining)")
@@ -337,18 +743,19 @@ def main():
 
     total_time = time.time() - t0
     print(f"\nAPI processing complete in {total_time:.1f}s")
+    if failed_pages:
+        print(f"  {len(failed_pages)} pages failed and were left out: {', '.join(map(str, sorted(failed_pages)))}")
 
     # Sort entries by page number, then by headword within each page
     all_entries.sort(key=lambda e: (e.get('page_number', 0), e.get('headword', '')))
 
     # Write final output
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_entries, f, ensure_ascii=False, indent=2)
+    save_entries(output_file, all_entries)
+    save_stamps(stamps_file, page_stamps)
 
-    # Clean up progress file
-    if progress_file.exists():
-        progress_file.unlink()
+    # Clean up progress journal
+    journal.discard()
 
     # Summary
     headwords = [e.get('headword', '?') for e in all_entries]
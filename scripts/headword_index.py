@@ -0,0 +1,148 @@
+"""
+Multi-key headword index: every way a course may write a dictionary word.
+
+import_vocabulary.py used to match course words only against each entry's
+headword. A HeadwordIndex is built once over the entries and maps, to
+entry ids:
+
+- headwords, by canonical key (orthography.py: accents folded, old and
+  new orthography alike), e.g. "nocon" and "nokon"
+- variant forms that are spellings of the headword ("háche" under
+  "achi", "-en" under "-an"), which never shadow a headword. Most variants
+  in the OCR dictionary are inflections instead (the ergative "bain" under
+  "bai", "béhuaa" under "behuati"); those collide with unrelated course
+  words (course "oshin" 'red' is not dictionary "oshi" 'thin' + -n), so a
+  variant that is the headword, or its verb stem, plus an ending is skipped
+- affixes, kept apart from words so course suffix "ki" or "-ki" finds the
+  dictionary's "-qui" while the word "kan" does not match the suffix
+  "-kan". Suffixes are keyed "-core", prefixes "core-".
+
+Course forms like "-ax / -x" or "-bo (n)" are split into alternatives and
+stripped of qualifiers, tried in order. Each lookup is a few dict gets.
+
+A key can be shared by different words: course "shinanti" 'to think' is a
+variant of "jacomabires" 'to gossip', course "nokon" 'long ago' respells
+"nocon" 'my'. candidates() therefore yields every entry a form may refer
+to with how it matched: EXACT for affix hits and headwords spelled the
+same way (orthography.spelling_key), RESPELLING for headwords that share
+only the canonical key, VARIANT for variant forms. Callers should take
+the last two only when the glosses agree.
+
+Usage:
+    from headword_index import HeadwordIndex
+    index = HeadwordIndex(entries)             # Entry records with ids
+    entry_id = index.lookup("nokon")           # headword, then variant forms
+    entry_id = index.lookup("-ki", affix=True) # affixes first, then headwords
+    for entry_id, how in index.candidates("nokon"):   # EXACT, RESPELLING or VARIANT
+        ...
+    index.add(new_entry)
+"""
+
+import re
+
+from orthography import canonical_key, spelling_key
+
+_QUALIFIER_RE = re.compile(r"\([^)]*\)")
+
+# How a candidate matched a course form, best first
+EXACT, RESPELLING, VARIANT = "exact", "respelling", "variant"
+
+
+def alternatives(form):
+    """The forms written in one course field: "-ax / -x" -> ["-ax", "-x"], "-bo (n)" -> ["-bo"]."""
+    return [alt.strip() for alt in _QUALIFIER_RE.sub("", form).split("/") if alt.strip()]
+
+
+def affix_key(form, kind="suffix"):
+    """Key for an affix: "-core" for suffixes, "core-" for prefixes.
+
+    A form with a dash on one side says which it is; a bare form takes kind.
+    """
+    key = canonical_key(form)
+    if key.endswith("-") and not key.startswith("-"):
+        kind = "prefix"
+    elif key.startswith("-"):
+        kind = "suffix"
+    core = key.strip("- ")
+    if not core:
+        return ""
+    return f"{core}-" if kind == "prefix" else f"-{core}"
+
+
+def is_inflection(variant_key, headword_key):
+    """True when a variant is the headword (or its stem, without infinitive -ti) plus an ending."""
+    stem = headword_key[:-2] if headword_key.endswith("ti") and len(headword_key) > 3 else headword_key
+    return variant_key.startswith(stem)
+
+
+def _affix_kind(headword, part_of_speech):
+    """"suffix"/"prefix" when the entry is an affix, else None."""
+    if part_of_speech in ("suffix", "prefix"):
+        return part_of_speech
+    key = canonical_key(headword)
+    if key.startswith("-"):
+        return "suffix"
+    if key.endswith("-"):
+        return "prefix"
+    return None
+
+
+class HeadwordIndex:
+    """Entry ids by canonical headword, variant form and affix key."""
+
+    def __init__(self, entries=()):
+        self.headwords = {}  # canonical headword -> [(id, spelling key)]; a later entry first
+        self.variants = {}   # canonical variant form -> [id]; the first entry first
+        self.affixes = {}    # affix key -> id, for affix entries and their variants only
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        """Index an Entry (or anything with id, headword, variant_forms, part_of_speech)."""
+        kind = _affix_kind(entry.headword, entry.part_of_speech)
+        headword_key = canonical_key(entry.headword)
+        for form in alternatives(entry.headword):
+            key = canonical_key(form)
+            if key:
+                self.headwords.setdefault(key, []).insert(0, (entry.id, spelling_key(form)))
+            affix = kind and affix_key(form, kind)
+            if affix:
+                self.affixes[affix] = entry.id
+        for variant in entry.variant_forms or ():
+            for form in alternatives(variant):
+                key = canonical_key(form)
+                if not key or is_inflection(key, headword_key):
+                    continue
+                # An affix's variants are affixes too ("-en" under "-an")
+                affix = kind and affix_key(form, kind)
+                if affix:
+                    self.affixes.setdefault(affix, entry.id)
+                elif not kind:
+                    self.variants.setdefault(key, []).append(entry.id)
+
+    def candidates(self, form, affix=False):
+        """Yield (entry id, EXACT/RESPELLING/VARIANT) for every entry a course form may refer to.
+
+        Words try headwords, then variant forms; affixes try affix entries
+        first. Each alternative of the form is tried in order.
+        """
+        forms = alternatives(form)
+        if affix:
+            for alt in forms:
+                entry_id = self.affixes.get(affix_key(alt))
+                if entry_id is not None:
+                    yield entry_id, EXACT
+        for alt in forms:
+            spelling = spelling_key(alt)
+            for entry_id, headword_spelling in self.headwords.get(canonical_key(alt), ()):
+                yield entry_id, EXACT if headword_spelling == spelling else RESPELLING
+        for alt in forms:
+            for entry_id in self.variants.get(canonical_key(alt), ()):
+                yield entry_id, VARIANT
+
+    def lookup(self, form, affix=False):
+        """Id of the first entry a course form may refer to, exact or not, or None."""
+        return next((entry_id for entry_id, _ in self.candidates(form, affix)), None)
+
+    def __len__(self):
+        return len(self.headwords) + len(self.variants) + len(self.affixes)
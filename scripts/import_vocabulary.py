@@ -8,44 +8,104 @@ them together. Existing dictionary entries are preserved; course vocabulary
 is added for words not already in the dictionary.
 
 For words that exist in both, the course meaning is added as a note
-if it provides additional context.
+if it provides additional context. Course words are found by spelling
+(headword_index.py), and respellings and variant forms must agree in
+gloss too (glosses_agree). Ids come from the id ledger (entry_ids.py);
+the site files derived from the entries are rebuilt along with them
+(build_site_data.SiteData).
 
 Usage:
     python scripts/import_vocabulary.py
     python scripts/import_vocabulary.py --dry-run
+    python scripts/import_vocabulary.py --no-cache
 """
 
 import argparse
-import json
 import sys
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-DATA_DIR = ROOT / "data"
-SITE_DATA_DIR = ROOT / "site" / "data"
+from build_site_data import SiteData
+from entry_ids import IdLedger
+from entry_model import Entry, load_entries
+from headword_index import EXACT, RESPELLING, HeadwordIndex
+from json_io import JsonArrayWriter, iter_jsonl, jsonl_sibling, load_json
+from near_duplicates import gloss_covers, meanings_overlap
+from orthography import canonical_key
+from paths import DATA_DIR, SITE_DATA_DIR
+from snapshot_cache import SourceSnapshot
 
 
 def normalize_headword(hw):
-    """Normalize a headword for comparison."""
+    """Matching key for a headword, the same in old and new orthography."""
+    return canonical_key(hw)
+
+
+def headword_sort_key(hw):
+    """Sort key for entries.json: the headword as written, lowercased."""
     return hw.lower().strip().replace("\u2014", "-")
 
 
-def load_existing_entries():
-    """Load the current entries.json."""
+def load_existing_entries(snapshot=None):
+    """Load the current entries.json as Entry records."""
     path = SITE_DATA_DIR / "entries.json"
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return snapshot.load(path, loader=load_entries) if snapshot else load_entries(path)
+
+
+def load_jsonl(path):
+    return list(iter_jsonl(path))
 
 
-def load_merged_vocabulary():
-    """Load the merged vocabulary from all courses."""
+def iter_merged_vocabulary(snapshot=None):
+    """Yield (kind, item) for the merged vocabulary: every word, then every suffix.
+
+    Streams vocabulary_merged.jsonl when it is at least as new as the .json
+    (a snapshot cache, if given, holds it as a list instead).
+    """
     path = DATA_DIR / "vocabulary_merged.json"
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    stream_path = jsonl_sibling(path)
+    if stream_path.exists() and stream_path.stat().st_mtime >= path.stat().st_mtime:
+        records = snapshot.load(stream_path, loader=load_jsonl) if snapshot else iter_jsonl(stream_path)
+        for record in records:
+            yield record.pop("kind"), record
+        return
+    vocab = snapshot.load(path) if snapshot else load_json(path)
+    for word in vocab["words"]:
+        yield "word", word
+    for suffix in vocab["suffixes"]:
+        yield "suffix", suffix
+
+
+def glosses_agree(course_meaning, entry, how):
+    """Whether a non-exact match (RESPELLING or VARIANT) is the same word, going by the glosses.
+
+    A respelling must share a content word with the entry's glosses; a
+    variant form needs all of its content words there, so course
+    "shinanti" 'think, remember' is not the "jacomabires" 'to gossip : to
+    think badly' listing "shinánti".
+    """
+    glosses = " ".join(entry.definitions_english)
+    if how == RESPELLING:
+        return meanings_overlap(course_meaning, glosses)
+    return gloss_covers(course_meaning, glosses)
+
+
+def match_entry(index, by_id, form, course_meaning, affix=False):
+    """The existing entry a course word or suffix is, or None when it is a word of its own.
+
+    The first candidate whose glosses agree wins; failing that, the first
+    one spelled the same way.
+    """
+    exact = None
+    for entry_id, how in index.candidates(form, affix=affix):
+        entry = by_id[entry_id]
+        if glosses_agree(course_meaning, entry, how):
+            return entry
+        if how == EXACT and exact is None:
+            exact = entry
+    return exact
 
 
 def vocab_to_entry(word, entry_id):
-    """Convert a vocabulary word to entries.json format."""
+    """Convert a vocabulary word to an entries.json Entry."""
     meaning = word.get("meaning") or ""
     pos = word.get("part_of_speech")
     context = word.get("context") or ""
@@ -66,27 +126,18 @@ def vocab_to_entry(word, entry_id):
                 course_names.add(s.split(":")[0] if ":" in s else s)
         source_note = "Source: " + ", ".join(sorted(course_names))
 
-    entry = {
-        "id": entry_id,
-        "headword": word["shipibo"],
-        "part_of_speech": pos,
-        "variant_forms": [],
-        "etymology": None,
-        "scientific_name": None,
-        "definitions_english": [meaning] if meaning else [],
-        "definitions_spanish": [],
-        "examples": [],
-        "synonyms": [],
-        "cross_references": [],
-        "grammatical_notes": context if context else None,
-        "page_number": 0,
-        "source": source_note,
-    }
-    return entry
+    return Entry(
+        id=entry_id,
+        headword=word["shipibo"],
+        part_of_speech=pos,
+        definitions_english=[meaning] if meaning else [],
+        grammatical_notes=context if context else None,
+        source=source_note,
+    )
 
 
 def suffix_to_entry(suffix, entry_id):
-    """Convert a suffix to entries.json format."""
+    """Convert a suffix to an entries.json Entry."""
     meaning = suffix.get("meaning") or ""
     usage = suffix.get("usage") or ""
     examples = suffix.get("examples", [])
@@ -95,128 +146,117 @@ def suffix_to_entry(suffix, entry_id):
     if usage and usage != meaning:
         full_meaning = f"{meaning} ({usage})" if meaning else usage
 
-    entry = {
-        "id": entry_id,
-        "headword": suffix["form"],
-        "part_of_speech": "suffix",
-        "variant_forms": [],
-        "etymology": None,
-        "scientific_name": None,
-        "definitions_english": [full_meaning] if full_meaning else [],
-        "definitions_spanish": [],
-        "examples": [],
-        "synonyms": [],
-        "cross_references": [],
-        "grammatical_notes": "; ".join(examples) if examples else None,
-        "page_number": 0,
-        "source": "Course vocabulary",
-    }
-    return entry
+    return Entry(
+        id=entry_id,
+        headword=suffix["form"],
+        part_of_speech="suffix",
+        definitions_english=[full_meaning] if full_meaning else [],
+        grammatical_notes="; ".join(examples) if examples else None,
+        source="Course vocabulary",
+    )
 
 
 def main():
     parser = argparse.ArgumentParser(description="Import vocabulary into entries.json")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse the inputs instead of using the snapshot cache")
     args = parser.parse_args()
 
-    existing = load_existing_entries()
-    vocab = load_merged_vocabulary()
-
+    snapshot = SourceSnapshot("import_vocabulary", enabled=not args.no_cache)
+    existing = load_existing_entries(snapshot)
     print(f"Existing entries: {len(existing)}")
-    print(f"Vocabulary to import: {len(vocab['words'])} words, {len(vocab['suffixes'])} suffixes")
 
-    # Build lookup of existing headwords
-    existing_hw = {}
-    for e in existing:
-        hw = normalize_headword(e["headword"])
-        existing_hw[hw] = e
+    # Index every form an existing entry can be written as
+    index = HeadwordIndex(existing)
+    by_id = {e.id: e for e in existing}
 
     # Track what we add
     new_entries = []
     enriched = 0
     skipped_existing = 0
-    next_id = max(e["id"] for e in existing) + 1
-
-    # Process words
-    for word in vocab["words"]:
-        hw = normalize_headword(word["shipibo"])
-        if not hw:
+    kept_apart = 0
+    imported = {"word": 0, "suffix": 0}
+    next_id = max(e.id for e in existing) + 1
+
+    for kind, item in iter_merged_vocabulary(snapshot):
+        imported[kind] += 1
+        form = item["shipibo"] if kind == "word" else item["form"]
+        if not normalize_headword(form):
             continue
 
-        if hw in existing_hw:
-            # Word already exists in dictionary — check if we can enrich it
-            entry = existing_hw[hw]
-            course_meaning = word.get("meaning") or ""
-
+        course_meaning = item.get("meaning") or ""
+        entry = match_entry(index, by_id, form, course_meaning, affix=kind == "suffix")
+        if entry is not None:
+            # Already in the dictionary — check if we can enrich it
             # If existing entry has no English definitions, add ours
-            if not entry.get("definitions_english") and course_meaning:
-                entry["definitions_english"] = [course_meaning]
+            if not entry.definitions_english and course_meaning:
+                if kind == "suffix":
+                    usage = item.get("usage") or ""
+                    if usage and usage != course_meaning:
+                        course_meaning = f"{course_meaning} ({usage})"
+                entry.definitions_english = [course_meaning]
                 enriched += 1
             else:
                 skipped_existing += 1
         else:
-            # New word — add it
-            entry = vocab_to_entry(word, next_id)
+            # New word or suffix (or one whose glosses differ from its match) — add it
+            if index.lookup(form, affix=kind == "suffix") is not None:
+                kept_apart += 1
+            to_entry = vocab_to_entry if kind == "word" else suffix_to_entry
+            entry = to_entry(item, next_id)
             new_entries.append(entry)
-            existing_hw[hw] = entry
+            index.add(entry)
+            by_id[entry.id] = entry
             next_id += 1
 
-    # Process suffixes
-    for suffix in vocab["suffixes"]:
-        hw = normalize_headword(suffix["form"])
-        if not hw:
-            continue
-
-        if hw in existing_hw:
-            entry = existing_hw[hw]
-            course_meaning = suffix.get("meaning") or ""
-            if not entry.get("definitions_english") and course_meaning:
-                usage = suffix.get("usage") or ""
-                full = f"{course_meaning} ({usage})" if usage and usage != course_meaning else course_meaning
-                entry["definitions_english"] = [full]
-                enriched += 1
-            else:
-                skipped_existing += 1
-        else:
-            entry = suffix_to_entry(suffix, next_id)
-            new_entries.append(entry)
-            existing_hw[hw] = entry
-            next_id += 1
+    print(f"Vocabulary imported: {imported['word']} words, {imported['suffix']} suffixes")
 
     print(f"\nResults:")
     print(f"  New entries added: {len(new_entries)}")
     print(f"  Existing entries enriched (English defs added): {enriched}")
     print(f"  Already had definitions (skipped): {skipped_existing}")
+    print(f"  Kept apart from a respelling or variant with other glosses: {kept_apart}")
     print(f"  Total entries: {len(existing) + len(new_entries)}")
 
     if args.dry_run:
+        snapshot.save()
+        snapshot.report()
         print("\n[Dry run — no files written]")
         # Show some samples
         print("\nSample new entries:")
         for e in new_entries[:10]:
-            defs = e["definitions_english"][0][:60] if e["definitions_english"] else "?"
-            print(f"  {e['headword']} ({e['part_of_speech']}): {defs}")
+            defs = e.definitions_english[0][:60] if e.definitions_english else "?"
+            print(f"  {e.headword} ({e.part_of_speech}): {defs}")
         return
 
     # Combine and sort
     all_entries = existing + new_entries
-    all_entries.sort(key=lambda e: normalize_headword(e["headword"]))
+    all_entries.sort(key=lambda e: headword_sort_key(e.headword))
 
-    # Reassign IDs after sorting
-    for i, e in enumerate(all_entries):
-        e["id"] = i
+    # Stable ids: existing entries keep theirs, new ones get the next free id
+    ledger = IdLedger.load()
+    id_for = ledger.allocator()
+    for e in all_entries:
+        e.id = id_for(e.headword, e.part_of_speech)
 
     # Write output
     output_path = SITE_DATA_DIR / "entries.json"
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(all_entries, f, ensure_ascii=False, indent=2)
-    print(f"\nWrote {output_path} ({len(all_entries)} entries)")
-
-    # Also save a backup
     backup_path = DATA_DIR / "entries_with_vocabulary.json"
-    with open(backup_path, "w", encoding="utf-8") as f:
-        json.dump(all_entries, f, ensure_ascii=False, indent=2)
+    derived = SiteData()
+    # Both are tracked in git: keep them diffable
+    with JsonArrayWriter(output_path, pretty=True) as out, JsonArrayWriter(backup_path, pretty=True) as backup:
+        for e in all_entries:
+            record = e.to_dict()
+            out.write(record)
+            backup.write(record)
+            derived.add(record)
+    snapshot.put(output_path, all_entries, loader=load_entries)  # this run's output is the next run's input
+    snapshot.save()
+    ledger.save()
+    print(f"\nWrote {output_path} ({len(all_entries)} entries, {ledger.added} new ids)")
     print(f"Wrote backup {backup_path}")
+    derived.close()
+    snapshot.report()
 
 
 if __name__ == "__main__":
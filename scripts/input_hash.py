@@ -0,0 +1,39 @@
+"""
+Input hashes for incremental re-extraction.
+
+Every cached extraction result (a vision page, a Basic Course file, a
+Foundation Course page) is stamped with a hash of everything that went into
+it: the page image or text, the prompt, the model and the render zoom.
+With --incremental, a script re-runs only the items whose current input
+hash differs from the stamp, so editing a prompt or re-scanning one page no
+longer means choosing between --restart and hand-picked page ranges.
+"""
+
+import hashlib
+
+from json_io import dump_json, load_json
+
+
+def input_hash(*parts):
+    """Return a short SHA-256 digest over the given inputs (str, bytes or numbers).
+
+    Each part is length-prefixed so ("ab", "c") and ("a", "bc") differ.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()[:16]
+
+
+def load_stamps(path):
+    """Load a {key: input_hash} sidecar file (keys come back as strings)."""
+    if not path.exists():
+        return {}
+    return load_json(path)
+
+
+def save_stamps(path, stamps):
+    """Write a {key: input_hash} sidecar file; keys without a hash (None) are left out."""
+    dump_json(path, {str(k): v for k, v in sorted(stamps.items()) if v is not None})
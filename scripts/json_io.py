@@ -0,0 +1,345 @@
+"""
+Shared JSON reading and writing for the pipeline scripts.
+
+Uses orjson when it is installed (several times faster on our multi-MB
+entry files) and falls back to the stdlib json module otherwise; both
+produce the same text. Output is compact by default, for machine-only
+files (generated site data, caches, stamps, state); pass pretty=True for
+the files people read and diff in git, tracked site files such as
+site/data/icaros.json included (indent=2, as before). Writes go to a temp
+file in the same directory and are renamed into place, so a crash never
+leaves a half-written file behind.
+
+Entry and vocabulary intermediates also have streaming forms, so a stage
+never needs the whole list in memory and can start before its upstream
+has finished:
+
+- JSON Lines (.jsonl), one record per line. JsonlWriter writes to
+  "<name>.partial" and renames it when closed; iter_jsonl(..., follow=True)
+  tails that partial file until the rename.
+- JSON arrays with one record per line (JsonArrayWriter). They are still
+  plain JSON for the site, but iter_records() can stream them line by line.
+
+Usage:
+    from json_io import dump_json, load_json
+    entries = load_json(DATA_DIR / "entries_vision.json")
+    dump_json(SITE_DATA_DIR / "search_index.json", index)               # compact
+    dump_json(DATA_DIR / "vocabulary_merged.json", vocab, pretty=True)  # human-diffed
+
+    for entry in iter_records(DATA_DIR / "entries_vision.json"):        # .jsonl sibling if fresh
+        ...
+    with JsonlWriter(DATA_DIR / "entries_translated.jsonl") as out:
+        out.write(entry)
+    with JsonArrayWriter(DATA_DIR / "entries_translated.json", pretty=True) as out:
+        out.write_many(iter_jsonl(DATA_DIR / "entries_translated.jsonl"))
+"""
+
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+HAVE_ORJSON = orjson is not None
+
+
+def loads(data):
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, pretty=False, sort_keys=False):
+    """Serialize to a str: compact, or indent=2 when pretty. Non-ASCII is kept as-is."""
+    if orjson is not None:
+        return _orjson_dumps(obj, pretty, sort_keys).decode("utf-8")
+    return _stdlib_dumps(obj, pretty, sort_keys)
+
+
+def load_json(path):
+    """Read and parse a JSON file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_json(path, obj, pretty=False, sort_keys=False, atomic=True):
+    """Write obj as JSON to path (atomically: temp file + fsync + rename)."""
+    if orjson is not None:
+        data = _orjson_dumps(obj, pretty, sort_keys)
+    else:
+        data = _stdlib_dumps(obj, pretty, sort_keys).encode("utf-8")
+
+    if not atomic:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    _write_atomic(path, data)
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp.{os.getpid()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _orjson_dumps(obj, pretty, sort_keys):
+    option = orjson.OPT_NON_STR_KEYS  # OCR pages are keyed by int page number
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, option=option)
+
+
+def _stdlib_dumps(obj, pretty, sort_keys):
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=sort_keys)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys)
+
+
+# --- Streaming records ---
+
+PARTIAL_SUFFIX = ".partial"
+FOLLOW_WAIT = 60  # seconds a follower waits for its writer to start
+
+
+class JsonlWriter:
+    """Write records as JSON Lines, one flushed line per record.
+
+    Lines go to "<path>.partial" while writing; close() fsyncs and renames
+    it to path, so path only ever holds a complete file. Readers that want
+    records early can follow the partial file with iter_jsonl(follow=True).
+    A .jsonl left by the previous run is removed on open, so nothing reads
+    it as this run's output.
+    """
+
+    replaces_on_open = True
+
+    def __init__(self, path):
+        self.path = path
+        self.partial = f"{path}{PARTIAL_SUFFIX}"
+        self.count = 0
+        self._fh = open(self.partial, "w", encoding="utf-8")
+        if self.replaces_on_open and os.path.exists(path):
+            os.unlink(path)
+
+    def write(self, record):
+        self._fh.write(dumps(record) + "\n")
+        self._fh.flush()
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self):
+        if self._fh is None:
+            return
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+        os.replace(self.partial, self.path)
+
+    def abort(self):
+        """Stop writing and delete the partial file."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if os.path.exists(self.partial):
+            os.unlink(self.partial)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class JsonArrayWriter(JsonlWriter):
+    """Write a JSON array one record at a time.
+
+    Compact output puts one record per line ("[", records separated by
+    ",\\n", "]"): ordinary JSON for the site, which iter_records() can still
+    read one record at a time. pretty=True writes exactly what
+    dump_json(..., pretty=True) would for the whole list.
+    """
+
+    # The previous .json stays readable (the site, other stages) until replaced;
+    # followers read the .jsonl variant instead
+    replaces_on_open = False
+
+    def __init__(self, path, pretty=False):
+        super().__init__(path)
+        self.pretty = pretty
+        self._fh.write("[")
+
+    def write(self, record):
+        text = dumps(record, pretty=self.pretty)
+        if self.pretty:
+            text = text.replace("\n", "\n  ")
+            self._fh.write(("\n  " if self.count == 0 else ",\n  ") + text)
+        else:
+            self._fh.write(("\n" if self.count == 0 else ",\n") + text)
+        self.count += 1
+
+    def close(self):
+        if self._fh is not None:
+            if self.pretty:
+                self._fh.write("\n]" if self.count else "]")
+            else:
+                self._fh.write("\n]\n")
+        super().close()
+
+
+def jsonl_sibling(path):
+    """The JSON Lines variant of a .json intermediate (same name, .jsonl)."""
+    return Path(path).with_suffix(".jsonl")
+
+
+def write_jsonl(path, records):
+    """Write an iterable of records as a JSON Lines file (atomically). Returns the count."""
+    with JsonlWriter(path) as out:
+        out.write_many(records)
+    return out.count
+
+
+def dump_jsonl(path, records):
+    """Write an in-memory list of records as JSON Lines in one atomic write.
+
+    Unlike JsonlWriter there is no shared .partial file, so several
+    processes may write the same path at once (the last rename wins).
+    """
+    _write_atomic(path, "".join(dumps(r) + "\n" for r in records).encode("utf-8"))
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _await_writer(path, wait, poll):
+    """Wait up to wait seconds for a JsonlWriter of path to start.
+
+    True once "<path>.partial" exists (tail it); False when path was
+    written in the meantime, or nothing started within wait (read path).
+    """
+    partial = f"{path}{PARTIAL_SUFFIX}"
+    before = _mtime(path)
+    deadline = time.monotonic() + wait
+    while True:
+        if os.path.exists(partial):
+            return True
+        if _mtime(path) != before or time.monotonic() >= deadline:
+            return False
+        time.sleep(poll)
+
+
+def iter_jsonl(path, follow=False, poll=0.5, wait=FOLLOW_WAIT):
+    """Yield records from a JSON Lines file.
+
+    With follow=True, tail "<path>.partial" (a JsonlWriter writing it),
+    yielding each complete line as it is flushed, until the writer renames
+    it into place. The partial file is preferred whenever it exists, and
+    if it does not yet, the reader waits up to wait seconds for the writer
+    to start rather than read what an earlier run left at path.
+    """
+    partial = f"{path}{PARTIAL_SUFFIX}"
+    f = None
+    if follow and _await_writer(path, wait, poll):
+        try:
+            f = open(partial, "rb")
+        except FileNotFoundError:
+            pass  # renamed into place since: read the finished file
+    if f is None:
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        return
+
+    with f:
+        pending = b""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                pending += chunk
+                if pending.endswith(b"\n"):
+                    if pending.strip():
+                        yield loads(pending)
+                    pending = b""
+                continue
+            if not os.path.exists(partial):
+                # Renamed into place (same file, so keep reading this handle) or aborted
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"{partial} was removed before completion")
+                for line in f:
+                    pending += line
+                    if pending.endswith(b"\n"):
+                        if pending.strip():
+                            yield loads(pending)
+                        pending = b""
+                if pending.strip():
+                    yield loads(pending)
+                return
+            time.sleep(poll)
+
+
+def iter_json_array(path):
+    """Yield the items of a JSON array file.
+
+    Arrays written by JsonArrayWriter (one record per line) are streamed;
+    any other layout is loaded whole.
+    """
+    with open(path, "rb") as f:
+        first = f.readline()
+        second = f.readline()
+        # Pretty (indent=2) arrays also open with "[" alone, but indent their items
+        if first.strip() != b"[" or second[:1].isspace():
+            yield from loads(first + second + f.read())
+            return
+        for line in itertools.chain((second,), f):
+            line = line.strip()
+            if line.endswith(b","):
+                line = line[:-1]
+            if line and line != b"]":
+                yield loads(line)
+
+
+def iter_records(path, follow=False):
+    """Stream the records of an entry/vocabulary intermediate.
+
+    Reads path directly if it is .jsonl. For a .json path, prefers the
+    .jsonl sibling when it is at least as new, else streams the array
+    itself. With follow=True an upstream stage is writing the sibling, so
+    it is followed (iter_jsonl) and the .json is only read if no .jsonl
+    turns up at all.
+    """
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        return iter_jsonl(path, follow=follow)
+    sibling = jsonl_sibling(path)
+    if follow and (_await_writer(sibling, FOLLOW_WAIT, 0.5) or sibling.exists()):
+        return iter_jsonl(sibling, follow=True, wait=0)
+    if sibling.exists() and (not path.exists() or sibling.stat().st_mtime >= path.stat().st_mtime):
+        return iter_jsonl(sibling)
+    return iter_json_array(path)
@@ -5,13 +5,13 @@ Also fixes song line texts that are slightly different from their phrase counter
 Outputs to both data/icaros.json and site/data/icaros.json.
 """
 
-import json
 import re
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-DATA_PATH = ROOT / "data" / "icaros.json"
-SITE_PATH = ROOT / "site" / "data" / "icaros.json"
+from json_io import dump_json, load_json
+from paths import DATA_DIR, SITE_DATA_DIR
+
+DATA_PATH = DATA_DIR / "icaros.json"
+SITE_PATH = SITE_DATA_DIR / "icaros.json"
 
 
 def normalize(text):
@@ -67,8 +67,7 @@ def find_phrase_idx(icaro, line_text):
 
 
 def link_icaros():
-    with open(DATA_PATH) as f:
-        data = json.load(f)
+    data = load_json(DATA_PATH)
 
     for icaro in data:
         icaro_id = icaro["id"]
@@ -123,9 +122,8 @@ def link_icaros():
                 print(f"  s{si}l{li}: {line['text']!r:45s} -> p{pi}: {phrase_text!r}")
 
     # Write output
-    output = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
-    DATA_PATH.write_text(output)
-    SITE_PATH.write_text(output)
+    dump_json(DATA_PATH, data, pretty=True)
+    dump_json(SITE_PATH, data, pretty=True)  # tracked in git: keep it diffable
     print(f"\nWrote {DATA_PATH}")
     print(f"Wrote {SITE_PATH}")
 
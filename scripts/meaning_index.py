@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Reverse lookup by meaning: English and Spanish words -> Shipibo entries.
+
+Searching by meaning is otherwise a substring test over every definition
+string, so "curing" misses "to cure" and "curar" misses "curación".
+build_site_data.py (SiteData) now also writes site/data/meaning_index.json,
+mapping stems of the definition words to ranked entry ids:
+
+    {"version": 1, "languages": {
+       "en": {"stems": ["abandon", "abl", ...],            # sorted
+              "postings": [[812, 3, 95, 2, ...], ...]},    # id, score pairs, best first
+       "es": {...}}}
+
+Definition words are accent-folded and tokenized like the search index
+(search_index.tokenize), stopwords are dropped, and each word is reduced
+by a small rule-based stemmer for its language: English "cure", "cured",
+"curing", "cures" -> "cur"; Spanish "curar", "curarse", "curando",
+"curado", "curación" -> "cur" (but the noun "cura", priest, stays
+"cura"). An entry scores, for a stem, the best of its definitions that
+contain it: 3 when the definition is that word alone ("water"), 2 for
+the first definition, 1 otherwise.
+
+MeaningIndex.lookup() stems a query in both languages (or one, with
+lang=), looks each stem up in the definitions of both, and returns the
+entries that have every stem, by total score. So "cure", "curing" and
+"curar" all find the same entries, without a scan.
+
+Usage:
+    python scripts/meaning_index.py                   # rebuild from site/data/entries.json
+    python scripts/meaning_index.py --query "curing"  # build and look up
+    python scripts/bench_meaning_index.py
+"""
+
+import argparse
+from bisect import bisect_left
+from collections import defaultdict
+
+from json_io import dump_json, iter_records
+from paths import SITE_DATA_DIR
+from search_index import tokenize
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+INDEX_PATH = SITE_DATA_DIR / "meaning_index.json"
+
+LANGUAGES = {"en": "definitions_english", "es": "definitions_spanish"}
+
+STOPWORDS = {
+    "en": frozenset(
+        "a an the to of and or in on at by for with from as is are was were be been being it its "
+        "this that these those which who whom whose what when where how not no nor but if then than "
+        "so such very into onto out up down over under about also one ones some something someone "
+        "thing things his her their them they he she we you i my your our".split()
+    ),
+    "es": frozenset(
+        "el la lo los las un una unos unas de del al y o u e a en con por para que se su sus es son "
+        "ser era fue como le les mas muy sin sobre entre hasta desde tambien no ni pero si cuando "
+        "donde este esta estos estas ese esa eso esos esas algo alguien cosa cosas uno otro otra "
+        "mi tu nos ya".split()
+    ),
+}
+
+_VOWELS = frozenset("aeiouy")
+_ES_SUFFIXES = (  # longest first
+    "amientos", "imientos", "amiento", "imiento", "aciones", "iciones", "acion", "icion",
+    "ando", "iendo", "ados", "adas", "idos", "idas", "ado", "ada", "ido", "ida",
+    "ar", "er", "ir",
+)
+_ES_REFLEXIVE = ("arse", "erse", "irse", "andose", "iendose")
+
+
+def _has_vowel(s):
+    return any(c in _VOWELS for c in s)
+
+
+def stem_english(word):
+    """Light suffix stripping: plurals, -ed, -ing, -ly, then a final -e."""
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed", "ly"):
+        stem = word[:-len(suffix)]
+        if word.endswith(suffix) and len(stem) >= 3 and _has_vowel(stem):
+            if suffix == "ed" and stem.endswith("i"):
+                stem = stem[:-1] + "y"
+            # running -> run, but not fall -> fal
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "lsz" and stem[-1] not in _VOWELS:
+                stem = stem[:-1]
+            word = stem
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def stem_spanish(word):
+    """Light suffix stripping: reflexive -se, plurals, then verb, participle and -ción endings.
+
+    Gender is folded (blanca -> blanco) rather than stripped, so nouns
+    keep apart from verbs spelled like them: "cura" (priest) is not
+    "curar".
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith(_ES_REFLEXIVE):
+        word = word[:-2]
+    elif word.endswith("es") and len(word) > 5:
+        word = word[:-2]
+    elif word.endswith("s") and len(word) > 4:
+        word = word[:-1]
+    for suffix in _ES_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    if word.endswith("a") and len(word) > 3:
+        word = word[:-1] + "o"
+    return word
+
+
+STEMMERS = {"en": stem_english, "es": stem_spanish}
+
+
+def stems(text, lang):
+    """The distinct stems of the content words of text."""
+    stop, stem = STOPWORDS[lang], STEMMERS[lang]
+    return {stem(token) for token in tokenize(text) if token not in stop and not token.isdigit()}
+
+
+class MeaningIndexBuilder:
+    """Collects stem -> {entry id: score} per language; encode() produces the JSON form."""
+
+    def __init__(self):
+        self.scores = {lang: defaultdict(dict) for lang in LANGUAGES}
+
+    def add(self, entry):
+        entry_id = entry["id"]
+        for lang, field in LANGUAGES.items():
+            table = self.scores[lang]
+            for i, definition in enumerate(entry.get(field) or ()):
+                words = stems(definition, lang)
+                score = 3 if len(words) == 1 else 2 if i == 0 else 1
+                for stem in words:
+                    row = table[stem]
+                    if row.get(entry_id, 0) < score:
+                        row[entry_id] = score
+
+    def encode(self):
+        languages = {}
+        for lang, table in self.scores.items():
+            terms = sorted(table)
+            postings = []
+            for stem in terms:
+                ranked = sorted(table[stem].items(), key=lambda item: (-item[1], item[0]))
+                postings.append([value for pair in ranked for value in pair])
+            languages[lang] = {"stems": terms, "postings": postings}
+        return {"version": 1, "languages": languages}
+
+
+def build_index(entries):
+    builder = MeaningIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder.encode()
+
+
+def write_index(index, path=INDEX_PATH):
+    dump_json(path, index)
+    return path
+
+
+class MeaningIndex:
+    """Reference query engine over an encoded index (as written to meaning_index.json)."""
+
+    def __init__(self, index):
+        self.languages = index["languages"]
+
+    def posting(self, stem, lang):
+        """{entry id: score} for one stem."""
+        table = self.languages[lang]
+        i = bisect_left(table["stems"], stem)
+        if i == len(table["stems"]) or table["stems"][i] != stem:
+            return {}
+        row = table["postings"][i]
+        return dict(zip(row[::2], row[1::2]))
+
+    def hits(self, stem, languages):
+        """{entry id: score} for one stem in the definitions of any of languages."""
+        merged = {}
+        for language in languages:
+            for entry_id, score in self.posting(stem, language).items():
+                if score > merged.get(entry_id, 0):
+                    merged[entry_id] = score
+        return merged
+
+    def lookup(self, query, lang=None, limit=20):
+        """[(entry id, score), ...] for entries whose definitions have every stem of query, best first.
+
+        The query is stemmed as each language, and each stem is looked up
+        in both languages' definitions: "curing" stems to English "cur",
+        which the Spanish "curar" also stems to.
+        """
+        languages = [lang] if lang else list(LANGUAGES)
+        found = {}
+        for language in languages:
+            query_stems = stems(query, language)
+            if not query_stems:
+                continue
+            hits = sorted((self.hits(stem, languages) for stem in query_stems), key=len)
+            matched = hits[0]
+            for other in hits[1:]:
+                matched = {i: s + other[i] for i, s in matched.items() if i in other}
+            for entry_id, score in matched.items():
+                found[entry_id] = max(score, found.get(entry_id, 0))
+        ranked = sorted(found.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the English/Spanish -> Shipibo meaning index, or query it")
+    parser.add_argument("--query", help="Look up a word or phrase in the freshly built index")
+    parser.add_argument("--lang", choices=sorted(LANGUAGES), help="Only this definition language")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    index = build_index(entries)
+    if args.query:
+        by_id = {e["id"]: e for e in entries}
+        for entry_id, score in MeaningIndex(index).lookup(args.query, args.lang, args.limit):
+            entry = by_id[entry_id]
+            gloss = (entry.get("definitions_english") or entry.get("definitions_spanish") or [""])[0]
+            print(f"  {entry_id:>5}  {score:>2}  {entry['headword']:<20} {gloss[:60]}")
+        return
+    path = write_index(index)
+    counts = ", ".join(f"{lang} {len(table['stems'])}" for lang, table in index["languages"].items())
+    print(f"Wrote {path}: stems {counts}, {path.stat().st_size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
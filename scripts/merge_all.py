@@ -11,66 +11,79 @@ Outputs:
   - data/icaros_merged.json — all icaros, deduplicated by title
   - site/data/icaros.json — same, deployed to site
   - data/vocabulary_merged.json — all vocabulary from every source, deduplicated
+  - data/vocabulary_merged.jsonl — the same words and suffixes, one per line
+    with a "kind" field, for streaming readers (import_vocabulary.py)
+  - data/vocabulary_near_duplicates.json — word pairs a few edits apart
+    (spelling drift or real minimal pairs), for review
 
 Usage:
     python scripts/merge_all.py
     python scripts/merge_all.py --dry-run   # show what would happen without writing
+    python scripts/merge_all.py --no-cache  # re-parse every source
+    python scripts/merge_all.py --near-duplicates merge  # also merge near-duplicates with the same gloss
+
+Sources are reused from a snapshot cache (snapshot_cache.py) while their
+mtime and size are unchanged, so repeated merges and dry-runs skip parsing;
+hits are reported per source.
 """
 
 import argparse
-import json
 import re
 import sys
 from collections import defaultdict
 from datetime import datetime
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-DATA_DIR = ROOT / "data"
-SITE_DATA_DIR = ROOT / "site" / "data"
+from json_io import dump_json, jsonl_sibling, load_json, write_jsonl
+from near_duplicates import find_near_duplicates, meanings_agree, meanings_overlap, near_duplicate_groups
+from orthography import canonical_key
+from paths import DATA_DIR, SITE_DATA_DIR
+from site_artifacts import publish
+from snapshot_cache import SourceSnapshot
 
 
 def normalize_title(title: str) -> str:
     """Normalize icaro title for dedup matching.
 
-    Handles spelling variations like Nokon/Nocon, Tori/Torri,
-    Tsoa/Sowa, etc.
+    canonical_key handles orthography and accents (Nocon/Nokon,
+    Huáata/Waata); the replacements cover the remaining spelling
+    variations like Tori/Torri and Tsoa/Sowa.
     """
-    t = title.lower().strip()
+    t = canonical_key(title)
     # Normalize common spelling variations
-    t = t.replace("nocon", "nokon")
     t = t.replace("torri", "tori")
     t = t.replace("sowa", "tsoa")
-    t = t.replace("sowawa", "tsoawa")
     # Remove punctuation
-    t = re.sub(r'[^a-záéíóúñ\s]', '', t)
+    t = re.sub(r'[^a-zñ\s]', '', t)
     # Collapse whitespace
     t = re.sub(r'\s+', ' ', t).strip()
     return t
 
 
-def load_icaro_course() -> list[dict]:
+def load_source(path, snapshot: SourceSnapshot | None = None):
+    """Parse a source JSON file, through the snapshot cache when one is given."""
+    return snapshot.load(path) if snapshot else load_json(path)
+
+
+def load_icaro_course(snapshot: SourceSnapshot | None = None) -> list[dict]:
     """Load icaros from icaro_course (Koshinete)."""
     path = SITE_DATA_DIR / "icaros.json"
     if not path.exists():
         print(f"Warning: {path} not found")
         return []
-    with open(path, "r", encoding="utf-8") as f:
-        icaros = json.load(f)
+    icaros = load_source(path, snapshot)
     for ic in icaros:
         ic.setdefault("source", "icaro_course")
         ic.setdefault("teacher", "Koshinete (Macarena/Wexa Metsa)")
     return icaros
 
 
-def load_foundation_course() -> list[dict]:
+def load_foundation_course(snapshot: SourceSnapshot | None = None) -> list[dict]:
     """Load icaros from foundation_course (Ayahuasca Foundation, Don Enrique)."""
     path = DATA_DIR / "icaros_foundation.json"
     if not path.exists():
         print(f"Warning: {path} not found")
         return []
-    with open(path, "r", encoding="utf-8") as f:
-        icaros = json.load(f)
+    icaros = load_source(path, snapshot)
     for ic in icaros:
         ic["source"] = "foundation_course"
         ic["teacher"] = "Ayahuasca Foundation (Don Enrique)"
@@ -79,24 +92,22 @@ def load_foundation_course() -> list[dict]:
     return icaros
 
 
-def load_basic_course_vocabulary() -> dict:
+def load_basic_course_vocabulary(snapshot: SourceSnapshot | None = None) -> dict:
     """Load merged vocabulary from basic_course."""
     path = DATA_DIR / "basic_course_vocabulary.json"
     if not path.exists():
         print(f"Warning: {path} not found")
         return {"words": [], "suffixes": [], "prefixes": []}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_source(path, snapshot)
 
 
-def load_foundation_course_vocabulary() -> dict:
+def load_foundation_course_vocabulary(snapshot: SourceSnapshot | None = None) -> dict:
     """Load vocabulary extracted from foundation_course PDFs (vision API)."""
     path = DATA_DIR / "foundation_course_vocabulary.json"
     if not path.exists():
         print(f"Warning: {path} not found")
         return {"words": [], "suffixes": [], "prefixes": []}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_source(path, snapshot)
 
 
 def merge_icaros(icaro_course: list, foundation_course: list, dry_run: bool = False) -> list[dict]:
@@ -215,17 +226,18 @@ def normalize_pos(pos):
 
 
 def deduplicate_words(all_words: list[dict]) -> list[dict]:
-    """Deduplicate words by shipibo form, merging source info."""
+    """Deduplicate words by canonical shipibo form (any orthography), merging source info."""
     seen = {}
 
     for word in all_words:
-        key = word.get("shipibo", "").lower().strip()
+        shipibo = word.get("shipibo", "").lower().strip()
+        key = canonical_key(shipibo)
         if not key:
             continue
 
         if key not in seen:
             entry = {
-                "shipibo": key,
+                "shipibo": shipibo,
                 "part_of_speech": normalize_pos(word.get("part_of_speech")),
                 "meaning": word.get("meaning", ""),
                 "sources": list(word.get("sources", [])),
@@ -234,34 +246,75 @@ def deduplicate_words(all_words: list[dict]) -> list[dict]:
                 entry["context"] = word["context"]
             seen[key] = entry
         else:
-            existing = seen[key]
-            for s in word.get("sources", []):
-                if s not in existing["sources"]:
-                    existing["sources"].append(s)
-            new_meaning = word.get("meaning") or ""
-            old_meaning = existing.get("meaning") or ""
-            if len(new_meaning) > len(old_meaning):
-                existing["meaning"] = new_meaning
-            if word.get("context") and not existing.get("context"):
-                existing["context"] = word["context"]
-            if word.get("part_of_speech") and not existing.get("part_of_speech"):
-                existing["part_of_speech"] = normalize_pos(word["part_of_speech"])
+            merge_word(seen[key], word)
 
     return sorted(seen.values(), key=lambda w: w["shipibo"])
 
 
+def merge_word(existing: dict, word: dict):
+    """Fold a duplicate word's sources, meaning, context and POS into existing."""
+    for s in word.get("sources", []):
+        if s not in existing["sources"]:
+            existing["sources"].append(s)
+    new_meaning = word.get("meaning") or ""
+    old_meaning = existing.get("meaning") or ""
+    if len(new_meaning) > len(old_meaning):
+        existing["meaning"] = new_meaning
+    if word.get("context") and not existing.get("context"):
+        existing["context"] = word["context"]
+    if word.get("part_of_speech") and not existing.get("part_of_speech"):
+        existing["part_of_speech"] = normalize_pos(word["part_of_speech"])
+
+
+def resolve_near_duplicates(words: list[dict], merge: bool = False) -> tuple[list[dict], list[dict]]:
+    """Find words within a few edits of each other (near_duplicates.py).
+
+    Every pair is reported. With merge, pairs whose glosses have the same
+    content words (meanings_agree) are folded into the word with the most
+    sources; the rest, including those that merely share a word, are only
+    flagged. Returns (words, report rows).
+    """
+    pairs = find_near_duplicates([canonical_key(w["shipibo"]) for w in words])
+    report, agreeing = [], []
+    for i, j, distance in pairs:
+        a, b = words[i].get("meaning"), words[j].get("meaning")
+        agree = meanings_agree(a, b)
+        if agree:
+            agreeing.append((i, j, distance))
+        report.append({
+            "distance": distance,
+            "meanings_overlap": meanings_overlap(a, b),
+            "meanings_agree": agree,
+            "merged": merge and agree,
+            "words": [{"shipibo": w["shipibo"], "meaning": w.get("meaning", ""), "sources": list(w["sources"])}
+                      for w in (words[i], words[j])],
+        })
+    if not merge:
+        return words, report
+
+    merged = set()
+    for group in near_duplicate_groups(agreeing):
+        keep = max(group, key=lambda x: (len(words[x]["sources"]), -x))
+        for x in group:
+            if x != keep:
+                merge_word(words[keep], words[x])
+                merged.add(x)
+    return [w for x, w in enumerate(words) if x not in merged], report
+
+
 def deduplicate_suffixes(all_suffixes: list[dict]) -> list[dict]:
-    """Deduplicate suffixes by form."""
+    """Deduplicate suffixes by canonical form."""
     seen = {}
 
     for suffix in all_suffixes:
-        key = suffix.get("form", "").lower().strip()
+        form = suffix.get("form", "").lower().strip()
+        key = canonical_key(form)
         if not key:
             continue
 
         if key not in seen:
             seen[key] = {
-                "form": key,
+                "form": form,
                 "meaning": suffix.get("meaning", ""),
                 "usage": suffix.get("usage", ""),
                 "examples": list(suffix.get("examples", [])),
@@ -283,16 +336,28 @@ def deduplicate_suffixes(all_suffixes: list[dict]) -> list[dict]:
     return sorted(seen.values(), key=lambda s: s["form"])
 
 
+def vocabulary_records(words, suffixes):
+    """Yield the merged vocabulary as flat JSON Lines records: words first, then suffixes."""
+    for w in words:
+        yield {"kind": "word", **w}
+    for s in suffixes:
+        yield {"kind": "suffix", **s}
+
+
 def main():
     parser = argparse.ArgumentParser(description="Merge all courses: icaros + vocabulary")
     parser.add_argument("--dry-run", action="store_true", help="Show results without writing files")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every source instead of using the snapshot cache")
+    parser.add_argument("--near-duplicates", choices=["off", "flag", "merge"], default="flag",
+                        help="Report words a few edits apart (flag, default), also merge those whose meanings agree (merge), or skip")
     args = parser.parse_args()
 
     print("Loading sources...")
+    snapshot = SourceSnapshot("merge_all", enabled=not args.no_cache)
 
     # Load icaros
-    icaro_course = load_icaro_course()
-    foundation_course = load_foundation_course()
+    icaro_course = load_icaro_course(snapshot)
+    foundation_course = load_foundation_course(snapshot)
 
     # Merge icaros with dedup
     merged_icaros = merge_icaros(icaro_course, foundation_course, args.dry_run)
@@ -301,7 +366,7 @@ def main():
     icaro_words, icaro_suffixes = extract_vocab_from_icaros(merged_icaros)
 
     # Load basic_course vocabulary
-    basic = load_basic_course_vocabulary()
+    basic = load_basic_course_vocabulary(snapshot)
     basic_words = []
     for w in basic.get("words", []):
         w["sources"] = [f"basic_course:{s}" for s in w.get("sources", [])]
@@ -312,7 +377,7 @@ def main():
         basic_suffixes.append(s)
 
     # Load foundation_course vocabulary (from vision extraction)
-    foundation = load_foundation_course_vocabulary()
+    foundation = load_foundation_course_vocabulary(snapshot)
     foundation_words = []
     for w in foundation.get("words", []):
         if "sources" not in w:
@@ -334,12 +399,26 @@ def main():
 
     words = deduplicate_words(all_words)
     suffixes = deduplicate_suffixes(all_suffixes)
+    deduped_count = len(words)
+    near_duplicates = []
+    if args.near_duplicates != "off":
+        words, near_duplicates = resolve_near_duplicates(words, merge=args.near_duplicates == "merge")
 
     print(f"\nVocabulary merge results:")
     print(f"  From icaros: {len(icaro_words)} words, {len(icaro_suffixes)} suffixes")
     print(f"  From basic_course: {len(basic_words)} words, {len(basic_suffixes)} suffixes")
     print(f"  From foundation_course: {len(foundation_words)} words, {len(foundation_suffixes)} suffixes")
-    print(f"  After dedup: {len(words)} words, {len(suffixes)} suffixes")
+    print(f"  After dedup: {deduped_count} words, {len(suffixes)} suffixes")
+    if args.near_duplicates != "off":
+        overlapping = sum(1 for row in near_duplicates if row["meanings_overlap"])
+        agreeing = sum(1 for row in near_duplicates if row["meanings_agree"])
+        print(f"  Near-duplicate pairs: {len(near_duplicates)} "
+              f"({overlapping} sharing a gloss word, {agreeing} with the same gloss)")
+        if args.near_duplicates == "merge":
+            print(f"  After near-duplicate merge: {len(words)} words")
+        for row in [r for r in near_duplicates if r["meanings_overlap"]][:10]:
+            a, b = row["words"]
+            print(f"    {a['shipibo']} / {b['shipibo']}: {a['meaning'][:30]} / {b['meaning'][:30]}")
 
     # POS breakdown
     pos_counts = defaultdict(int)
@@ -351,20 +430,21 @@ def main():
         print(f"    {pos}: {count}")
 
     if args.dry_run:
+        snapshot.save()
+        snapshot.report()
         print("\n[Dry run — no files written]")
         return
 
     # Write merged icaros
     icaros_path = DATA_DIR / "icaros_merged.json"
-    with open(icaros_path, "w", encoding="utf-8") as f:
-        json.dump(merged_icaros, f, ensure_ascii=False, indent=2)
+    dump_json(icaros_path, merged_icaros, pretty=True)
     print(f"\nWrote {icaros_path}")
 
     # Write to site
     site_path = SITE_DATA_DIR / "icaros.json"
-    with open(site_path, "w", encoding="utf-8") as f:
-        json.dump(merged_icaros, f, ensure_ascii=False, indent=2)
-    print(f"Wrote {site_path}")
+    dump_json(site_path, merged_icaros, pretty=True)  # tracked in git: keep it diffable
+    snapshot.put(site_path, merged_icaros)  # read back as a source next run
+    print(f"Wrote {site_path}" + (" (new version published)" if publish([site_path.name]) else ""))
 
     # Write merged vocabulary
     vocab_output = {
@@ -381,9 +461,18 @@ def main():
         "suffixes": suffixes,
     }
     vocab_path = DATA_DIR / "vocabulary_merged.json"
-    with open(vocab_path, "w", encoding="utf-8") as f:
-        json.dump(vocab_output, f, ensure_ascii=False, indent=2)
+    dump_json(vocab_path, vocab_output, pretty=True)
     print(f"Wrote {vocab_path}")
+    stream_path = jsonl_sibling(vocab_path)
+    write_jsonl(stream_path, vocabulary_records(words, suffixes))
+    print(f"Wrote {stream_path}")
+    if args.near_duplicates != "off":
+        near_path = DATA_DIR / "vocabulary_near_duplicates.json"
+        dump_json(near_path, {"mode": args.near_duplicates, "pairs": near_duplicates}, pretty=True)
+        print(f"Wrote {near_path}")
+
+    snapshot.save()
+    snapshot.report()
 
     print(f"\nDone! {len(merged_icaros)} icaros, {len(words)} words, {len(suffixes)} suffixes")
 
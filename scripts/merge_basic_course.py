@@ -9,44 +9,52 @@ Usage:
     python scripts/merge_basic_course.py --module 1
     python scripts/merge_basic_course.py --module 1 --module 2 --module 3  # merge all
     python scripts/merge_basic_course.py --all  # merge all modules into one file
+    python scripts/merge_basic_course.py --all --no-cache  # re-parse every source file
+
+Parsed sources are reused from a snapshot cache (snapshot_cache.py) while
+their mtime and size are unchanged; hits are reported per source. Words a
+few edits apart (near_duplicates.py) are listed in the summary for review;
+merge_all.py can merge them.
 """
 
 import argparse
-import json
 import sys
 from collections import defaultdict
 from datetime import datetime
-from pathlib import Path
 
-BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "data"
+from json_io import dump_json, load_json
+from near_duplicates import find_near_duplicates, meanings_overlap
+from orthography import canonical_key
+from paths import DATA_DIR
+from snapshot_cache import SourceSnapshot
+
 PARSED_DIR = DATA_DIR / "basic_course_parsed"
 
 
-def load_parsed_files(module: int) -> list[dict]:
+def load_parsed_files(module: int, snapshot: SourceSnapshot | None = None) -> list[dict]:
     """Load all parsed per-file results for a module."""
     pattern = f"module{module}_*.json"
     files = sorted(PARSED_DIR.glob(pattern))
     results = []
     for f in files:
-        with open(f, "r", encoding="utf-8") as fh:
-            results.append(json.load(fh))
+        results.append(snapshot.load(f) if snapshot else load_json(f))
     return results
 
 
 def deduplicate_words(all_words: list[dict]) -> list[dict]:
-    """Deduplicate words by shipibo form, merging source info."""
-    seen = {}  # key: lowercase shipibo -> merged entry
+    """Deduplicate words by canonical shipibo form (any orthography), merging source info."""
+    seen = {}  # key: canonical shipibo (orthography.py) -> merged entry
 
     for word in all_words:
-        key = word.get("shipibo", "").lower().strip()
+        shipibo = word.get("shipibo", "").lower().strip()
+        key = canonical_key(shipibo)
         if not key:
             continue
 
         if key not in seen:
             # Normalize and store
             entry = {
-                "shipibo": key,
+                "shipibo": shipibo,
                 "part_of_speech": word.get("part_of_speech"),
                 "meaning": word.get("meaning", ""),
                 "sources": list(word.get("sources", [])),
@@ -79,17 +87,18 @@ def deduplicate_words(all_words: list[dict]) -> list[dict]:
 
 
 def deduplicate_suffixes(all_suffixes: list[dict]) -> list[dict]:
-    """Deduplicate suffixes by form, merging examples and sources."""
+    """Deduplicate suffixes by canonical form, merging examples and sources."""
     seen = {}
 
     for suffix in all_suffixes:
-        key = suffix.get("form", "").lower().strip()
+        form = suffix.get("form", "").lower().strip()
+        key = canonical_key(form)
         if not key:
             continue
 
         if key not in seen:
             entry = {
-                "form": key,
+                "form": form,
                 "meaning": suffix.get("meaning", ""),
                 "usage": suffix.get("usage", ""),
                 "examples": list(suffix.get("examples", [])),
@@ -117,17 +126,18 @@ def deduplicate_suffixes(all_suffixes: list[dict]) -> list[dict]:
 
 
 def deduplicate_prefixes(all_prefixes: list[dict]) -> list[dict]:
-    """Deduplicate prefixes by form."""
+    """Deduplicate prefixes by canonical form."""
     seen = {}
 
     for prefix in all_prefixes:
-        key = prefix.get("form", "").lower().strip()
+        form = prefix.get("form", "").lower().strip()
+        key = canonical_key(form)
         if not key:
             continue
 
         if key not in seen:
             entry = {
-                "form": key,
+                "form": form,
                 "meaning": prefix.get("meaning", ""),
                 "usage": prefix.get("usage", ""),
                 "examples": list(prefix.get("examples", [])),
@@ -148,9 +158,9 @@ def deduplicate_prefixes(all_prefixes: list[dict]) -> list[dict]:
     return sorted(seen.values(), key=lambda p: p["form"])
 
 
-def merge_module(module: int) -> dict:
+def merge_module(module: int, snapshot: SourceSnapshot | None = None) -> dict:
     """Merge all parsed files for a module into a single deduplicated output."""
-    parsed_files = load_parsed_files(module)
+    parsed_files = load_parsed_files(module, snapshot)
     if not parsed_files:
         print(f"No parsed files found for Module {module}")
         return None
@@ -226,6 +236,15 @@ def print_summary(data: dict):
         meaning = w.get("meaning", "")[:50]
         print(f"    {w['shipibo']} ({w.get('part_of_speech', '?')}): {meaning}")
 
+    # Near-duplicate candidates (spelling drift, or real minimal pairs)
+    words = data["words"]
+    pairs = find_near_duplicates([canonical_key(w["shipibo"]) for w in words])
+    if pairs:
+        print(f"\n  Near-duplicate candidates: {len(pairs)}")
+        for i, j, distance in pairs[:10]:
+            agree = " (meanings agree)" if meanings_overlap(words[i].get("meaning"), words[j].get("meaning")) else ""
+            print(f"    {words[i]['shipibo']} / {words[j]['shipibo']}: distance {distance}{agree}")
+
     # Sample suffixes
     if data["suffixes"]:
         print(f"\n  Sample suffixes:")
@@ -239,6 +258,7 @@ def main():
     parser.add_argument("--module", type=int, action="append", choices=[1, 2, 3],
                         help="Module(s) to merge (can specify multiple)")
     parser.add_argument("--all", action="store_true", help="Merge all 3 modules into one file")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every source instead of using the snapshot cache")
     args = parser.parse_args()
 
     if args.all:
@@ -249,14 +269,16 @@ def main():
         print("Specify --module N or --all")
         sys.exit(1)
 
+    snapshot = SourceSnapshot("merge_basic_course", enabled=not args.no_cache)
+
     for module in modules:
-        data = merge_module(module)
+        data = merge_module(module, snapshot)
         if data is None:
             continue
 
         output_file = DATA_DIR / f"basic_course_module{module}_vocabulary.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        dump_json(output_file, data, pretty=True)
+        snapshot.put(output_file, data)
 
         print(f"Saved: {output_file}")
         print_summary(data)
@@ -273,8 +295,7 @@ def main():
             if not mod_file.exists():
                 print(f"Warning: {mod_file} not found, skipping")
                 continue
-            with open(mod_file, "r", encoding="utf-8") as f:
-                mod_data = json.load(f)
+            mod_data = snapshot.load(mod_file)
             # Tag sources with module prefix
             for w in mod_data["words"]:
                 w["sources"] = [f"M{module}:{s}" for s in w.get("sources", [])]
@@ -310,12 +331,14 @@ def main():
         }
 
         combined_file = DATA_DIR / "basic_course_vocabulary.json"
-        with open(combined_file, "w", encoding="utf-8") as f:
-            json.dump(combined, f, ensure_ascii=False, indent=2)
+        dump_json(combined_file, combined, pretty=True)
 
         print(f"\nSaved combined: {combined_file}")
         print_summary(combined)
 
+    snapshot.save()
+    snapshot.report()
+
 
 if __name__ == "__main__":
     main()
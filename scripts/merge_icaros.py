@@ -6,26 +6,21 @@ Adds source/description/note fields to all icaros, assigns sequential IDs,
 and writes merged output to both data/icaros.json and site/data/icaros.json.
 """
 
-import json
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parent.parent
-DATA_DIR = ROOT / "data"
-SITE_DATA_DIR = ROOT / "site" / "data"
+from json_io import dump_json, load_json
+from paths import DATA_DIR, SITE_DATA_DIR
 
 
 def main():
     # Load existing Koshi Nete icaros
     koshi_path = DATA_DIR / "icaros.json"
-    with open(koshi_path, 'r', encoding='utf-8') as f:
-        koshi_icaros = json.load(f)
+    koshi_icaros = load_json(koshi_path)
 
     print(f"Loaded {len(koshi_icaros)} Koshi Nete icaros")
 
     # Load Ayahuasca Foundation icaros
     af_path = DATA_DIR / "icaros_foundation.json"
-    with open(af_path, 'r', encoding='utf-8') as f:
-        af_icaros = json.load(f)
+    af_icaros = load_json(af_path)
 
     print(f"Loaded {len(af_icaros)} Ayahuasca Foundation icaros")
 
@@ -48,14 +43,12 @@ def main():
     print(f"Merged: {len(merged)} total icaros")
 
     # Write to data/icaros.json
-    with open(koshi_path, 'w', encoding='utf-8') as f:
-        json.dump(merged, f, ensure_ascii=False, indent=2)
+    dump_json(koshi_path, merged, pretty=True)
     print(f"Wrote {koshi_path}")
 
     # Write to site/data/icaros.json
     site_path = SITE_DATA_DIR / "icaros.json"
-    with open(site_path, 'w', encoding='utf-8') as f:
-        json.dump(merged, f, ensure_ascii=False, indent=2)
+    dump_json(site_path, merged, pretty=True)  # tracked in git: keep it diffable
     print(f"Wrote {site_path}")
 
     # Summary
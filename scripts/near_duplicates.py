@@ -0,0 +1,213 @@
+"""
+Near-duplicate detection for vocabulary merges.
+
+Exact dedup (on canonical_key) misses spelling drift from OCR and the
+LLM parsers: "shipipo"/"shipibo", "manshan"/"mansham". find_near_duplicates()
+finds pairs of words within a small edit distance without comparing every
+pair:
+
+- Blocking (the pigeonhole partition of PassJoin): a word allowed k edits
+  is indexed as k + 1 consecutive segments. k edits can touch at most k
+  of them, so any word within k edits contains one segment unchanged.
+  Segment i can only have shifted by as many edits as fit on its left (i)
+  and right (k - i) given the length difference, so probing looks up just
+  those few substrings of the new word under (length, segment number,
+  segment text), and only meets words sharing a whole segment in about
+  the right place.
+- Filtering: two words within k edits share all but 2k of the longer
+  one's bigrams; candidates that do not are dropped with a set
+  intersection.
+- Verification: a banded Levenshtein on what is left after the common
+  prefix and suffix, giving up once the distance exceeds k.
+
+The allowed distance grows with word length (one edit per
+CHARS_PER_EDIT characters, at most max_distance), so short words, where
+one letter often separates two real words (kana/kano), are never
+matched. Pairs where one word is a prefix of the other are skipped too:
+in an agglutinative language that is usually a suffix, not a typo
+(jakon/jakoni).
+
+Even then, many hits are real minimal pairs (banati "to plant" / manati
+"to wait"), so callers flag pairs for review and merge only those whose
+glosses also agree (meanings_agree; one shared word, as in oshin "red" /
+yoshin "demon (lit. one with the red eyes)", is not enough).
+
+Usage:
+    from near_duplicates import find_near_duplicates
+    pairs = find_near_duplicates(words)  # [(i, j, distance)], i < j
+
+    python scripts/bench_near_duplicates.py  # timings vs an all-pairs scan
+"""
+
+import re
+from collections import Counter, defaultdict
+
+MAX_DISTANCE = 2
+CHARS_PER_EDIT = 5  # words need at least this many characters per allowed edit
+
+# Words too common in glosses to show two meanings agree
+_GLOSS_STOPWORDS = frozenset(
+    "the and for with that this from into one ones someone something thing things "
+    "been being was were are has have had who what which its his her their them "
+    "also very not".split())
+_GLOSS_WORD_RE = re.compile(r"[a-záéíóúñ]{3,}")
+
+
+def allowed_distance(length, max_distance=MAX_DISTANCE):
+    """Edits allowed between two words whose shorter one has this length."""
+    return min(max_distance, length // CHARS_PER_EDIT)
+
+
+def bounded_levenshtein(a, b, k):
+    """Edit distance between a and b, or k + 1 if it is larger than k."""
+    if abs(len(a) - len(b)) > k:
+        return k + 1
+    # Drift is usually one spot mid-word: skip the shared ends
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= k else k + 1
+    if len(a) > len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        # Only cells within k of the diagonal can stay <= k
+        lo, hi = max(1, i - k), min(len(b), i + k)
+        current = [k + 1] * (len(b) + 1)
+        current[0] = i if i <= k else k + 1
+        best = current[0]
+        for j in range(lo, hi + 1):
+            value = previous[j - 1] if ca == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < best:
+                best = value
+        if best > k:
+            return k + 1
+        previous = current
+    return previous[len(b)] if previous[len(b)] <= k else k + 1
+
+
+def _bigrams(word):
+    """Padded bigrams as a set, numbered so repeats count ("an", "an#2", ...)."""
+    padded = f"^{word}$"
+    seen = Counter()
+    grams = set()
+    for i in range(len(padded) - 1):
+        gram = padded[i:i + 2]
+        seen[gram] += 1
+        grams.add(gram if seen[gram] == 1 else f"{gram}#{seen[gram]}")
+    return frozenset(grams)
+
+
+def _segments(length, k):
+    """(start, size) of the k + 1 near-equal segments of a word of this length."""
+    parts = k + 1
+    short, longer = divmod(length, parts)
+    bounds, start = [], 0
+    for i in range(parts):
+        size = short + (1 if i >= parts - longer else 0)
+        bounds.append((start, size))
+        start += size
+    return bounds
+
+
+def find_near_duplicates(words, max_distance=MAX_DISTANCE, skip_prefixes=True):
+    """Return [(i, j, distance)] for pairs of words within their allowed edit distance.
+
+    words are compared as given; pass canonical keys to ignore orthography
+    and accents. Exact duplicates (distance 0) are not reported.
+    """
+    # (length, segment number, segment text) -> ids of earlier words
+    index = defaultdict(list)
+    grams = {}  # id -> bigrams, for words that reach verification
+    pairs = []
+    for j, word in enumerate(words):
+        n = len(word)
+        k = allowed_distance(n, max_distance)
+        if k == 0:
+            continue
+        candidates = set()
+        for length in range(n - k, n + k + 1):
+            if abs(n - length) > allowed_distance(min(n, length), max_distance):
+                continue
+            indexed_k = allowed_distance(length, max_distance)
+            delta = n - length
+            for number, (start, size) in enumerate(_segments(length, indexed_k)):
+                # Segment i can only have moved by the edits on either side of it
+                lo = max(0, start - number, start + delta - (indexed_k - number))
+                hi = min(n - size, start + number, start + delta + (indexed_k - number))
+                for pos in range(lo, hi + 1):
+                    ids = index.get((length, number, word[pos:pos + size]))
+                    if ids:
+                        candidates.update(ids)
+        for number, (start, size) in enumerate(_segments(n, k)):
+            index[n, number, word[start:start + size]].append(j)
+
+        for i in candidates:
+            other = words[i]
+            pair_k = allowed_distance(min(n, len(other)), max_distance)
+            if other == word or abs(n - len(other)) > pair_k:
+                continue
+            if skip_prefixes and (word.startswith(other) or other.startswith(word)):
+                continue
+            # Each edit breaks at most two of the longer word's n + 1 bigrams
+            if i not in grams:
+                grams[i] = _bigrams(other)
+            if j not in grams:
+                grams[j] = _bigrams(word)
+            if len(grams[i] & grams[j]) < max(n, len(other)) + 1 - 2 * pair_k:
+                continue
+            distance = bounded_levenshtein(other, word, pair_k)
+            if distance <= pair_k:
+                pairs.append((i, j, distance))
+    pairs.sort()
+    return pairs
+
+
+def gloss_words(gloss):
+    """The content words of a gloss, lowercased."""
+    return set(_GLOSS_WORD_RE.findall((gloss or "").lower())) - _GLOSS_STOPWORDS
+
+
+def meanings_overlap(a, b):
+    """True when two glosses share a content word ("eight" / "eight")."""
+    return not gloss_words(a).isdisjoint(gloss_words(b))
+
+
+def gloss_covers(part, whole):
+    """True when every content word of part appears in whole ("to sing" / "sing, embody")."""
+    words = gloss_words(part)
+    return bool(words) and words <= gloss_words(whole)
+
+
+def meanings_agree(a, b):
+    """True when each gloss covers the other: the same content words, "eight" / "Eight"."""
+    return gloss_covers(a, b) and gloss_covers(b, a)
+
+
+def near_duplicate_groups(pairs):
+    """Group indices connected by near-duplicate pairs: [[i, j, ...]], each sorted."""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in pairs:
+        parent[find(j)] = find(i)
+    groups = defaultdict(list)
+    for x in parent:
+        groups[find(x)].append(x)
+    return sorted(sorted(g) for g in groups.values())
@@ -0,0 +1,57 @@
+"""
+Orthography-aware canonical keys for matching Shipibo words across sources.
+
+The dictionary is written in the old orthography (c/qu for /k/, hu for
+/w/, acute accents for stress: "nocon", "huáata", "quiqui") and the course
+material in the new one ("nokon", "waata", "kiki"). canonical_key() maps
+both to one key, so a dict lookup on that key matches variant spellings
+in O(1):
+
+1. lowercase, and fold accents and dash variants in one str.translate
+2. one regex pass rewriting qu -> k, c -> k and hu before a vowel -> w
+   ("sh" and "ch" are matched first, so "shui" and "chaka" keep their h/c)
+3. collapse whitespace
+
+Keys are for matching only; never write them back as a headword. Results
+are memoized, since merges look up the same words many times.
+
+spelling_key() is step 1 and 3 alone, for telling a word spelled the
+same way (accents and case aside) from a respelling.
+
+Usage:
+    from orthography import canonical_key
+    canonical_key("Nocon huáata")  # -> "nokon waata"
+    canonical_key("nokon waata")   # -> "nokon waata"
+    spelling_key("Nocon huáata")   # -> "nocon huaata"
+"""
+
+import re
+from functools import lru_cache
+
+# Accents (stress marks and stray diacritics) and dash variants, folded in one pass
+_FOLD = str.maketrans({
+    "á": "a", "é": "e", "í": "i", "ó": "o", "ú": "u",
+    "à": "a", "è": "e", "ì": "i", "ò": "o", "ù": "u",
+    "â": "a", "ê": "e", "î": "i", "ô": "o", "û": "u",
+    "ä": "a", "ë": "e", "ï": "i", "ö": "o", "ü": "u",
+    "—": "-", "–": "-", "‐": "-", "‑": "-",
+})
+
+# Old orthography -> new. Alternatives are tried left to right at each
+# position, so the digraphs that keep their letters are consumed first.
+_SPELLING = {"sh": "sh", "ch": "ch", "qu": "k", "c": "k", "hu": "w"}
+_SPELLING_RE = re.compile(r"sh|ch|qu|hu(?=[aeiou])|c")
+
+_SPACES_RE = re.compile(r"\s+")
+
+
+def spelling_key(text):
+    """The spelling as written, lowercase and accent-folded, in either orthography."""
+    return _SPACES_RE.sub(" ", text.lower().translate(_FOLD)).strip()
+
+
+@lru_cache(maxsize=None)
+def canonical_key(text):
+    """Canonical matching key: lowercase, accent-folded, new orthography."""
+    return _SPELLING_RE.sub(lambda m: _SPELLING[m.group()], spelling_key(text))
+
@@ -8,24 +8,28 @@ and prefixes with their definitions. Saves per-file results for resumability.
 Usage:
     python scripts/parse_basic_course.py --module 1
     python scripts/parse_basic_course.py --module 1 --restart
+    python scripts/parse_basic_course.py --module 1 --incremental  # redo files whose text/prompt changed
 """
 
 import argparse
-import json
 import os
 import sys
 import time
 from datetime import datetime
-from pathlib import Path
 
 from dotenv import load_dotenv
 import anthropic
 
-BASE_DIR = Path(__file__).parent.parent
-DATA_DIR = BASE_DIR / "data"
+from input_hash import input_hash
+from json_io import dump_json, load_json
+from paths import DATA_DIR, ENV_FILE
+from structured_output import VOCABULARY_TOOL, request_items
+
 PARSED_DIR = DATA_DIR / "basic_course_parsed"
 
-load_dotenv(BASE_DIR / ".env")
+load_dotenv(ENV_FILE)
+
+PARSE_MODEL = "claude-haiku-4-5-20251001"
 
 PARSE_PROMPT = """You are extracting Shipibo language vocabulary from a Koshinete course PDF.
 
@@ -55,77 +59,53 @@ For each PREFIX, provide:
 - "usage": grammatical note
 - "examples": array of examples
 
-Return a JSON object with this exact structure:
-{{
-  "words": [...],
-  "suffixes": [...],
-  "prefixes": [...]
-}}
+Record everything with the record_vocabulary tool, using its "words", "suffixes" and "prefixes" arrays.
 
 Important:
 - Extract EVERY vocabulary item, even if it seems basic (greetings, pronouns, etc.)
 - If the text is a writing exercise or icaro analysis, extract all words that are defined or glossed
 - If a word appears multiple times with the same definition, include it only once
-- If the text has very little extractable content, return empty arrays
-- Return ONLY valid JSON, no other text
+- If the text has very little extractable content, record empty arrays
+- Use only the record_vocabulary tool, no other output
 
 TEXT FROM PDF:
 ---
 {text}
 ---
 
-Return the JSON:"""
+Record the vocabulary:"""
 
 
-def parse_with_claude(client: anthropic.Anthropic, filename: str, text: str) -> dict:
-    """Parse vocabulary from PDF text using Claude API."""
+def parse_with_claude(client: anthropic.Anthropic, filename: str, text: str) -> dict | None:
+    """Parse vocabulary from PDF text using Claude API (None on an API error)."""
     if len(text.strip()) < 20:
         return {"words": [], "suffixes": [], "prefixes": []}
 
     prompt = PARSE_PROMPT.format(filename=filename, text=text)
 
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=8192,
+        result, _ = request_items(
+            client,
+            VOCABULARY_TOOL,
             messages=[{"role": "user", "content": prompt}],
+            model=PARSE_MODEL,
+            max_tokens=8192,
+            label=filename,
         )
-
-        response_text = response.content[0].text.strip()
-
-        # Extract JSON from response
-        if response_text.startswith("{"):
-            json_text = response_text
-        else:
-            start = response_text.find("{")
-            end = response_text.rfind("}") + 1
-            if start >= 0 and end > start:
-                json_text = response_text[start:end]
-            else:
-                print(f"    Warning: No JSON found in response")
-                return {"words": [], "suffixes": [], "prefixes": []}
-
-        result = json.loads(json_text)
-
-        # Ensure all keys exist
-        result.setdefault("words", [])
-        result.setdefault("suffixes", [])
-        result.setdefault("prefixes", [])
-
+        result.pop("page_description", None)
         return result
 
-    except json.JSONDecodeError as e:
-        print(f"    Warning: JSON parse error: {e}")
-        return {"words": [], "suffixes": [], "prefixes": []}
     except anthropic.APIError as e:
         print(f"    Warning: API error: {e}")
-        return {"words": [], "suffixes": [], "prefixes": []}
+        return None
 
 
 def main():
     parser = argparse.ArgumentParser(description="Parse Basic Course vocabulary with Claude API")
     parser.add_argument("--module", type=int, required=True, choices=[1, 2, 3])
     parser.add_argument("--restart", action="store_true", help="Ignore cached per-file results")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-parse only files whose input hash (text, prompt, model) changed")
     args = parser.parse_args()
 
     # Check API key
@@ -140,8 +120,7 @@ def main():
         print(f"Run extract_basic_course.py --module {args.module} first")
         sys.exit(1)
 
-    with open(raw_file, "r", encoding="utf-8") as f:
-        raw_data = json.load(f)
+    raw_data = load_json(raw_file)
 
     files = raw_data["files"]
     print(f"Parsing vocabulary from Module {args.module} ({len(files)} PDFs)...")
@@ -154,17 +133,23 @@ def main():
     total_suffixes = 0
     total_prefixes = 0
     skipped = 0
+    failed = 0
 
     for i, file_entry in enumerate(files):
         filename = file_entry["filename"]
         section = file_entry["section"]
         text = file_entry["text"]
 
-        # Check for cached result
+        # Check for cached result (with --incremental, only if its inputs are unchanged)
         cache_file = PARSED_DIR / f"module{args.module}_{section}.json"
+        file_hash = input_hash(filename, text, PARSE_PROMPT, PARSE_MODEL)
+        cached = None
         if cache_file.exists() and not args.restart:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached = json.load(f)
+            cached = load_json(cache_file)
+            if args.incremental and cached.get("input_hash") != file_hash:
+                print(f"  [{i+1}/{len(files)}] {filename} (inputs changed, re-parsing)")
+                cached = None
+        if cached is not None:
             w = len(cached.get("words", []))
             s = len(cached.get("suffixes", []))
             p = len(cached.get("prefixes", []))
@@ -183,16 +168,21 @@ def main():
         else:
             result = parse_with_claude(client, filename, text)
             time.sleep(0.2)  # Rate limiting
+            if result is None:
+                # Not cached, so the next run (--incremental included) parses it again
+                print("    -> Failed, not cached")
+                failed += 1
+                continue
 
         # Add metadata
         result["filename"] = filename
         result["section"] = section
         result["module"] = args.module
+        result["input_hash"] = file_hash
         result["parsed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Save per-file result
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        dump_json(cache_file, result)
 
         w = len(result["words"])
         s = len(result["suffixes"])
@@ -215,6 +205,8 @@ def main():
     print(f"  Suffixes: {total_suffixes}")
     print(f"  Prefixes: {total_prefixes}")
     print(f"  Skipped (no text): {skipped}")
+    if failed:
+        print(f"  Failed: {failed} files (rerun to retry them)")
     print(f"\nPer-file results saved in {PARSED_DIR}/")
     print(f"Run merge_basic_course.py --module {args.module} to deduplicate and produce final output.")
 
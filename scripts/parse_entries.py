@@ -4,20 +4,27 @@ Step 2: Parse OCR text into structured entries using Claude API.
 
 Pre-splits OCR text at headword boundaries so each API call parses
 one entry, avoiding dropped entries on dense pages.
+
+Parsed entries are appended to a .jsonl sibling of the output in chunk
+order as they come back, so translate_entries.py --follow can start on
+them before parsing finishes; the pretty .json is written at the end.
 """
 
-import json
 import os
 import re
 import sys
 import time
-from pathlib import Path
 
 from dotenv import load_dotenv
 import anthropic
 
+from json_io import JsonArrayWriter, JsonlWriter, iter_jsonl, jsonl_sibling, load_json
+from paths import DATA_DIR, ENV_FILE
+from progress_journal import ProgressJournal
+from structured_output import ENTRIES_TOOL, request_items
+
 # Load .env file from project root
-load_dotenv(Path(__file__).parent.parent / '.env')
+load_dotenv(ENV_FILE)
 
 
 PARSE_PROMPT = """Parse this Shipibo-Spanish dictionary entry into structured JSON.
@@ -40,7 +47,7 @@ Extract the following fields:
 - grammatical_notes: usage notes starting with "-Úsase" or null
 
 Important:
-- Return ONLY a valid JSON array containing one or more entry objects, no other text
+- Record one or more entry objects with the record_entries tool, no other output
 - Each entry should be a complete dictionary entry (headword + definition)
 - If the text contains sub-entries (compounds listed under a main entry), include each as a separate entry in the array
 - If an entry has multiple numbered definitions, include all of them in definitions_spanish array
@@ -51,7 +58,7 @@ OCR TEXT TO PARSE:
 {ocr_text}
 ---
 
-Return the JSON array:"""
+Record the entries:"""
 
 
 # Regex to detect the start of a dictionary entry.
@@ -160,6 +167,66 @@ def split_ocr_into_entries(pages: dict) -> list[dict]:
     return chunks
 
 
+def iter_entry_chunks(pages):
+    """Split OCR pages into entry chunks as the pages arrive.
+
+    Streaming counterpart of split_ocr_into_entries() for pipelines that
+    OCR one page at a time. Text after the last headword seen so far is held
+    back until the next page arrives, since an entry may continue (or a
+    headword line may be completed) on the following page.
+
+    Args:
+        pages: iterable of (page_number, OCR text), in page order
+
+    Yields:
+        {"text": str, "page_number": int} chunks, one per entry.
+    """
+    buffer = ""
+    boundaries = []  # (start_offset in buffer, page_number)
+    first_page = None
+
+    def page_at(offset):
+        page = boundaries[0][1]
+        for start, page_num in boundaries:
+            if start <= offset:
+                page = page_num
+            else:
+                break
+        return page
+
+    for page_num, text in pages:
+        if first_page is None:
+            first_page = page_num
+        boundaries.append((len(buffer), page_num))
+        buffer += clean_page_text(text) + "\n"
+
+        starts = [m.start() for m in ENTRY_START.finditer(buffer)]
+        if len(starts) < 2:
+            continue
+        for start, end in zip(starts, starts[1:]):
+            chunk_text = buffer[start:end].strip()
+            if chunk_text:
+                yield {"text": chunk_text, "page_number": page_at(start)}
+
+        # Keep only the last (possibly unfinished) entry
+        cut = starts[-1]
+        buffer = buffer[cut:]
+        boundaries = [(0, page_at(cut))] + [(start - cut, page_num) for start, page_num in boundaries
+                                            if start > cut]
+
+    if first_page is None:
+        return
+    starts = [m.start() for m in ENTRY_START.finditer(buffer)]
+    if not starts:
+        yield {"text": buffer.strip(), "page_number": page_at(0)}
+        return
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(buffer)
+        chunk_text = buffer[start:end].strip()
+        if chunk_text:
+            yield {"text": chunk_text, "page_number": page_at(start)}
+
+
 def parse_entry_with_claude(client, ocr_text: str, entry_idx: int) -> list[dict]:
     """Parse OCR text for one entry using Claude."""
 
@@ -168,44 +235,26 @@ def parse_entry_with_claude(client, ocr_text: str, entry_idx: int) -> list[dict]
         return []
 
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=8192,
+        payload, _ = request_items(
+            client,
+            ENTRIES_TOOL,
             messages=[{
                 "role": "user",
                 "content": PARSE_PROMPT.format(ocr_text=ocr_text)
-            }]
+            }],
+            model="claude-haiku-4-5-20251001",
+            max_tokens=8192,
+            label=f"entry {entry_idx}",
         )
+        return payload["entries"]
 
-        response_text = response.content[0].text.strip()
-
-        # Extract JSON from response (in case there's any wrapper text)
-        if response_text.startswith('['):
-            json_text = response_text
-        else:
-            # Try to find JSON array in response
-            start = response_text.find('[')
-            end = response_text.rfind(']') + 1
-            if start >= 0 and end > start:
-                json_text = response_text[start:end]
-            else:
-                print(f"  Warning: Could not find JSON in response for entry {entry_idx}")
-                return []
-
-        entries = json.loads(json_text)
-
-        return entries
-
-    except json.JSONDecodeError as e:
-        print(f"  Warning: JSON parse error on entry {entry_idx}: {e}")
-        return []
     except anthropic.APIError as e:
         print(f"  Warning: API error on entry {entry_idx}: {e}")
         return []
 
 
 def main():
-    data_dir = Path(__file__).parent.parent / 'data'
+    data_dir = DATA_DIR
 
     # Determine input file
     if '--sample' in sys.argv:
@@ -225,8 +274,7 @@ def main():
 
     # Load OCR text
     print(f"Loading OCR text from {ocr_file}...")
-    with open(ocr_file, 'r', encoding='utf-8') as f:
-        pages = json.load(f)
+    pages = load_json(ocr_file)
 
     print(f"Loaded {len(pages)} pages")
 
@@ -242,69 +290,83 @@ def main():
 
     client = anthropic.Anthropic()
 
-    # Check for existing progress (resume support)
-    progress_file = output_file.with_suffix('.progress.json')
-    all_entries = []
-    processed_indices = set()
+    # Check for existing progress (resume support): one journal record per chunk
+    progress_file = output_file.with_suffix('.progress.json')  # legacy whole-file progress
+    journal = ProgressJournal(output_file.with_suffix('.journal.jsonl'), key='chunk')
+    results = {}  # chunk index -> parsed entries
 
-    if progress_file.exists() and '--restart' not in sys.argv:
-        print(f"Resuming from {progress_file}...")
-        with open(progress_file, 'r', encoding='utf-8') as f:
-            progress = json.load(f)
-            all_entries = progress.get('entries', [])
-            processed_indices = set(progress.get('processed_indices', []))
-        print(f"  Already processed {len(processed_indices)} chunks, {len(all_entries)} entries")
+    if '--restart' in sys.argv:
+        journal.discard()
+        if progress_file.exists():
+            progress_file.unlink()
+    else:
+        if progress_file.exists():
+            # Fold an older whole-file progress snapshot into the journal
+            progress = load_json(progress_file)
+            journal.append({
+                'chunk': 'legacy',
+                'chunks': sorted(progress.get('processed_indices', [])),
+                'entries': progress.get('entries', []),
+            })
+            progress_file.unlink()
+
+        for record in journal.replay().values():
+            if record['chunk'] == 'legacy':
+                results.update({i: [] for i in record['chunks']})
+                results[-1] = record['entries']
+            else:
+                results[record['chunk']] = record['entries']
+        if results:
+            done = len([i for i in results if i >= 0])
+            print(f"Resuming from {journal.path}...")
+            print(f"  Already processed {done} chunks, {sum(len(e) for e in results.values())} entries")
 
-    # Process each entry chunk
+    # Process each entry chunk, streaming entries (resumed ones included) in chunk order
     total = len(chunks)
+    stream_file = jsonl_sibling(output_file)
+    samples = []
+    with JsonlWriter(stream_file) as out:
+        # A legacy snapshot, if any, covers the earliest chunks
+        out.write_many(results.pop(-1, []))
 
-    for i, chunk in enumerate(chunks):
-        if i in processed_indices:
-            continue
-
-        headword_preview = chunk['text'][:40].replace('\n', ' ')
-        print(f"Processing chunk {i+1}/{total} (page {chunk['page_number']}): {headword_preview}...")
+        for i, chunk in enumerate(chunks):
+            entries = results.pop(i, None)
+            if entries is None:
+                headword_preview = chunk['text'][:40].replace('\n', ' ')
+                print(f"Processing chunk {i+1}/{total} (page {chunk['page_number']}): {headword_preview}...")
 
-        entries = parse_entry_with_claude(client, chunk['text'], i)
+                entries = parse_entry_with_claude(client, chunk['text'], i)
 
-        # Add page number to each entry
-        for entry in entries:
-            entry['page_number'] = chunk['page_number']
+                # Add page number to each entry
+                for entry in entries:
+                    entry['page_number'] = chunk['page_number']
 
-        all_entries.extend(entries)
-        processed_indices.add(i)
+                journal.append({'chunk': i, 'entries': entries})
 
-        if entries:
-            headwords = [e.get('headword', '?') for e in entries]
-            print(f"  Parsed: {', '.join(headwords)}")
-        else:
-            print(f"  No entries parsed")
+                if entries:
+                    headwords = [e.get('headword', '?') for e in entries]
+                    print(f"  Parsed: {', '.join(headwords)}")
+                else:
+                    print(f"  No entries parsed")
 
-        # Save progress every 25 chunks
-        if (i + 1) % 25 == 0:
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'entries': all_entries,
-                    'processed_indices': list(processed_indices)
-                }, f, ensure_ascii=False)
-            print(f"  Progress saved ({len(all_entries)} total entries)")
+                # Small delay to avoid rate limits
+                time.sleep(0.1)
 
-        # Small delay to avoid rate limits
-        time.sleep(0.1)
+            out.write_many(entries)
+            samples.extend(entries[:5 - len(samples)])
 
     # Save final output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_entries, f, ensure_ascii=False, indent=2)
+    with JsonArrayWriter(output_file, pretty=True) as final:
+        final.write_many(iter_jsonl(stream_file))
 
-    print(f"\nDone! Saved {len(all_entries)} entries to {output_file}")
+    print(f"\nDone! Saved {final.count} entries to {output_file} (and {stream_file.name})")
 
-    # Clean up progress file
-    if progress_file.exists():
-        progress_file.unlink()
+    # Clean up progress journal
+    journal.discard()
 
     # Print sample entries
     print("\n=== Sample entries ===")
-    for entry in all_entries[:5]:
+    for entry in samples:
         print(f"\nHeadword: {entry.get('headword')}")
         print(f"  POS: {entry.get('part_of_speech')}")
         etym = entry.get('etymology') or ''
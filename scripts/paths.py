@@ -0,0 +1,16 @@
+"""
+Repository paths shared by the pipeline scripts.
+
+Every script used to recompute ROOT / DATA_DIR from its own __file__; they
+now import them from here so the layout is defined once.
+"""
+
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT / "data"
+SITE_DATA_DIR = ROOT / "site" / "data"
+SCRIPTS_DIR = ROOT / "scripts"
+COURSES_DIR = ROOT / "courses"
+PDF_PATH = ROOT / "shipibo.pdf"
+ENV_FILE = ROOT / ".env"
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Run the data pipeline as a stage graph, skipping stages that are up to date.
+
+Each stage declares the script it runs and the files it reads and writes
+(paths relative to the repo root, globs allowed). Dependencies come from
+those declarations: a stage depends on every other stage that writes one of
+its inputs, and on the stages listed in its "after" (stages that write the
+same file without reading each other's outputs, such as versions.json). A stage is up to date when the content hashes of its inputs and
+its script match the last successful run and its outputs are still the
+files that run (or a later stage) left behind. Independent branches run in
+parallel; a failed stage skips everything downstream of it.
+
+State is kept in data/pipeline_state.json.
+
+Usage:
+    python scripts/pipeline.py status                  # what would run
+    python scripts/pipeline.py run all                 # run everything that changed
+    python scripts/pipeline.py run build_site_data     # a stage and whatever it needs
+    python scripts/pipeline.py run all --force         # ignore the recorded state
+    python scripts/pipeline.py stamp all               # adopt existing outputs as up to date
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import sys
+import threading
+
+from input_hash import input_hash
+from json_io import dump_json, load_json
+from paths import DATA_DIR, ROOT, SCRIPTS_DIR
+
+STATE_FILE = DATA_DIR / "pipeline_state.json"
+
+# name, command (script + args), inputs, outputs, optional "after" (ordering only)
+STAGES = [
+    # Dictionary: OCR branch
+    {"name": "extract_ocr", "cmd": ["extract_ocr.py", "--force"],
+     "inputs": ["shipibo.pdf"],
+     "outputs": ["data/ocr_full.json"]},
+    {"name": "parse_entries", "cmd": ["parse_entries.py"],
+     "inputs": ["data/ocr_full.json"],
+     "outputs": ["data/entries.json", "data/entries.jsonl"]},
+    {"name": "translate_entries", "cmd": ["translate_entries.py"],
+     "inputs": ["data/entries.json"],
+     "outputs": ["data/entries_translated.json", "data/entries_translated.jsonl"]},
+
+    # Dictionary: vision branch and site data
+    {"name": "extract_vision", "cmd": ["extract_vision.py", "--incremental"],
+     "inputs": ["shipibo.pdf"],
+     "outputs": ["data/entries_vision.json", "data/entries_vision.jsonl"]},
+    {"name": "build_site_data", "cmd": ["build_site_data.py"],
+     "inputs": ["data/entries_vision.json", "data/entries_vision.jsonl",
+                "data/entries_vision_section_a.json", "data/entries_vision_section_a.jsonl",
+                "data/entries_section_a_translated.json", "data/entries_section_a_translated.jsonl"],
+     "outputs": ["site/data/entries.json", "site/data/search_index.json", "site/data/autocomplete.json",
+                 "site/data/meaning_index.json", "site/data/word_links.json", "site/data/shards/*.json",
+                 "site/data/versions.json", "data/entry_ids.json"]},
+
+    # Basic Course (one branch per module)
+    *[{"name": f"extract_basic_course_m{m}", "cmd": ["extract_basic_course.py", "--module", str(m)],
+       "inputs": [f"courses/basic_course/Module {m}/*.pdf"],
+       "outputs": [f"data/basic_course_module{m}_raw.json"]} for m in (1, 2, 3)],
+    *[{"name": f"parse_basic_course_m{m}", "cmd": ["parse_basic_course.py", "--module", str(m), "--incremental"],
+       "inputs": [f"data/basic_course_module{m}_raw.json"],
+       "outputs": [f"data/basic_course_parsed/module{m}_*.json"]} for m in (1, 2, 3)],
+    {"name": "merge_basic_course", "cmd": ["merge_basic_course.py", "--all"],
+     "inputs": ["data/basic_course_parsed/module*_*.json"],
+     "outputs": ["data/basic_course_module*_vocabulary.json", "data/basic_course_vocabulary.json"]},
+
+    # Foundation Course
+    {"name": "extract_foundation_course", "cmd": ["extract_foundation_course.py", "--incremental"],
+     "inputs": ["courses/foundation_course/*.pdf"],
+     "outputs": ["data/foundation_course_vocabulary.json"]},
+
+    # Icaros, merge and import
+    {"name": "link_icaros", "cmd": ["link_icaros.py"],
+     "inputs": ["data/icaros.json"],
+     "outputs": ["data/icaros.json", "site/data/icaros.json"]},
+    # after build_site_data: both rewrite site/data/versions.json (site_artifacts.publish)
+    {"name": "merge_all", "cmd": ["merge_all.py"], "after": ["build_site_data"],
+     "inputs": ["site/data/icaros.json", "data/icaros_foundation.json",
+                "data/basic_course_vocabulary.json", "data/foundation_course_vocabulary.json"],
+     "outputs": ["data/icaros_merged.json", "site/data/icaros.json", "site/data/versions.json",
+                 "data/vocabulary_merged.json", "data/vocabulary_merged.jsonl",
+                 "data/vocabulary_near_duplicates.json"]},
+    {"name": "import_vocabulary", "cmd": ["import_vocabulary.py"],
+     "inputs": ["site/data/entries.json", "site/data/icaros.json",
+                "data/vocabulary_merged.json", "data/vocabulary_merged.jsonl"],
+     "outputs": ["site/data/entries.json", "site/data/search_index.json", "site/data/autocomplete.json",
+                 "site/data/meaning_index.json", "site/data/word_links.json", "site/data/shards/*.json",
+                 "site/data/versions.json", "data/entries_with_vocabulary.json", "data/entry_ids.json"]},
+    {"name": "entry_changes", "cmd": ["entry_changes.py"],
+     "inputs": ["site/data/entries.json", "data/entries_imported.json"],
+     "outputs": ["data/entries_changeset.json"]},
+    {"name": "build_d1_sql", "cmd": ["build_d1_sql.py"],
+     "inputs": ["site/data/entries.json", "api/drizzle/*.sql"],
+     "outputs": ["data/d1/entries-*.sql", "data/d1/entries.sqlite"]},
+]
+
+STAGE_BY_NAME = {s["name"]: s for s in STAGES}
+
+
+# --- Graph ---
+
+def _patterns_overlap(a, b):
+    return a == b or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a)
+
+
+def build_dependencies(stages=STAGES):
+    """Return {stage: [upstream stages]}: the stages that write any of its inputs, then its "after"."""
+    deps = {}
+    for stage in stages:
+        deps[stage["name"]] = [
+            other["name"] for other in stages
+            if other is not stage and any(
+                _patterns_overlap(inp, out) for inp in stage["inputs"] for out in other["outputs"]
+            )
+        ]
+        deps[stage["name"]] += [name for name in stage.get("after", ()) if name not in deps[stage["name"]]]
+    return deps
+
+
+def topological_order(deps):
+    """Order stages so every stage comes after its dependencies (declaration order otherwise)."""
+    order = []
+    state = {}  # name -> "visiting" | "done"
+
+    def visit(name, chain):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise ValueError("Dependency cycle: " + " -> ".join(chain + [name]))
+        state[name] = "visiting"
+        for dep in deps[name]:
+            visit(dep, chain + [name])
+        state[name] = "done"
+        order.append(name)
+
+    for name in deps:
+        visit(name, [])
+    return order
+
+
+def select_stages(targets, deps):
+    """Expand target names ('all' or stage names) to those stages plus everything upstream."""
+    if "all" in targets:
+        return set(deps)
+    selected = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in deps:
+            raise SystemExit(f"Unknown stage: {name} (choose from: all, {', '.join(deps)})")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+    return selected
+
+
+# --- Hashing and state ---
+
+def load_state():
+    if not STATE_FILE.exists():
+        return {"stages": {}, "files": {}, "hash_cache": {}}
+    state = load_json(STATE_FILE)
+    for key in ("stages", "files", "hash_cache"):
+        state.setdefault(key, {})
+    return state
+
+
+def save_state(state):
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    dump_json(STATE_FILE, state, sort_keys=True)
+
+
+def expand(pattern):
+    """Return the repo-relative paths matching a declared input/output."""
+    if any(ch in pattern for ch in "*?["):
+        return sorted(p.relative_to(ROOT).as_posix() for p in ROOT.glob(pattern) if p.is_file())
+    return [pattern] if (ROOT / pattern).is_file() else []
+
+
+def file_hash(rel_path, state):
+    """SHA-256 of a file's content, cached in the state by (mtime, size)."""
+    path = ROOT / rel_path
+    st = path.stat()
+    cached = state["hash_cache"].get(rel_path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()[:16]
+    state["hash_cache"][rel_path] = [st.st_mtime_ns, st.st_size, digest]
+    return digest
+
+
+def hash_files(patterns, state):
+    return {path: file_hash(path, state) for pattern in patterns for path in expand(pattern)}
+
+
+def fingerprint(stage, state):
+    """Hash of the stage's command, its script and the content of every input."""
+    script = f"scripts/{stage['cmd'][0]}"
+    parts = [" ".join(stage["cmd"]), file_hash(script, state)]
+    for pattern in stage["inputs"]:
+        parts.append(pattern)
+        for path, digest in hash_files([pattern], state).items():
+            parts.extend([path, digest])
+    return input_hash(*parts)
+
+
+def stage_status(stage, state):
+    """Return (status, reason): status is 'clean', 'dirty' or 'no-inputs'."""
+    if not any(expand(p) for p in stage["inputs"]):
+        return "no-inputs", "none of its inputs exist"
+    recorded = state["stages"].get(stage["name"])
+    if recorded is None:
+        return "dirty", "never run"
+    if recorded["fingerprint"] != fingerprint(stage, state):
+        return "dirty", "inputs or script changed"
+    current = hash_files(stage["outputs"], state)
+    if set(current) != set(recorded["outputs"]):
+        return "dirty", "outputs missing or added"
+    for path, digest in current.items():
+        if state["files"].get(path) != digest:
+            return "dirty", f"{path} was modified outside the pipeline"
+    return "clean", "up to date"
+
+
+def record_run(stage, state):
+    """Record a successful run: fingerprint after the run (stages may rewrite their inputs) and outputs."""
+    outputs = hash_files(stage["outputs"], state)
+    state["files"].update(outputs)
+    state["stages"][stage["name"]] = {"fingerprint": fingerprint(stage, state), "outputs": sorted(outputs)}
+
+
+# --- Running ---
+
+_print_lock = threading.Lock()
+
+
+def run_stage(stage):
+    """Run one stage's script, streaming its output prefixed with the stage name."""
+    import subprocess
+
+    cmd = [sys.executable, "-u", str(SCRIPTS_DIR / stage["cmd"][0]), *stage["cmd"][1:]]
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, encoding="utf-8", errors="replace")
+    for line in proc.stdout:
+        with _print_lock:
+            print(f"[{stage['name']}] {line.rstrip()}")
+    return proc.wait()
+
+
+def run_pipeline(selected, deps, state, jobs=4, force=False):
+    """Run the selected stages in dependency order, in parallel where possible.
+
+    A stage's up-to-date check happens once its dependencies have finished,
+    so a stage whose upstream re-ran but produced identical outputs is still
+    skipped. Returns {stage: 'ran' | 'clean' | 'no-inputs' | 'failed' | 'blocked'}.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    results = {}
+    state_lock = threading.Lock()
+    remaining = [name for name in topological_order(deps) if name in selected]
+
+    def task(name):
+        stage = STAGE_BY_NAME[name]
+        with state_lock:
+            status, reason = stage_status(stage, state)
+        if status == "no-inputs" or (status == "clean" and not force):
+            print(f"[{name}] skipped: {reason}")
+            return status
+        print(f"[{name}] running ({'forced' if force else reason})")
+        if run_stage(stage) != 0:
+            print(f"[{name}] FAILED")
+            return "failed"
+        with state_lock:
+            record_run(stage, state)
+            save_state(state)
+        return "ran"
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while remaining or running:
+            for name in list(remaining):
+                upstream = [d for d in deps[name] if d in selected]
+                if any(results.get(d) in ("failed", "blocked") for d in upstream):
+                    results[name] = "blocked"
+                    print(f"[{name}] skipped: an upstream stage failed")
+                    remaining.remove(name)
+                elif all(d in results for d in upstream):
+                    running[pool.submit(task, name)] = name
+                    remaining.remove(name)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def print_status(selected, deps, state):
+    order = [name for name in topological_order(deps) if name in selected]
+    stale = set()
+    for name in order:
+        status, reason = stage_status(STAGE_BY_NAME[name], state)
+        if status == "clean" and any(d in stale for d in deps[name]):
+            status, reason = "dirty?", "runs if upstream outputs change"
+        if status.startswith("dirty"):
+            stale.add(name)
+        after = f"  (after {', '.join(deps[name])})" if deps[name] else ""
+        print(f"  {status:<10} {name:<28} {reason}{after}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the dictionary data pipeline")
+    parser.add_argument("command", choices=["status", "run", "stamp"])
+    parser.add_argument("targets", nargs="*", default=["all"],
+                        help="Stage names, or 'all' (default); upstream stages are included")
+    parser.add_argument("--jobs", "-j", type=int, default=4, help="Stages to run in parallel (default 4)")
+    parser.add_argument("--force", action="store_true", help="Run selected stages even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="With run: only show what would run")
+    args = parser.parse_args()
+
+    deps = build_dependencies()
+    selected = select_stages(args.targets, deps)
+    state = load_state()
+
+    if args.command == "status" or args.dry_run:
+        print_status(selected, deps, state)
+        save_state(state)  # keep the refreshed hash cache
+        return
+
+    if args.command == "stamp":
+        for name in topological_order(deps):
+            if name in selected and any(expand(p) for p in STAGE_BY_NAME[name]["inputs"]):
+                record_run(STAGE_BY_NAME[name], state)
+                print(f"  stamped {name}")
+        save_state(state)
+        return
+
+    results = run_pipeline(selected, deps, state, jobs=args.jobs, force=args.force)
+    save_state(state)
+
+    summary = {}
+    for name in topological_order(deps):
+        if name in results:
+            summary.setdefault(results[name], []).append(name)
+    print()
+    for result in ("ran", "clean", "no-inputs", "failed", "blocked"):
+        if summary.get(result):
+            print(f"  {result}: {', '.join(summary[result])}")
+    if summary.get("failed") or summary.get("blocked"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Append-only progress journal for resumable extraction runs.
+
+Each completed unit of work (a page, an OCR chunk, a translated entry) is
+appended as one JSON line and fsync'd before the next unit is recorded, so
+a crash loses at most the unit in flight and the cost of persisting a unit
+does not grow with the size of the run. On start, replay() reads the
+journal back (last record per key wins, a torn final line is ignored) and
+compact() rewrites it when it holds duplicates or garbage.
+
+Usage:
+    journal = ProgressJournal(output_file.with_suffix(".journal.jsonl"), key="page")
+    done = journal.replay()            # {page: record}
+    journal.append({"page": 85, "entries": [...]})
+    journal.discard()                  # after the final output is written
+"""
+
+import json
+import os
+
+from json_io import dumps, loads
+
+
+class ProgressJournal:
+    """JSONL journal of completed work units, keyed by one record field."""
+
+    def __init__(self, path, key):
+        self.path = path
+        self.key = key
+        self._fh = None
+
+    def replay(self):
+        """Read the journal and return {key: record}, compacting it if needed."""
+        records = {}
+        if not self.path.exists():
+            return records
+
+        lines = 0
+        bad = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    record = loads(line)
+                except json.JSONDecodeError:
+                    bad += 1  # torn write from a crash mid-append
+                    continue
+                records[record[self.key]] = record
+
+        if bad:
+            print(f"  Journal: skipped {bad} unreadable line(s) in {self.path.name}")
+        if lines != len(records):
+            self.compact(records)
+        return records
+
+    def append(self, record):
+        """Append one record and fsync it to disk."""
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(dumps(record) + "\n")
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+
+    def compact(self, records):
+        """Rewrite the journal with one record per key (atomic replace)."""
+        self.close()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in records.values():
+                f.write(dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def discard(self):
+        """Delete the journal (once the final output has been written)."""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
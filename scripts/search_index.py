@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Precomputed inverted search index for the site's dictionary search.
+
+site/app.js searchEntries() scans every entry on each keystroke,
+lowercasing the headword and every English and Spanish definition as it
+goes. build_site_data.py and import_vocabulary.py now also write
+site/data/search_index.json, built once from the entries:
+
+    {"version": 1, "fields": ["headword", "english", "spanish"], "flag_bits": 3,
+     "terms": ["a", "abeja", ...],                       # sorted
+     "postings": [[delta << 3 | flags, ...], ...]}        # one list per term
+
+Text is lowercased, accent-folded (NFD, combining marks dropped: "Áquí" ->
+"aqui", "ñ" -> "n") and split into alphanumeric tokens. Each posting is
+an entry id (delta-coded within the term, ids ascending) packed with a
+bit per field the term occurs in (1 headword, 2 English, 4 Spanish), so
+the whole index is plain JSON ints.
+
+SearchIndex is the reference query engine for the site to mirror: every
+query token matches the terms it is a prefix of (a binary search over
+the sorted terms), an entry must match every token, and results come
+headword-exact first, then headword, English and Spanish matches, then by
+id. Substring matches inside a word ("nati" in "banati") are no longer
+found; word-prefix matches are.
+
+Usage:
+    python scripts/search_index.py                 # rebuild from site/data/entries.json
+    python scripts/search_index.py --query "agua"  # build and run a query
+    python scripts/bench_search_index.py           # latency vs the linear scan
+"""
+
+import argparse
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import accumulate
+
+from json_io import dump_json, iter_records
+from paths import SITE_DATA_DIR
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+INDEX_PATH = SITE_DATA_DIR / "search_index.json"
+
+HEADWORD, ENGLISH, SPANISH = 1, 2, 4
+FIELDS = ("headword", "english", "spanish")
+FLAG_BITS = 3
+FLAG_MASK = (1 << FLAG_BITS) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold(text):
+    """Lowercase and drop accents and other combining marks."""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(fold(text)) if text else []
+
+
+class SearchIndexBuilder:
+    """Collects postings entry by entry (in any order); encode() produces the JSON form."""
+
+    def __init__(self):
+        # term -> id << FLAG_BITS | flag, one item per occurrence; merged at encode time
+        self.postings = defaultdict(lambda: array("Q"))
+        self.count = 0
+
+    def add(self, entry):
+        entry_id = entry["id"]
+        fields = (
+            (HEADWORD, (entry.get("headword"),)),
+            (ENGLISH, entry.get("definitions_english") or ()),
+            (SPANISH, entry.get("definitions_spanish") or ()),
+        )
+        for flag, texts in fields:
+            seen = set()
+            for text in texts:
+                seen.update(tokenize(text))
+            packed = entry_id << FLAG_BITS | flag
+            for term in seen:
+                self.postings[term].append(packed)
+        self.count += 1
+
+    def encode(self):
+        terms = sorted(self.postings)
+        encoded = []
+        for term in terms:
+            merged = {}
+            for packed in self.postings[term]:
+                entry_id = packed >> FLAG_BITS
+                merged[entry_id] = merged.get(entry_id, 0) | (packed & FLAG_MASK)
+            previous = 0
+            row = []
+            for entry_id in sorted(merged):
+                row.append((entry_id - previous) << FLAG_BITS | merged[entry_id])
+                previous = entry_id
+            encoded.append(row)
+        return {"version": 1, "fields": list(FIELDS), "flag_bits": FLAG_BITS,
+                "terms": terms, "postings": encoded}
+
+
+def build_index(entries):
+    builder = SearchIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder.encode()
+
+
+def write_index(index, path=INDEX_PATH):
+    dump_json(path, index)
+    return path
+
+
+class SearchIndex:
+    """Reference query engine over an encoded index (as written to search_index.json)."""
+
+    def __init__(self, index):
+        self.terms = index["terms"]
+        self.postings = index["postings"]
+        self.flag_bits = index["flag_bits"]
+
+    def term_range(self, prefix):
+        """(lo, hi): the terms starting with prefix are terms[lo:hi]."""
+        lo = bisect_left(self.terms, prefix)
+        return lo, bisect_left(self.terms, prefix + "\uffff", lo)
+
+    def matches(self, prefix):
+        """{entry id: field flags} for every term starting with prefix."""
+        bits, mask = self.flag_bits, (1 << self.flag_bits) - 1
+        found = {}
+        lo, hi = self.term_range(prefix)
+        for row in self.postings[lo:hi]:
+            ids = accumulate(packed >> bits for packed in row)
+            for entry_id, packed in zip(ids, row):
+                found[entry_id] = found.get(entry_id, 0) | (packed & mask)
+        return found
+
+    def search(self, query, limit=50):
+        """Ids of the entries matching every token of query, best first."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Intersect from the smallest hit set, so the dicts only shrink
+        hits = sorted((self.matches(token) for token in tokens), key=len)
+        found = hits[0]
+        for other in hits[1:]:
+            found = {i: f | other[i] for i, f in found.items() if i in other}
+        exact = self._exact_headword_ids(tokens)
+        ranked = sorted(found.items(), key=lambda item: (
+            item[0] not in exact, not item[1] & HEADWORD, not item[1] & ENGLISH, item[0]))
+        return [entry_id for entry_id, _ in ranked[:limit]]
+
+    def _exact_headword_ids(self, tokens):
+        """Ids whose headword has every query token as a whole word, not only a prefix."""
+        bits = self.flag_bits
+        exact = None
+        for token in tokens:
+            i = bisect_left(self.terms, token)
+            if i == len(self.terms) or self.terms[i] != token:
+                return set()
+            row = self.postings[i]
+            ids = {entry_id for entry_id, packed in zip(accumulate(p >> bits for p in row), row)
+                   if packed & HEADWORD}
+            exact = ids if exact is None else exact & ids
+        return exact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the site search index, or query it")
+    parser.add_argument("--query", help="Run a query against the freshly built index")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    index = build_index(entries)
+    if args.query:
+        by_id = {e["id"]: e for e in entries}
+        for entry_id in SearchIndex(index).search(args.query, args.limit):
+            entry = by_id[entry_id]
+            gloss = (entry.get("definitions_english") or entry.get("definitions_spanish") or [""])[0]
+            print(f"  {entry_id:>5}  {entry['headword']:<20} {gloss[:60]}")
+        return
+    path = write_index(index)
+    postings = sum(len(row) for row in index["postings"])
+    print(f"Wrote {path}: {len(index['terms'])} terms, {postings} postings, "
+          f"{path.stat().st_size / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
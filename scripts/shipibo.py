@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the pipeline scripts.
+
+Each subcommand maps to a script module that is imported only when that
+command runs, so data-only commands (build-site-data, merge-all,
+import-vocabulary, ...) never pay for anthropic, pymupdf, PIL or dotenv.
+Arguments after the command name are passed to the script unchanged.
+
+`check-imports` is the regression check for that: it imports each light
+command under `python -X importtime` and fails if a heavy module sneaks
+in or the import takes longer than the budget.
+
+Usage:
+    python scripts/shipibo.py --help
+    python scripts/shipibo.py merge-all --dry-run
+    python scripts/shipibo.py extract-vision --sample
+    python scripts/shipibo.py check-imports
+"""
+
+import os
+import sys
+
+# command -> (module, main function, light, description)
+# light commands only read/write JSON and must start without heavy imports.
+COMMANDS = {
+    "extract-ocr": ("extract_ocr", "main", False, "OCR the dictionary PDF"),
+    "parse-entries": ("parse_entries", "main", False, "Parse OCR text into entries (Claude)"),
+    "translate-entries": ("translate_entries", "main", False, "Translate entry definitions to English (Claude)"),
+    "extract-vision": ("extract_vision", "main", False, "Extract entries from page images (Claude vision)"),
+    "stream": ("stream_pipeline", "main", False, "Stream pages through the pipeline into site shards"),
+    "build-site-data": ("build_site_data", "main", True, "Build site/data/entries.json"),
+    "search-index": ("search_index", "main", True, "Rebuild site/data/search_index.json, or run a query"),
+    "autocomplete-index": ("autocomplete_index", "main", True, "Rebuild the headword autocomplete index"),
+    "meaning-index": ("meaning_index", "main", True, "Rebuild the English/Spanish -> Shipibo meaning index"),
+    "fuzzy-index": ("fuzzy_index", "main", True, "Rebuild the typo-tolerant headword index, or look up a word"),
+    "word-links": ("word_links", "main", True, "Rebuild the word -> entry links for icaro and example text"),
+    "entry-shards": ("entry_shards", "main", True, "Rebuild the letter shards in site/data/shards"),
+    "compact-entries": ("compact_entries", "main", True, "Write the compact columnar site entries"),
+    "site-artifacts": ("site_artifacts", "main", True, "Publish content-hashed, precompressed site data"),
+    "extract-basic-course": ("extract_basic_course", "main", True, "Extract Basic Course PDF text (pdftotext)"),
+    "parse-basic-course": ("parse_basic_course", "main", False, "Parse Basic Course text into vocabulary (Claude)"),
+    "merge-basic-course": ("merge_basic_course", "main", True, "Merge Basic Course vocabulary"),
+    "extract-foundation-course": ("extract_foundation_course", "main", False,
+                                  "Extract Foundation Course vocabulary (Claude vision)"),
+    "extract-icaros": ("extract_icaros", "main", True, "Combine icaro JSON from task outputs"),
+    "merge-icaros": ("merge_icaros", "main", True, "Merge Koshinete and Foundation icaros"),
+    "link-icaros": ("link_icaros", "link_icaros", True, "Link icaro song lines to phrases"),
+    "merge-all": ("merge_all", "main", True, "Merge icaros and vocabulary from all courses"),
+    "import-vocabulary": ("import_vocabulary", "main", True, "Import merged vocabulary into entries.json"),
+    "entry-changes": ("entry_changes", "main", True, "Emit entries changed since the last D1 import"),
+    "build-d1-sql": ("build_d1_sql", "main", True, "Build bulk upsert SQL and a SQLite file for D1 entries"),
+    "pipeline": ("pipeline", "main", True, "Run pipeline stages that are out of date"),
+}
+
+# Modules a light command must never import
+HEAVY_MODULES = ("anthropic", "pymupdf", "fitz", "PIL", "pytesseract", "dotenv", "httpx")
+
+IMPORT_BUDGET_MS = 50  # per light command, on top of interpreter startup
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_command(name):
+    """Import the module behind a command and return its main function."""
+    import importlib
+
+    module_name, func_name, _, _ = COMMANDS[name]
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def print_help():
+    print("usage: shipibo <command> [args...]\n\ncommands:")
+    for name, (_, _, _, description) in COMMANDS.items():
+        print(f"  {name:<27} {description}")
+    print(f"  {'check-imports':<27} Check import time of the light commands")
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_imports(name=None):
+    """Import a command (or nothing) in a fresh interpreter; return {module: (self_us, cumulative_us)}."""
+    import subprocess
+
+    code = "pass" if name is None else f"import shipibo; shipibo.load_command({name!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": SCRIPTS_DIR, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {name} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def check_imports(argv):
+    """Import each light command and report its import cost. Returns an exit code."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="shipibo check-imports",
+                                     description="Import-time regression check for light commands")
+    parser.add_argument("commands", nargs="*", help="Commands to check (default: all light commands)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help=f"Max import time per command in ms (default {IMPORT_BUDGET_MS})")
+    parser.add_argument("--runs", type=int, default=3, help="Take the best of this many runs (default 3)")
+    args = parser.parse_args(argv)
+
+    names = args.commands or [name for name, spec in COMMANDS.items() if spec[2]]
+    baseline = set(measure_imports())
+    failures = 0
+    print(f"  {'command':<22} {'ms':>7} {'modules':>8}  heaviest")
+    for name in names:
+        if name not in COMMANDS:
+            print(f"Unknown command: {name}")
+            return 2
+        best = None
+        for _ in range(args.runs):
+            try:
+                measured = measure_imports(name)
+            except RuntimeError as e:
+                print(f"  {name:<22} FAIL: {str(e).strip().splitlines()[-1]}")
+                failures += 1
+                break
+            modules = {m: t for m, t in measured.items() if m not in baseline}
+            total_ms = sum(self_us for self_us, _ in modules.values()) / 1000
+            if best is None or total_ms < best[0]:
+                best = (total_ms, modules)
+        if best is None:
+            continue
+        total_ms, modules = best
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        top = sorted(modules.items(), key=lambda kv: kv[1][0], reverse=True)[:3]
+        problems = []
+        if heavy:
+            problems.append("imports " + ", ".join(sorted({m.split('.')[0] for m in heavy})))
+        if total_ms > args.budget_ms:
+            problems.append(f"over {args.budget_ms:g} ms budget")
+        failures += bool(problems)
+        print(f"  {name:<22} {total_ms:>7.1f} {len(modules):>8}  "
+              + ", ".join(f"{m} {t[0] / 1000:.1f}" for m, t in top)
+              + (f"  FAIL: {'; '.join(problems)}" if problems else ""))
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help", "help"):
+        print_help()
+        return 0
+    name, rest = argv[0], argv[1:]
+    if name == "check-imports":
+        return check_imports(rest)
+    if name not in COMMANDS:
+        print(f"Unknown command: {name}\n")
+        print_help()
+        return 2
+
+    func = load_command(name)
+    sys.argv = [f"shipibo {name}", *rest]  # scripts read their own arguments
+    result = func()
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Content-hashed, precompressed copies of the site data, with a version manifest.
+
+site/data/entries.json and icaros.json keep fixed names, so neither a
+browser nor the CDN can tell whether they changed without downloading
+them again. After writing them, build_site_data.py, import_vocabulary.py
+and merge_all.py publish each data file here as
+
+    site/data/v/<name>.<hash>.json        the bytes as written
+    site/data/v/<name>.<hash>.json.gz     gzip -9
+    site/data/v/<name>.<hash>.json.br     brotli, when the brotli module is installed
+
+and record it in site/data/versions.json:
+
+    {"version": 1, "files": {"entries.json": {"hash": "3f1c...",
+        "path": "data/v/entries.3f1c....json", "bytes": 2681234,
+        "encodings": {"gzip": 553210, "br": 451022}}, ...}}
+
+The hash is over the file's bytes, so an unchanged file keeps its name:
+it is not rewritten, the service worker keeps serving its cached copy
+(site/service-worker.js), and wrangler does not upload it again
+(scripts/deploy-site.sh). Copies no longer in the manifest, and rows of
+files no longer in DATA_FILES, are removed.
+
+site/app.js loads word_links.json this way. It still gets entries and
+icaros from /api/entries and /api/icaros (D1, the source of truth for
+admin edits), so their published copies are not what the app reads.
+
+Usage:
+    python scripts/site_artifacts.py                      # publish every data file
+    python scripts/site_artifacts.py entries.json
+    python scripts/site_artifacts.py --compare https://shipibo-dictionary.pages.dev/data/versions.json
+"""
+
+import argparse
+
+from input_hash import input_hash
+from json_io import dump_json, load_json
+from paths import SITE_DATA_DIR
+
+VERSIONS_PATH = SITE_DATA_DIR / "versions.json"
+DIST_DIR = SITE_DATA_DIR / "v"
+
+DATA_FILES = ("entries.json", "icaros.json", "search_index.json", "autocomplete.json", "meaning_index.json",
+              "word_links.json", "entries.compact.json")
+
+
+def load_versions(path=VERSIONS_PATH):
+    return load_json(path) if path.exists() else {"version": 1, "files": {}}
+
+
+def hashed_name(name, digest):
+    stem, dot, suffix = name.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+def compressors():
+    """{encoding: (suffix, compress)}: gzip always, brotli when the module is installed."""
+    import gzip
+    found = {"gzip": (".gz", lambda data: gzip.compress(data, 9, mtime=0))}
+    try:
+        import brotli
+    except ImportError:
+        return found
+    found["br"] = (".br", brotli.compress)
+    return found
+
+
+def publish_file(name, data_dir=SITE_DATA_DIR, dist_dir=DIST_DIR):
+    """Write the hashed and compressed copies of one data file; returns its manifest row."""
+    data = (data_dir / name).read_bytes()
+    digest = input_hash(data)
+    target = dist_dir / hashed_name(name, digest)
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    if not target.exists():
+        target.write_bytes(data)
+    encodings = {}
+    for encoding, (suffix, compress) in compressors().items():
+        path = target.with_name(target.name + suffix)
+        if not path.exists():
+            path.write_bytes(compress(data))
+        encodings[encoding] = path.stat().st_size
+    return {
+        "hash": digest,
+        "path": target.relative_to(data_dir.parent).as_posix(),
+        "bytes": len(data),
+        "encodings": encodings,
+    }
+
+
+def publish(names=DATA_FILES, data_dir=SITE_DATA_DIR):
+    """Publish the named data files that exist and update versions.json; returns the names that changed."""
+    versions_path = data_dir / VERSIONS_PATH.name
+    dist_dir = data_dir / DIST_DIR.name
+    versions = load_versions(versions_path)
+    # Files no longer published (fuzzy_index.json) drop out of the manifest
+    files = {name: row for name, row in versions["files"].items() if name in DATA_FILES}
+    changed = []
+    for name in names:
+        if not (data_dir / name).exists():
+            continue
+        row = publish_file(name, data_dir, dist_dir)
+        if files.get(name, {}).get("hash") != row["hash"]:
+            changed.append(name)
+        files[name] = row
+
+    keep = set()
+    for row in files.values():
+        name = row["path"].rpartition("/")[2]
+        keep.update((name, f"{name}.gz", f"{name}.br"))
+    for old in dist_dir.glob("*"):
+        if old.name not in keep:
+            old.unlink()
+
+    versions["files"] = dict(sorted(files.items()))
+    dump_json(versions_path, versions, pretty=True)
+    return changed
+
+
+def compare(other, versions):
+    """Names whose hash differs between two manifests (or that only one has)."""
+    ours, theirs = versions["files"], other.get("files", {})
+    return sorted(name for name in ours.keys() | theirs.keys()
+                  if ours.get(name, {}).get("hash") != theirs.get(name, {}).get("hash"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish content-hashed, precompressed site data files")
+    parser.add_argument("names", nargs="*", help=f"Data files to publish (default: {', '.join(DATA_FILES)})")
+    parser.add_argument("--compare", metavar="URL_OR_PATH",
+                        help="Only list the data files that differ from another versions.json")
+    args = parser.parse_args()
+
+    if args.compare:
+        if "://" in args.compare:
+            import json
+            import urllib.request
+            try:
+                with urllib.request.urlopen(args.compare, timeout=10) as response:
+                    other = json.load(response)
+            except (OSError, ValueError) as e:
+                print(f"Could not fetch {args.compare} ({e}): every data file counts as changed")
+                other = {}
+        else:
+            other = load_json(args.compare)
+        changed = compare(other, load_versions())
+        print(f"Data files changed: {', '.join(changed) if changed else 'none'}")
+        return
+
+    changed = publish(args.names or DATA_FILES)
+    print(f"Wrote {VERSIONS_PATH} (changed: {', '.join(changed) if changed else 'none'})"
+          + ("" if "br" in compressors() else "; brotli not installed, gzip only"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Snapshot cache of parsed source files for the merge stages.
+
+merge_all.py, merge_basic_course.py and import_vocabulary.py read dozens of
+JSON sources on every run, though usually none of them have changed. A
+SourceSnapshot keeps the parsed data of every source a script reads in one
+pickle file (data/.cache/<name>.pickle), keyed by path, mtime, size and
+the loader that parsed it. A run loads that one file and re-parses only
+the sources whose stat changed. Files a script writes and reads back
+later can be put() into the snapshot right after writing, so the next run
+hits them too.
+
+Each load returns a fresh copy of the data, so callers may mutate it (the
+merge scripts rewrite "sources" in place). The cache is only an
+accelerator: a missing, corrupt or old-format snapshot is rebuilt.
+
+Usage:
+    snapshot = SourceSnapshot("merge_all")
+    vocab = snapshot.load(DATA_DIR / "basic_course_vocabulary.json")
+    snapshot.save()
+    snapshot.report()  # per-source hit/miss lines
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+from json_io import load_json
+from paths import DATA_DIR, ROOT
+
+CACHE_DIR = DATA_DIR / ".cache"
+FORMAT_VERSION = 2
+
+
+def _loader_id(loader):
+    return f"{loader.__module__}.{loader.__qualname__}"
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class SourceSnapshot:
+    """Parsed sources of one script, reused while their mtime and size are unchanged."""
+
+    def __init__(self, name, enabled=True, cache_dir=CACHE_DIR):
+        self.path = Path(cache_dir) / f"{name}.pickle"
+        self.enabled = enabled
+        self.entries = {}  # source path -> (mtime_ns, size, loader id, pickled data)
+        self.results = {}  # source path -> "hit" | "miss"
+        self.dirty = False
+        if enabled and self.path.exists():
+            try:
+                with open(self.path, "rb") as f:
+                    version, entries = pickle.load(f)
+                if version == FORMAT_VERSION:
+                    self.entries = entries
+            except Exception as e:  # a bad cache file only costs a re-parse
+                print(f"  Ignoring unreadable snapshot {self.path}: {e}")
+
+    def load(self, path, loader=load_json):
+        """Return the parsed contents of path, from the snapshot when it is unchanged."""
+        key = str(path)
+        if not self.enabled:
+            return loader(path)
+        stamp = (*_stat_key(path), _loader_id(loader))
+        cached = self.entries.get(key)
+        if cached and cached[:3] == stamp:
+            self.results[key] = "hit"
+            return pickle.loads(cached[3])
+        data = loader(path)
+        self._store(key, stamp, data)
+        self.results[key] = "miss"
+        return data
+
+    def put(self, path, data, loader=load_json):
+        """Record data just written to path (as loader would read it), so the next load is a hit."""
+        if self.enabled:
+            self._store(str(path), (*_stat_key(path), _loader_id(loader)), data)
+
+    def _store(self, key, stamp, data):
+        self.entries[key] = (*stamp, pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+        self.dirty = True
+
+    def save(self):
+        """Write the snapshot if anything changed, dropping sources that no longer exist."""
+        if not self.enabled:
+            return
+        for key in [k for k in self.entries if not os.path.exists(k)]:
+            del self.entries[key]
+            self.dirty = True
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp, "wb") as f:
+            pickle.dump((FORMAT_VERSION, self.entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def report(self):
+        """Print cache hits per source read this run (per directory for directories of parts)."""
+        if not self.enabled:
+            print("\nSource cache: disabled")
+            return
+        groups = {}  # source or directory -> [hits, total]
+        for key, result in self.results.items():
+            path = Path(key)
+            dir_files = sum(1 for k in self.results if Path(k).parent == path.parent)
+            name = f"{_display(path.parent)}/" if dir_files > 3 else _display(path)
+            counts = groups.setdefault(name, [0, 0])
+            counts[0] += result == "hit"
+            counts[1] += 1
+        hits = sum(h for h, _ in groups.values())
+        print(f"\nSource cache ({_display(self.path)}): {hits}/{len(self.results)} hits")
+        for name, (h, total) in groups.items():
+            status = "hit" if h == total else "miss" if h == 0 else "partial"
+            print(f"  {status:<7} {h:>3}/{total:<3} {name}")
+
+
+def _display(path):
+    try:
+        return str(Path(path).relative_to(ROOT))
+    except ValueError:
+        return str(path)
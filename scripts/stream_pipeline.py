@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Streaming mode for the dictionary pipeline: pages flow through every stage.
+
+The batch scripts each materialize a whole file (ocr_full.json,
+entries.json, entries_translated.json, site/data/entries.json) before the
+next step starts, so the first usable entry appears only after every stage
+has finished. Here each stage is a generator, connected to the next by a
+bounded queue:
+
+    render -> OCR -> split/parse -> translate -> normalize -> shard writer
+    render -> vision (parse + translate in one call) -> normalize -> shard writer
+
+API-bound stages keep several requests in flight but yield results in page
+order. The writer publishes site entries in shards (rewriting the open shard
+every --flush-seconds) with a manifest, so the first entries are readable
+minutes into a full run.
+
+Usage:
+    python scripts/stream_pipeline.py --sample            # OCR path, first pages
+    python scripts/stream_pipeline.py --vision --sample   # vision path
+    python scripts/stream_pipeline.py --start 85 --end 120 --workers 8
+    python scripts/stream_pipeline.py --output-dir site/data/stream
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue
+
+import anthropic
+import pymupdf
+
+from build_site_data import site_entry
+from extract_ocr import extract_page_image, ocr_page
+from extract_vision import (
+    DICT_END, DICT_START, PDF_PATH, SAMPLE_END, SAMPLE_START, SECTION_A_END, SECTION_A_START,
+    TILE_THRESHOLD, PageFailed, merge_tile_entries, plan_tiles, process_page, render_page_tiles, tile_prompt,
+)
+from json_io import dump_json
+from parse_entries import iter_entry_chunks, parse_entry_with_claude
+from paths import ROOT, SITE_DATA_DIR
+from translate_entries import translate_entry
+
+DEFAULT_OUTPUT_DIR = SITE_DATA_DIR / "stream"
+
+QUEUE_SIZE = 8       # items buffered between two stages
+SHARD_SIZE = 200     # entries per published shard
+FLUSH_SECONDS = 30   # rewrite the open shard at least this often
+
+_DONE = object()
+
+
+# --- Stage plumbing ---
+
+def background(iterable, maxsize=QUEUE_SIZE):
+    """Run a generator in its own thread, buffering up to maxsize items ahead of the consumer."""
+    queue = Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            for item in iterable:
+                queue.put(item)
+        except BaseException as e:  # surfaced in the consumer
+            queue.put(e)
+        else:
+            queue.put(_DONE)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def ordered_map(fn, iterable, workers, window=None):
+    """Apply fn with a thread pool, at most window calls in flight, yielding results in input order."""
+    window = window or workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in iterable:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def flatten(iterable):
+    for items in iterable:
+        yield from items
+
+
+class StageMeter:
+    """Counts the items leaving each stage and when the first one appeared."""
+
+    def __init__(self):
+        self.start = time.time()
+        self.counts = {}
+        self.first = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, name, iterable):
+        for item in iterable:
+            with self._lock:
+                self.counts[name] = self.counts.get(name, 0) + 1
+                if name not in self.first:
+                    self.first[name] = time.time() - self.start
+                    print(f"  [{name}] first item after {self.first[name]:.1f}s")
+            yield item
+
+    def summary(self):
+        for name, count in self.counts.items():
+            print(f"  {name:<10} {count:>6} items, first after {self.first[name]:.1f}s")
+
+
+class ShardWriter:
+    """Publishes site entries as numbered JSON shards plus a manifest.
+
+    The open shard is rewritten every flush_seconds (and whenever it fills
+    up), so readers always see a consistent prefix of the stream. Files are
+    written atomically (dump_json writes a temp file and renames it).
+    """
+
+    def __init__(self, out_dir, shard_size=SHARD_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.out_dir = Path(out_dir)
+        self.shard_size = shard_size
+        self.flush_seconds = flush_seconds
+        self.shards = []   # manifest rows of full shards
+        self.current = []
+        self.total = 0
+        self.last_flush = time.time()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        for old in self.out_dir.glob("entries-*.json"):
+            old.unlink()
+
+    def add(self, entry):
+        self.current.append(entry)
+        self.total += 1
+        if len(self.current) >= self.shard_size:
+            self.flush(full=True)
+        elif time.time() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def close(self):
+        if self.current:
+            self.flush(full=True)
+        self._write_manifest(complete=True)
+
+    def flush(self, full=False):
+        name = f"entries-{len(self.shards):04d}.json"
+        self._write(self.out_dir / name, self.current)
+        row = {
+            "file": name,
+            "count": len(self.current),
+            "first_id": self.current[0]["id"] if self.current else None,
+            "last_id": self.current[-1]["id"] if self.current else None,
+        }
+        if full:
+            self.shards.append(row)
+            self.current = []
+            self._write_manifest(complete=False)
+        else:
+            self._write_manifest(complete=False, open_shard=row)
+        self.last_flush = time.time()
+
+    def _write_manifest(self, complete, open_shard=None):
+        shards = self.shards + ([open_shard] if open_shard else [])
+        self._write(self.out_dir / "manifest.json", {
+            "complete": complete,
+            "entries": self.total,
+            "shards": shards,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+
+    @staticmethod
+    def _write(path, data):
+        dump_json(path, data)
+
+
+# --- Stages ---
+
+def render_pages(pdf_path, page_numbers):
+    """Yield (page_num, PIL image) for each 1-indexed page."""
+    doc = pymupdf.open(str(pdf_path))
+    try:
+        for page_num in page_numbers:
+            if 1 <= page_num <= len(doc):
+                yield page_num, extract_page_image(doc, page_num - 1)
+    finally:
+        doc.close()
+
+
+def render_page_images(pdf_path, page_numbers, tile_plan):
+    """Yield (page_num, [(tile_label, base64 PNG)]) for each 1-indexed page."""
+    doc = pymupdf.open(str(pdf_path))
+    try:
+        for page_num in page_numbers:
+            if 1 <= page_num <= len(doc):
+                yield page_num, render_page_tiles(doc, page_num, tile_plan.get(page_num, 1))
+    finally:
+        doc.close()
+
+
+def ocr_stream(pages, meter, workers, queue_size=QUEUE_SIZE):
+    """render -> OCR -> split -> parse -> translate, yielding translated entries."""
+    texts = ordered_map(lambda page: (page[0], ocr_page(page[1])), pages, workers)
+    texts = background(meter.wrap("ocr", texts), queue_size)
+    chunks = background(meter.wrap("split", iter_entry_chunks(texts)), queue_size)
+
+    client = anthropic.Anthropic()
+
+    def parse(indexed_chunk):
+        i, chunk = indexed_chunk
+        entries = parse_entry_with_claude(client, chunk["text"], i)
+        for entry in entries:
+            entry["page_number"] = chunk["page_number"]
+        return entries
+
+    parsed = flatten(ordered_map(parse, enumerate(chunks), workers))
+    parsed = background(meter.wrap("parse", parsed), queue_size)
+    translated = ordered_map(lambda entry: translate_entry(client, entry), parsed, workers)
+    return background(meter.wrap("translate", translated), queue_size)
+
+
+def vision_stream(images, meter, workers, queue_size=QUEUE_SIZE):
+    """render -> vision, yielding translated entries (one vision call per page or tile)."""
+    client = anthropic.Anthropic()
+
+    def extract(page):
+        page_num, tiles = page
+        results = []
+        for label, img_b64 in tiles:
+            try:
+                if len(tiles) == 1:
+                    _, entries, _ = process_page(client, page_num, img_b64)
+                else:
+                    _, entries, _ = process_page(client, page_num, img_b64, prompt=tile_prompt(label), label=label)
+            except PageFailed as e:
+                # A stream has nothing to retry from: skip the page, rerun extract_vision for it
+                print(f"  {e}: page {page_num} skipped")
+                return []
+            results.append(entries)
+        return merge_tile_entries(results) if len(results) > 1 else results[0]
+
+    entries = flatten(ordered_map(extract, images, workers))
+    return background(meter.wrap("vision", entries), queue_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream PDF pages through the pipeline into site data shards")
+    parser.add_argument("--vision", action="store_true", help="Use the vision path instead of OCR + parse + translate")
+    parser.add_argument("--sample", action="store_true", help=f"Pages {SAMPLE_START}-{SAMPLE_END}")
+    parser.add_argument("--section-a", action="store_true", help=f"Pages {SECTION_A_START}-{SECTION_A_END}")
+    parser.add_argument("--start", type=int, default=None, help="Start page (1-indexed PDF page)")
+    parser.add_argument("--end", type=int, default=None, help="End page (1-indexed PDF page, inclusive)")
+    parser.add_argument("--workers", type=int, default=4, help="Requests in flight per API stage (default 4)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="Items buffered between stages")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="Entries per shard")
+    parser.add_argument("--flush-seconds", type=float, default=FLUSH_SECONDS,
+                        help="Rewrite the open shard at least this often")
+    parser.add_argument("--output-dir", type=str, default=None,
+                        help=f"Shard directory (default {DEFAULT_OUTPUT_DIR.relative_to(ROOT)})")
+    args = parser.parse_args()
+
+    if args.sample:
+        start, end = SAMPLE_START, SAMPLE_END
+    elif args.section_a:
+        start, end = SECTION_A_START, SECTION_A_END
+    else:
+        start, end = args.start or DICT_START, args.end or DICT_END
+    page_numbers = list(range(start, end + 1))
+
+    if not os.environ.get("ANTHROPIC_API_KEY"):
+        print("Error: ANTHROPIC_API_KEY environment variable not set")
+        sys.exit(1)
+    if not PDF_PATH.exists():
+        print(f"PDF not found: {PDF_PATH}")
+        sys.exit(1)
+
+    out_dir = Path(args.output_dir) if args.output_dir else DEFAULT_OUTPUT_DIR
+    if not out_dir.is_absolute():
+        out_dir = ROOT / out_dir
+
+    print(f"Streaming pages {start}-{end} ({'vision' if args.vision else 'OCR'}) -> {out_dir}")
+    meter = StageMeter()
+    if args.vision:
+        tile_plan = plan_tiles(page_numbers, TILE_THRESHOLD)
+        images = background(meter.wrap("render", render_page_images(PDF_PATH, page_numbers, tile_plan)),
+                            args.queue_size)
+        entries = vision_stream(images, meter, args.workers, args.queue_size)
+    else:
+        pages = background(meter.wrap("render", render_pages(PDF_PATH, page_numbers)), args.queue_size)
+        entries = ocr_stream(pages, meter, args.workers, args.queue_size)
+
+    writer = ShardWriter(out_dir, args.shard_size, args.flush_seconds)
+    for i, entry in enumerate(entries):
+        if i == 0:
+            print(f"  [site] first entry after {time.time() - meter.start:.1f}s")
+        writer.add(site_entry(entry, i))
+    writer.close()
+
+    print(f"\nDone in {time.time() - meter.start:.1f}s: {writer.total} entries in "
+          f"{len(writer.shards)} shard(s) at {out_dir}")
+    meter.summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Schema-enforced structured output for the Claude extraction scripts.
+
+Each script used to slice JSON out of free text between the first "[" / "{"
+and the last "]" / "}", then drop the whole page or chunk on a single
+JSONDecodeError. Instead, the scripts now force a tool call whose
+input_schema describes the expected items, validate every item with a
+compiled validator, and re-request only the items that failed validation
+(as a tool_result error in the same conversation).
+
+Schemas cover dictionary entries (parse_entries.py, translate_entries.py,
+extract_vision.py), course vocabulary (parse_basic_course.py,
+extract_foundation_course.py) and icaros (extract_icaros.py).
+"""
+
+import json
+
+MAX_REPAIRS = 2  # follow-up requests for invalid items before dropping them
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_NULLABLE_STRING = {"type": ["string", "null"]}
+
+EXAMPLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "shipibo": {"type": "string"},
+        "spanish": {"type": "string"},
+        "english": {"type": "string"},
+    },
+    "required": ["shipibo"],
+}
+
+# Dictionary entry as produced by parse_entries.py (Spanish only)
+ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "headword": {"type": "string", "minLength": 1},
+        "part_of_speech": _NULLABLE_STRING,
+        "variant_forms": _STRING_LIST,
+        "etymology": _NULLABLE_STRING,
+        "definitions_spanish": _STRING_LIST,
+        "examples": {"type": "array", "items": EXAMPLE_SCHEMA},
+        "synonyms": _STRING_LIST,
+        "cross_references": _STRING_LIST,
+        "grammatical_notes": _NULLABLE_STRING,
+    },
+    "required": ["headword", "definitions_spanish"],
+}
+
+# Dictionary entry with English translations (translate_entries.py, extract_vision.py)
+TRANSLATED_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **ENTRY_SCHEMA["properties"],
+        "scientific_name": _NULLABLE_STRING,
+        "definitions_english": _STRING_LIST,
+    },
+    "required": ["headword", "definitions_spanish", "definitions_english"],
+}
+
+VOCAB_WORD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "shipibo": {"type": "string", "minLength": 1},
+        "part_of_speech": _NULLABLE_STRING,
+        "meaning": {"type": "string"},
+        "context": _NULLABLE_STRING,
+    },
+    "required": ["shipibo", "meaning"],
+}
+
+VOCAB_AFFIX_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "form": {"type": "string", "minLength": 1},
+        "meaning": {"type": "string"},
+        "usage": _NULLABLE_STRING,
+        "examples": _STRING_LIST,
+    },
+    "required": ["form", "meaning"],
+}
+
+ICARO_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "id": {"type": "integer"},
+        "title": {"type": "string", "minLength": 1},
+        "song": {
+            "type": "object",
+            "properties": {
+                "sections": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "repeat": {"type": ["integer", "null"]},
+                            "lines": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "text": {"type": "string"},
+                                        "repeat": {"type": ["integer", "null"]},
+                                        "phrase_idx": {"type": ["integer", "null"]},
+                                    },
+                                    "required": ["text"],
+                                },
+                            },
+                        },
+                        "required": ["lines"],
+                    },
+                },
+            },
+            "required": ["sections"],
+        },
+        "phrases": {
+            "type": ["array", "null"],
+            "items": {
+                "type": "object",
+                "properties": {
+                    "shipibo": {"type": "string"},
+                    "literal_translation": _NULLABLE_STRING,
+                },
+                "required": ["shipibo"],
+            },
+        },
+        "vocabulary": {
+            "type": ["array", "null"],
+            "items": {
+                "type": "object",
+                "properties": {
+                    "shipibo": {"type": "string"},
+                    "pos": _NULLABLE_STRING,
+                    "meaning": {"type": "string"},
+                },
+                "required": ["shipibo"],
+            },
+        },
+        "suffix_reference": {
+            "type": ["array", "null"],
+            "items": {
+                "type": "object",
+                "properties": {"form": {"type": "string"}, "meaning": {"type": "string"}},
+                "required": ["form"],
+            },
+        },
+    },
+    "required": ["title", "song"],
+}
+
+
+# --- Compiled validator ---
+
+_TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+
+def compile_validator(schema):
+    """Compile a JSON schema (the subset used above) into a checking function.
+
+    The schema is walked once; the returned function takes a value and a
+    path string and returns a list of error messages (empty when valid).
+    Supports type (single or list), properties, required, items, enum and
+    minLength.
+    """
+    checks = []
+
+    types = schema.get("type")
+    if types is not None:
+        type_list = [types] if isinstance(types, str) else list(types)
+        type_fns = [_TYPE_CHECKS[t] for t in type_list]
+        expected = " or ".join(type_list)
+
+        def check_type(value, path):
+            if not any(fn(value) for fn in type_fns):
+                return [f"{path}: expected {expected}, got {type(value).__name__}"]
+            return []
+        checks.append((check_type, True))
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path):
+            if value not in allowed:
+                return [f"{path}: {value!r} not one of {allowed}"]
+            return []
+        checks.append((check_enum, False))
+
+    if "minLength" in schema:
+        min_len = schema["minLength"]
+
+        def check_min_length(value, path):
+            if isinstance(value, str) and len(value.strip()) < min_len:
+                return [f"{path}: shorter than {min_len} characters"]
+            return []
+        checks.append((check_min_length, False))
+
+    required = schema.get("required", [])
+    properties = {name: compile_validator(sub) for name, sub in schema.get("properties", {}).items()}
+    if required or properties:
+        def check_object(value, path):
+            if not isinstance(value, dict):
+                return []
+            errors = [f"{path}: missing required field '{name}'" for name in required if name not in value]
+            for name, validate in properties.items():
+                if name in value:
+                    errors.extend(validate(value[name], f"{path}.{name}"))
+            return errors
+        checks.append((check_object, False))
+
+    if "items" in schema:
+        validate_item = compile_validator(schema["items"])
+
+        def check_items(value, path):
+            if not isinstance(value, list):
+                return []
+            errors = []
+            for i, item in enumerate(value):
+                errors.extend(validate_item(item, f"{path}[{i}]"))
+            return errors
+        checks.append((check_items, False))
+
+    def validate(value, path="$"):
+        errors = []
+        for check, is_type_check in checks:
+            found = check(value, path)
+            errors.extend(found)
+            if found and is_type_check:
+                break  # wrong type: deeper checks would only add noise
+        return errors
+
+    return validate
+
+
+# --- Tools ---
+
+def make_tool(name, description, item_schemas, extra_properties=None):
+    """Build a tool definition whose input holds one array per item schema.
+
+    item_schemas maps a top-level key (e.g. "entries", "words") to the schema
+    of one item. The returned dict is passed straight to messages.create();
+    the compiled per-item validators are kept under a private key that is
+    stripped before sending.
+    """
+    properties = {key: {"type": "array", "items": schema} for key, schema in item_schemas.items()}
+    properties.update(extra_properties or {})
+    return {
+        "name": name,
+        "description": description,
+        "input_schema": {
+            "type": "object",
+            "properties": properties,
+            "required": list(item_schemas),
+        },
+        "_validators": {key: compile_validator(schema) for key, schema in item_schemas.items()},
+    }
+
+
+ENTRIES_TOOL = make_tool(
+    "record_entries",
+    "Record the dictionary entries parsed from the text.",
+    {"entries": ENTRY_SCHEMA},
+)
+
+TRANSLATED_ENTRIES_TOOL = make_tool(
+    "record_entries",
+    "Record the dictionary entries with Spanish and English definitions.",
+    {"entries": TRANSLATED_ENTRY_SCHEMA},
+)
+
+VOCABULARY_TOOL = make_tool(
+    "record_vocabulary",
+    "Record the Shipibo words, suffixes and prefixes found in the material.",
+    {"words": VOCAB_WORD_SCHEMA, "suffixes": VOCAB_AFFIX_SCHEMA, "prefixes": VOCAB_AFFIX_SCHEMA},
+    extra_properties={"page_description": {"type": "string"}},
+)
+
+validate_icaro = compile_validator(ICARO_SCHEMA)
+
+
+def tool_param(tool):
+    """Return the tool definition as sent to the API (without validators)."""
+    return {k: v for k, v in tool.items() if not k.startswith("_")}
+
+
+def validate_payload(tool, payload):
+    """Split a tool input into valid items and invalid (key, item, errors) triples."""
+    valid = {}
+    invalid = []
+    for key, validate in tool["_validators"].items():
+        items = payload.get(key)
+        if not isinstance(items, list):
+            items = []
+        valid[key] = []
+        for i, item in enumerate(items):
+            errors = validate(item, f"{key}[{i}]")
+            if errors:
+                invalid.append((key, item, errors))
+            else:
+                valid[key].append(item)
+    return valid, invalid
+
+
+def _tool_use_block(response, tool):
+    for block in response.content:
+        if block.type == "tool_use" and block.name == tool["name"]:
+            return block
+    return None
+
+
+def _repair_message(invalid):
+    lines = [
+        f"{len(invalid)} item(s) failed validation and were not recorded.",
+        "Call the tool again with ONLY the corrected versions of these items "
+        "(leave the other arrays empty). Do not resend items that were accepted.",
+        "",
+    ]
+    for key, item, errors in invalid:
+        lines.append(f"In '{key}':")
+        lines.append(json.dumps(item, ensure_ascii=False))
+        for error in errors:
+            lines.append(f"  - {error}")
+    return "\n".join(lines)
+
+
+def request_items(client, tool, messages, model, max_tokens, max_repairs=MAX_REPAIRS, label="request"):
+    """Call Claude with the tool forced, keeping valid items and repairing the rest.
+
+    Returns (payload, usage): payload maps each item key to its list of valid
+    items (plus any extra top-level fields from the first response), usage is
+    a dict of summed input/output tokens and the first response's
+    stop_reason. API errors propagate to the caller.
+    """
+    params = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "tools": [tool_param(tool)],
+        "tool_choice": {"type": "tool", "name": tool["name"]},
+    }
+    response = client.messages.create(messages=messages, **params)
+    usage = {
+        "input_tokens": response.usage.input_tokens,
+        "output_tokens": response.usage.output_tokens,
+        "stop_reason": response.stop_reason,
+    }
+
+    block = _tool_use_block(response, tool)
+    if block is None:
+        print(f"    {label}: no {tool['name']} tool call in response (stop_reason={response.stop_reason})")
+        return validate_payload(tool, {})[0], usage
+    raw = block.input
+    payload, invalid = validate_payload(tool, raw)
+    for key, value in raw.items():
+        payload.setdefault(key, value)
+
+    for attempt in range(max_repairs):
+        if not invalid:
+            break
+        print(f"    {label}: re-requesting {len(invalid)} invalid item(s) (repair {attempt + 1}/{max_repairs})")
+        messages = messages + [
+            {"role": "assistant", "content": response.content},
+            {"role": "user", "content": [{
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "is_error": True,
+                "content": _repair_message(invalid),
+            }]},
+        ]
+        response = client.messages.create(messages=messages, **params)
+        usage["input_tokens"] += response.usage.input_tokens
+        usage["output_tokens"] += response.usage.output_tokens
+
+        block = _tool_use_block(response, tool)
+        if block is None:
+            break
+        repaired, invalid = validate_payload(tool, block.input)
+        for key, items in repaired.items():
+            payload[key].extend(items)
+
+    if invalid:
+        print(f"    {label}: dropped {len(invalid)} item(s) still invalid: "
+              + "; ".join(errors[0] for _, _, errors in invalid[:3]))
+
+    return payload, usage
@@ -0,0 +1,88 @@
+"""
+Tests for autocomplete_index.py on small hand-made entry lists.
+
+Each case runs with a scan_limit low enough that "top" holds the prefix
+and with one high enough that the range is ranked at query time, so both
+paths of Autocomplete.complete are covered.
+
+Usage:
+    python -m pytest scripts/test_autocomplete_index.py
+"""
+
+import pytest
+
+from autocomplete_index import Autocomplete, AutocompleteBuilder
+
+
+def entry(entry_id, headword, variants=(), definitions=0):
+    return {"id": entry_id, "headword": headword, "variant_forms": list(variants),
+            "definitions_english": ["gloss"] * definitions}
+
+
+def complete(entries, text, k=3, scan_limit=2, query_k=None):
+    builder = AutocompleteBuilder()
+    for e in entries:
+        builder.add(e)
+    return Autocomplete(builder.encode(k=k, scan_limit=scan_limit)).complete(text, query_k)
+
+
+BOTH_PATHS = pytest.mark.parametrize("scan_limit", [1, 1000], ids=["top", "scan"])
+
+# Six "ba" words, heavier the higher the id
+BA = [entry(i, f"ba{letter}", definitions=i) for i, letter in enumerate("cdefgh")]
+
+
+@BOTH_PATHS
+def test_top_k_cutoff(scan_limit):
+    assert complete(BA, "ba", k=3, scan_limit=scan_limit) == [(5, "bah"), (4, "bag"), (3, "baf")]
+    # A query asks for fewer, never for more than the index holds
+    assert complete(BA, "ba", k=3, scan_limit=scan_limit, query_k=2) == [(5, "bah"), (4, "bag")]
+    assert len(complete(BA, "ba", k=3, scan_limit=scan_limit, query_k=50)) == 3
+
+
+@BOTH_PATHS
+def test_one_row_per_entry(scan_limit):
+    # "banaki" is both a variant of entry 1 and the headword of entry 2
+    entries = [entry(1, "bana", ["banaki", "banakin"]), entry(2, "banaki"), entry(3, "bari")]
+    found = complete(entries, "ban", k=5, scan_limit=scan_limit)
+    assert sorted(entry_id for entry_id, _ in found) == [1, 2]
+    # Entry 1 completes on its headword, which outranks its variants
+    assert dict(found)[1] == "bana"
+
+
+def test_repeated_key_keeps_best_score():
+    builder = AutocompleteBuilder()
+    builder.add_key("nokon", 7, 1)
+    builder.add_key("nokon", 7, 4)
+    builder.add_key("nokon", 7, 2)
+    index = builder.encode()
+    assert index["keys"] == ["nokon"]
+    assert index["scores"] == [4]
+
+
+@BOTH_PATHS
+def test_leading_dash(scan_limit):
+    entries = [entry(1, "-quí"), entry(2, "—quiqui"), entry(3, "quena", definitions=1)]
+    found = complete(entries, "qui", k=5, scan_limit=scan_limit)
+    assert found == [(1, "qui"), (2, "quiqui")]
+    # The dash is dropped from the query too
+    assert complete(entries, "-Qui", k=5, scan_limit=scan_limit) == found
+
+
+@BOTH_PATHS
+def test_empty_prefix(scan_limit):
+    for text in ("", "   ", "-", "—"):
+        assert complete(BA, text, scan_limit=scan_limit) == []
+
+
+@BOTH_PATHS
+def test_prefix_longer_than_any_key(scan_limit):
+    assert complete(BA, "bahh", scan_limit=scan_limit) == []
+    assert complete(BA, "bacabcabcabcabc", scan_limit=scan_limit) == []
+    assert complete(BA, "bah", scan_limit=scan_limit) == [(5, "bah")]
+
+
+def test_headword_bonus_outranks_variant():
+    # Same weight: the entry whose headword matches comes first
+    entries = [entry(1, "nocon", ["nokon"]), entry(2, "nokon")]
+    assert complete(entries, "noko", k=5) == [(2, "nokon"), (1, "nokon")]
@@ -0,0 +1,46 @@
+"""
+Tests for fuzzy_index.py: the bit-parallel distance against
+near_duplicates.bounded_levenshtein, and lookups on a small hand-made
+entry list.
+
+Usage:
+    python -m pytest scripts/test_fuzzy_index.py
+"""
+
+import random
+
+import pytest
+
+from fuzzy_index import FuzzyIndex, build_index, distance_from
+from near_duplicates import bounded_levenshtein
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("nokon", "nokon", 0), ("nokon", "nokom", 1), ("shipibo", "shipivo", 1),
+    ("kano", "akno", 2), ("ab", "", 2), ("a", "bcd", 3), ("jakon", "jakoni", 1),
+])
+def test_distance_from(a, b, expected):
+    assert distance_from(a)(b) == expected
+
+
+def test_distance_from_matches_bounded_levenshtein():
+    rng = random.Random(3)
+    for _ in range(5000):
+        a = "".join(rng.choice("abeiknos") for _ in range(rng.randint(1, 9)))
+        b = "".join(rng.choice("abeiknos") for _ in range(rng.randint(0, 9)))
+        exact = bounded_levenshtein(a, b, 20)
+        assert distance_from(a)(b) == exact, (a, b)
+
+
+def entry(entry_id, headword, variants=()):
+    return {"id": entry_id, "headword": headword, "variant_forms": list(variants),
+            "definitions_english": ["gloss"]}
+
+
+def test_lookup():
+    index = FuzzyIndex(build_index([entry(1, "nokon"), entry(2, "shipibo"), entry(3, "jakon", ["jaconi"])]))
+    assert index.lookup("nokom") == [(1, "nokon", 1)]
+    assert index.lookup("shipivo") == [(2, "shipibo", 1)]
+    # c/qu -> k and accents are spelling, not typos
+    assert index.lookup("Jácon") == [(3, "jakon", 0)]
+    assert index.lookup("ni") == []
@@ -0,0 +1,69 @@
+"""
+Tests for the follow mode of json_io.iter_records: a reader started next
+to a JsonlWriter (parse_entries.py & translate_entries.py --follow) gets
+this run's records, whether it starts first or finds an earlier run's
+output on disk.
+
+Usage:
+    python -m pytest scripts/test_json_io.py
+"""
+
+import threading
+import time
+
+import json_io
+from json_io import JsonlWriter, iter_records, write_jsonl
+
+
+def follow_in_background(path):
+    """Start list(iter_records(path, follow=True)) in a thread; returns (thread, result list)."""
+    result = []
+    thread = threading.Thread(target=lambda: result.extend(iter_records(path, follow=True)))
+    thread.start()
+    return thread, result
+
+
+def write_slowly(path, records):
+    with JsonlWriter(path) as out:
+        for record in records:
+            out.write(record)
+            time.sleep(0.1)
+
+
+def test_rerun_follows_new_partial_not_old_jsonl(tmp_path):
+    path = tmp_path / "entries.json"
+    write_jsonl(tmp_path / "entries.jsonl", [{"h": "old"}])
+    writer = JsonlWriter(tmp_path / "entries.jsonl")
+    writer.write({"h": "new1"})
+    thread, result = follow_in_background(path)
+    writer.write({"h": "new2"})
+    writer.close()
+    thread.join(10)
+    assert result == [{"h": "new1"}, {"h": "new2"}]
+
+
+def test_rerun_reader_started_before_writer(tmp_path):
+    path = tmp_path / "entries.json"
+    write_jsonl(tmp_path / "entries.jsonl", [{"h": "old"}])
+    thread, result = follow_in_background(path)
+    time.sleep(0.3)
+    write_slowly(tmp_path / "entries.jsonl", [{"h": "new1"}, {"h": "new2"}])
+    thread.join(10)
+    assert result == [{"h": "new1"}, {"h": "new2"}]
+
+
+def test_fresh_run_reader_started_before_writer(tmp_path):
+    # Neither entries.json nor entries.jsonl exists yet: wait, don't fail or read elsewhere
+    path = tmp_path / "entries.json"
+    thread, result = follow_in_background(path)
+    time.sleep(0.3)
+    write_slowly(tmp_path / "entries.jsonl", [{"h": "a"}, {"h": "b"}, {"h": "c"}])
+    thread.join(10)
+    assert result == [{"h": "a"}, {"h": "b"}, {"h": "c"}]
+
+
+def test_no_writer_within_wait_reads_finished_jsonl(tmp_path, monkeypatch):
+    # The writer already finished (or never comes): after the wait, read what is there
+    monkeypatch.setattr(json_io, "FOLLOW_WAIT", 0.2)
+    write_jsonl(tmp_path / "entries.jsonl", [{"h": "done"}])
+    assert list(iter_records(tmp_path / "entries.json", follow=True)) == [{"h": "done"}]
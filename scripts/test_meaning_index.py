@@ -0,0 +1,59 @@
+"""
+Tests for meaning_index.py on small hand-made entry lists: inflections of
+a word, in English or Spanish, find the same entries, and nouns spelled
+like a verb's stem do not.
+
+Usage:
+    python -m pytest scripts/test_meaning_index.py
+"""
+
+import pytest
+
+from meaning_index import MeaningIndex, build_index, stem_spanish
+
+
+def entry(entry_id, english, spanish):
+    return {"id": entry_id, "headword": f"w{entry_id}",
+            "definitions_english": [english], "definitions_spanish": [spanish]}
+
+
+ENTRIES = [
+    entry(1, "to heal, cure", "sanar"),
+    entry(2, "healer who uses songs to cure", "curandero que usa canciones para curar"),
+    entry(3, "to suck one's skin to heal oneself", "chuparse la piel para curarse"),
+    entry(4, "to suck (e.g., shaman during a healing)", "chupar (p. ej., brujo durante una curación)"),
+    entry(5, "species of toad", "sapo cura"),
+    entry(6, "friar", "cura; fraile"),
+    entry(7, "white", "blanca"),
+]
+
+
+def found(query, lang=None):
+    return {entry_id for entry_id, _ in MeaningIndex(build_index(ENTRIES)).lookup(query, lang, limit=None)}
+
+
+def test_cure_curing_curar_find_the_same_entries():
+    assert found("cure") == found("curing") == found("curar") == {1, 2, 3, 4}
+
+
+@pytest.mark.parametrize("query", ["cured", "cures", "curarse", "curando", "curación", "CURAR"])
+def test_inflections(query):
+    assert found(query) == found("cure")
+
+
+def test_priest_is_not_curing():
+    assert found("cura") == {5, 6}
+    assert found("cura sapo") == {5}
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("curarse", "cur"), ("curandose", "cur"), ("curaciones", "cur"),
+    ("blanca", "blanco"), ("blancos", "blanco"), ("cura", "curo"),
+])
+def test_stem_spanish(word, stem):
+    assert stem_spanish(word) == stem
+
+
+def test_one_language():
+    assert found("blanco", lang="es") == {7}
+    assert found("curing", lang="es") == set()
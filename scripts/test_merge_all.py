@@ -0,0 +1,44 @@
+"""
+Tests for the near-duplicate merge of merge_all.resolve_near_duplicates:
+only pairs with the same gloss are merged; pairs that merely share a gloss
+word are flagged and kept apart.
+
+Usage:
+    python -m pytest scripts/test_merge_all.py
+"""
+
+import pytest
+
+from merge_all import resolve_near_duplicates
+
+
+def word(shipibo, meaning, sources=("basic_course:1.1",)):
+    return {"shipibo": shipibo, "meaning": meaning, "sources": list(sources)}
+
+
+@pytest.mark.parametrize("a, b", [
+    (word("oshin", "red"), word("yoshin", "demon (lit. one with the red eyes)")),
+    (word("jaton", "them (transitive pronoun)"), word("maton", "them (plural transitive pronoun)")),
+    (word("kano ira bewai", "who sing to bring medicine"), word("kena ira bewai", "medicine come/arrive")),
+])
+def test_shared_gloss_word_is_flagged_not_merged(a, b):
+    words, report = resolve_near_duplicates([a, b], merge=True)
+    assert [w["shipibo"] for w in words] == [a["shipibo"], b["shipibo"]]
+    [row] = report
+    assert row["meanings_overlap"] and not row["meanings_agree"] and not row["merged"]
+
+
+def test_same_gloss_is_merged_into_best_attested():
+    a = word("posaka", "eight", ["basic_course:2.1"])
+    b = word("pusaka", "Eight", ["icaros:3", "foundation_course:4.2"])
+    words, report = resolve_near_duplicates([a, b], merge=True)
+    assert [w["shipibo"] for w in words] == ["pusaka"]
+    assert words[0]["sources"] == ["icaros:3", "foundation_course:4.2", "basic_course:2.1"]
+    assert report[0]["merged"]
+
+
+def test_flag_mode_keeps_every_word():
+    words = [word("posaka", "eight"), word("pusaka", "eight")]
+    kept, report = resolve_near_duplicates(words)
+    assert kept == words
+    assert report[0]["meanings_agree"] and not report[0]["merged"]
@@ -0,0 +1,45 @@
+"""
+Tests for word_links.py on small hand-made entry lists.
+
+Usage:
+    python -m pytest scripts/test_word_links.py
+"""
+
+from word_links import WordLinks, build_links
+
+
+def entry(entry_id, headword, variants=(), definitions=1):
+    return {"id": entry_id, "headword": headword, "variant_forms": list(variants),
+            "definitions_english": ["gloss"] * definitions}
+
+
+def lookup(entries, word):
+    return WordLinks(build_links(entries)).lookup(word)
+
+
+def test_spelled_as_the_word_comes_first():
+    # "cano" is heavier, but "kano" is the word as written
+    entries = [entry(1, "cano", definitions=5), entry(2, "kano")]
+    assert lookup(entries, "kano") == [2, 1]
+    assert lookup(entries, "cano") == [1, 2]
+    # A variant spelled as the word still comes first
+    entries = [entry(1, "nihue", definitions=5), entry(2, "jene", ["niwe"])]
+    assert lookup(entries, "niwe") == [2, 1]
+
+
+def test_multi_word_headword():
+    entries = [entry(1, "tsaran iti"), entry(2, "Masa shinan")]
+    assert lookup(entries, "tsaran iti") == [1]
+    assert lookup(entries, "Masa shinan") == [2]
+
+
+def test_headword_before_suffix():
+    entries = [entry(1, "-pari", definitions=5), entry(2, "pari")]
+    assert lookup(entries, "pari") == [2, 1]
+
+
+def test_stem():
+    entries = [entry(1, "neska"), entry(2, "-kin")]
+    links = build_links(entries + [{"id": 3, "headword": "x", "examples": [{"shipibo": "neskashamankin"}]}])
+    assert links["words"]["neskashamankin"] == [1]
+    assert "neskashamankin" in links["stems"]
@@ -1,18 +1,33 @@
 #!/usr/bin/env python3
 """
 Step 3: Translate Spanish definitions to English using Claude API.
+
+Entries are streamed from the parsed input and each translated entry is
+appended to a .jsonl sibling of the output as soon as it is done, so
+build_site_data.py --follow can start on it while translation runs. The
+pretty .json is written from that file at the end. With --follow, the
+input is tailed while parse_entries.py is still writing it.
+
+Usage:
+    python scripts/translate_entries.py
+    python scripts/translate_entries.py --section-a
+    python scripts/translate_entries.py --follow
 """
 
 import json
 import os
 import sys
 import time
-from pathlib import Path
 
 from dotenv import load_dotenv
 import anthropic
 
-load_dotenv(Path(__file__).parent.parent / '.env')
+from json_io import JsonArrayWriter, JsonlWriter, iter_jsonl, iter_records, jsonl_sibling, load_json
+from paths import DATA_DIR, ENV_FILE
+from progress_journal import ProgressJournal
+from structured_output import TRANSLATED_ENTRIES_TOOL, request_items
+
+load_dotenv(ENV_FILE)
 
 TRANSLATE_PROMPT = """Translate this Shipibo dictionary entry from Spanish to English.
 
@@ -29,34 +44,29 @@ Keep all other fields unchanged. Keep the original Spanish text in definitions_s
 Entry to translate:
 {entry_json}
 
-Return ONLY the JSON object with the added definitions_english field (no markdown, no explanation):"""
+Record the translated entry (with the added definitions_english field) as the single item of the record_entries tool:"""
 
 
 def translate_entry(client, entry: dict) -> dict:
     """Translate a single entry's Spanish content to English."""
     try:
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",
-            max_tokens=2048,
+        payload, _ = request_items(
+            client,
+            TRANSLATED_ENTRIES_TOOL,
             messages=[{
                 "role": "user",
                 "content": TRANSLATE_PROMPT.format(entry_json=json.dumps(entry, ensure_ascii=False, indent=2))
-            }]
+            }],
+            model="claude-haiku-4-5-20251001",
+            max_tokens=2048,
+            label=entry.get('headword', '?'),
         )
 
-        text = response.content[0].text.strip()
-
-        # Parse JSON response
-        if text.startswith('{'):
-            return json.loads(text)
-        else:
-            # Try to extract JSON
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            if start >= 0 and end > start:
-                return json.loads(text[start:end])
+        if payload["entries"]:
+            # The tool schema only covers the translated fields: keep the rest (page_number, ...)
+            return {**entry, **payload["entries"][0]}
 
-        return entry  # Return original if parsing fails
+        return entry  # Return original if no valid translation came back
 
     except Exception as e:
         print(f"  Error translating {entry.get('headword')}: {e}")
@@ -64,26 +74,24 @@ def translate_entry(client, entry: dict) -> dict:
 
 
 def main():
-    data_dir = Path(__file__).parent.parent / 'data'
+    data_dir = DATA_DIR
 
-    # Determine input/output files
-    if '--section-a' in sys.argv or not (data_dir / 'entries.json').exists():
+    # Determine input/output files (a followed entries.json may not be written yet)
+    follow = '--follow' in sys.argv
+    if '--section-a' in sys.argv or not (follow or (data_dir / 'entries.json').exists()):
         input_file = data_dir / 'entries_section_a.json'
         output_file = data_dir / 'entries_section_a_translated.json'
     else:
         input_file = data_dir / 'entries.json'
         output_file = data_dir / 'entries_translated.json'
 
-    if not input_file.exists():
+    if not input_file.exists() and not follow:
         print(f"Input file not found: {input_file}")
         sys.exit(1)
 
-    # Load entries
-    print(f"Loading entries from {input_file}...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        entries = json.load(f)
-
-    print(f"Loaded {len(entries)} entries")
+    # Stream entries
+    print(f"Reading entries from {input_file}{' (following)' if follow else ''}...")
+    entries = iter_records(input_file, follow=follow)
 
     if not os.environ.get('ANTHROPIC_API_KEY'):
         print("Error: ANTHROPIC_API_KEY not set")
@@ -91,55 +99,64 @@ def main():
 
     client = anthropic.Anthropic()
 
-    # Check for progress file
-    progress_file = output_file.with_suffix('.progress.json')
-    translated = []
-    start_idx = 0
-
-    if progress_file.exists() and '--restart' not in sys.argv:
-        print(f"Resuming from {progress_file}...")
-        with open(progress_file, 'r', encoding='utf-8') as f:
-            progress = json.load(f)
-            translated = progress.get('translated', [])
-            start_idx = len(translated)
-        print(f"  Already translated {start_idx} entries")
-
-    # Translate each entry
-    total = len(entries)
-    for i, entry in enumerate(entries[start_idx:], start=start_idx):
-        print(f"Translating {i+1}/{total}: {entry.get('headword', '?')}")
-
-        translated_entry = translate_entry(client, entry)
+    # Check for progress journal: one record per translated entry
+    progress_file = output_file.with_suffix('.progress.json')  # legacy whole-file progress
+    journal = ProgressJournal(output_file.with_suffix('.journal.jsonl'), key='index')
+    done = {}  # entry index -> translated entry
 
-        # Ensure original Spanish is preserved
-        if 'definitions_spanish' not in translated_entry:
-            translated_entry['definitions_spanish'] = entry.get('definitions_spanish', [])
-        # Store original Spanish examples
-        translated_entry['examples_original'] = entry.get('examples', [])
-
-        translated.append(translated_entry)
-
-        # Save progress every 20 entries
-        if (i + 1) % 20 == 0:
-            with open(progress_file, 'w', encoding='utf-8') as f:
-                json.dump({'translated': translated}, f, ensure_ascii=False)
-            print(f"  Progress saved")
-
-        time.sleep(0.05)  # Small delay
+    if '--restart' in sys.argv:
+        journal.discard()
+        if progress_file.exists():
+            progress_file.unlink()
+    else:
+        if progress_file.exists():
+            # Fold an older whole-file progress snapshot into the journal
+            progress = load_json(progress_file)
+            for i, translated_entry in enumerate(progress.get('translated', [])):
+                journal.append({'index': i, 'entry': translated_entry})
+            progress_file.unlink()
+
+        done = {i: record['entry'] for i, record in journal.replay().items()}
+        if done:
+            print(f"Resuming from {journal.path}...")
+            print(f"  Already translated {len(done)} entries")
+
+    # Translate each entry, streaming results (resumed ones included) in input order
+    stream_file = jsonl_sibling(output_file)
+    samples = []
+    with JsonlWriter(stream_file) as out:
+        for i, entry in enumerate(entries):
+            translated_entry = done.pop(i, None)
+            if translated_entry is None:
+                print(f"Translating {i+1}: {entry.get('headword', '?')}")
+
+                translated_entry = translate_entry(client, entry)
+
+                # Ensure original Spanish is preserved
+                if 'definitions_spanish' not in translated_entry:
+                    translated_entry['definitions_spanish'] = entry.get('definitions_spanish', [])
+                # Store original Spanish examples
+                translated_entry['examples_original'] = entry.get('examples', [])
+
+                journal.append({'index': i, 'entry': translated_entry})
+                time.sleep(0.05)  # Small delay
+
+            out.write(translated_entry)
+            if len(samples) < 3:
+                samples.append(translated_entry)
 
     # Save final output
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(translated, f, ensure_ascii=False, indent=2)
+    with JsonArrayWriter(output_file, pretty=True) as final:
+        final.write_many(iter_jsonl(stream_file))
 
-    print(f"\nDone! Saved {len(translated)} translated entries to {output_file}")
+    print(f"\nDone! Saved {final.count} translated entries to {output_file} (and {stream_file.name})")
 
-    # Cleanup progress file
-    if progress_file.exists():
-        progress_file.unlink()
+    # Cleanup progress journal
+    journal.discard()
 
     # Show samples
     print("\n=== Sample translated entries ===")
-    for entry in translated[:3]:
+    for entry in samples:
         print(f"\n{entry.get('headword')} ({entry.get('part_of_speech', '?')})")
         print(f"  Spanish: {entry.get('definitions_spanish', [])[:1]}")
         print(f"  English: {entry.get('definitions_english', [])[:1]}")
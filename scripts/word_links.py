@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Word -> entry links for the Shipibo text on the site, resolved at build time.
+
+The icaro pages find the dictionary entry for a word by scanning every
+entry (findDictEntry in site/app.js), and the chat tests every headword
+against every word of a message. build_site_data.py (SiteData) now also
+writes site/data/word_links.json, mapping every Shipibo word the site
+shows to its entries:
+
+    {"version": 1,
+     "words": {"nokon": [3947], "neskashamankin": [3817], ...},   # best entry first
+     "stems": ["neskashamankin", ...]}    # words linked through their stem
+
+Words are the tokens of headwords and variant forms, of every icaro's
+song lines (song.sections[].lines[].text), phrases, root words and
+vocabulary (site/data/icaros.json, when present), and of every example
+sentence (examples[].shipibo). A word's key is its search_index.tokenize
+form, which app.js reproduces (fold accents, lowercase, letters and
+digits only), so a lookup is one property access.
+
+Each word is resolved on its orthography.canonical_key, so the course
+spelling "nokon" links to the dictionary's "nocon". A word that is no
+headword or variant is linked through its longest stem of at least
+MIN_STEM letters that is one, or whose infinitive (stem + "ti") is,
+leaving suffix entries out: "neskashamankin" -> "neska". Those words are
+listed in "stems". The entries of one key are ranked with the forms
+spelled as the word first ("kano" before "cano"), then headwords, variant
+forms and suffix entries ("pari" before "-pari"); within each, heavier
+entries (autocomplete_index.entry_score) first. A multi-word headword is
+keyed with its words run together ("tsaraniti"), as linkKey() would key
+it.
+
+Usage:
+    python scripts/word_links.py                    # rebuild from entries.json and icaros.json
+    python scripts/word_links.py --word "nokon"     # build and look up a word
+    python scripts/bench_word_links.py
+"""
+
+import argparse
+from collections import defaultdict
+
+from autocomplete_index import entry_score
+from headword_index import alternatives
+from json_io import dump_json, iter_records, load_json
+from orthography import canonical_key
+from paths import SITE_DATA_DIR
+from search_index import tokenize
+
+ENTRIES_PATH = SITE_DATA_DIR / "entries.json"
+ICAROS_PATH = SITE_DATA_DIR / "icaros.json"
+LINKS_PATH = SITE_DATA_DIR / "word_links.json"
+
+MIN_STEM = 3
+INFINITIVE = "ti"
+
+# Rank of the form a key comes from: suffix entries ("-pari") come last,
+# and never stand as the stem of a word
+HEADWORD, VARIANT, SUFFIX = 0, 1, 2
+
+
+def word_key(form):
+    """A headword's or variant's key: its tokens run together, as linkKey() in app.js ("tsaran iti" -> "tsaraniti")."""
+    return "".join(tokenize(form))
+
+
+def icaro_texts(icaro):
+    """Every piece of Shipibo text in one icaro."""
+    for section in (icaro.get("song") or {}).get("sections") or ():
+        for line in section.get("lines") or ():
+            yield line.get("text") or ""
+    for phrase in icaro.get("phrases") or ():
+        yield phrase.get("shipibo") or ""
+        yield phrase.get("root_word") or ""
+    for word in icaro.get("vocabulary") or ():
+        yield word.get("shipibo") or ""
+
+
+class WordLinkBuilder:
+    """Collects headword keys and words entry by entry; encode() resolves the words."""
+
+    def __init__(self):
+        self.ranks = defaultdict(dict)  # canonical key -> {entry id: rank tuple}
+        self.exact = defaultdict(set)  # key as spelled -> entry ids
+        self.words = set()
+
+    def add_key(self, key, entry_id, rank):
+        row = self.ranks[canonical_key(key)]
+        row[entry_id] = min(rank, row.get(entry_id, rank))
+
+    def add(self, entry):
+        score = entry_score(entry)
+        forms = [(HEADWORD, alt) for alt in alternatives(entry.get("headword") or "")]
+        forms += [(VARIANT, alt) for variant in entry.get("variant_forms") or () for alt in alternatives(variant)]
+        for kind, form in forms:
+            key = word_key(form)
+            if key:
+                if form.startswith(("-", "\u2014")):
+                    kind = SUFFIX
+                self.add_key(key, entry["id"], (kind, -score, entry["id"]))
+                self.exact[key].add(entry["id"])
+                self.words.add(key)
+        for example in entry.get("examples") or ():
+            self.add_text(example.get("shipibo") if isinstance(example, dict) else None)
+
+    def add_text(self, text):
+        self.words.update(tokenize(text))
+
+    def add_icaros(self, icaros):
+        for icaro in icaros:
+            for text in icaro_texts(icaro):
+                self.add_text(text)
+
+    def resolve(self, word):
+        """(entry ids, best first; whether a stem was used) for one word."""
+        key = canonical_key(word)
+        if key in self.ranks:
+            exact = self.exact.get(word, ())
+            return sorted(self.ranked(key), key=lambda i: i not in exact), False
+        for n in range(len(key) - 1, MIN_STEM - 1, -1):
+            for stem in (key[:n], key[:n] + INFINITIVE):
+                ids = self.ranked(stem, stem=True)
+                if ids:
+                    return ids, True
+        return [], False
+
+    def ranked(self, key, stem=False):
+        row = self.ranks.get(key, {})
+        return sorted((i for i in row if not (stem and row[i][0] == SUFFIX)), key=row.get)
+
+    def encode(self):
+        words, stems = {}, []
+        for word in sorted(self.words):
+            ids, stemmed = self.resolve(word)
+            if ids:
+                words[word] = ids
+                if stemmed:
+                    stems.append(word)
+        return {"version": 1, "words": words, "stems": stems}
+
+
+def build_links(entries, icaros=()):
+    builder = WordLinkBuilder()
+    for entry in entries:
+        builder.add(entry)
+    builder.add_icaros(icaros)
+    return builder.encode()
+
+
+def load_icaros(path=ICAROS_PATH):
+    return load_json(path) if path.exists() else []
+
+
+class WordLinks:
+    """Reference lookup over encoded links (as written to word_links.json)."""
+
+    def __init__(self, links):
+        self.words = links["words"]
+
+    def lookup(self, word):
+        """Entry ids for a word as it appears in the text, best first."""
+        return self.words.get("".join(tokenize(word)), [])
+
+    def link_text(self, text):
+        """[(token, entry ids), ...] for every word of a line or sentence."""
+        return [(token, self.words.get(token, [])) for token in tokenize(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the word -> entry links, or look up a word")
+    parser.add_argument("--word", help="Look up a word (or every word of a line) in the freshly built links")
+    args = parser.parse_args()
+
+    entries = list(iter_records(ENTRIES_PATH))
+    links = build_links(entries, load_icaros())
+    if args.word:
+        by_id = {e["id"]: e for e in entries}
+        for token, ids in WordLinks(links).link_text(args.word):
+            stemmed = " (stem)" if token in links["stems"] else ""
+            print(f"  {token:<20} " + (", ".join(f"{by_id[i]['headword']} [{i}]" for i in ids[:5]) or "-") + stemmed)
+        return
+    dump_json(LINKS_PATH, links)
+    print(f"Wrote {LINKS_PATH}: {len(links['words'])} words linked, {len(links['stems'])} through a stem")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+SQLite-backed page work queue shared by several extraction processes.
+
+Each page is a row that moves pending -> leased -> done. A worker leases
+one page at a time (atomically, under BEGIN IMMEDIATE), keeps the lease
+alive with heartbeats while the API call runs, and stores the page's
+entries on completion. A lease that is not renewed before it expires is
+treated as abandoned (crashed worker) and handed to the next caller, so any
+number of processes can pull from the same run without duplicating pages.
+Pages that failed every attempt go back to pending on the next run
+(retry_failed), and a done page can carry the input hash it was extracted
+from, so an incremental run redoes only pages whose inputs changed
+(invalidate).
+
+Usage:
+    queue = WorkQueue(DATA_DIR / "entries_vision.queue.sqlite")
+    queue.enqueue(range(85, 349))
+    page = queue.lease(worker_id)
+    queue.heartbeat(page, worker_id)
+    queue.complete(page, worker_id, entries, input_hash)
+"""
+
+import sqlite3
+import threading
+import time
+
+from json_io import dumps, loads
+
+LEASE_SECONDS = 300   # a page is reclaimed if its lease isn't renewed in this time
+POLL_SECONDS = 10     # how often an idle worker checks for expired leases
+MAX_ATTEMPTS = 3      # failed attempts before a page is marked failed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    state TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | failed
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    input_hash TEXT,
+    updated_at REAL
+)
+"""
+
+
+class WorkQueue:
+    """Page queue in a local SQLite file; safe across threads and processes."""
+
+    def __init__(self, path, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(pages)")}
+        if "input_hash" not in columns:  # queue files from before input hashes
+            conn.execute("ALTER TABLE pages ADD COLUMN input_hash TEXT")
+
+    def _conn(self):
+        # sqlite3 connections can't be shared between threads: one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, pages):
+        """Add pages to the queue; pages already queued (in any state) are left alone."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO pages (page, updated_at) VALUES (?, ?)",
+            [(p, time.time()) for p in pages],
+        )
+        conn.execute("COMMIT")
+
+    def reset(self, pages):
+        """Put pages back to pending, discarding any stored results."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "UPDATE pages SET state = 'pending', worker = NULL, lease_expires = NULL, "
+            "attempts = 0, result = NULL, input_hash = NULL, updated_at = ? WHERE page = ?",
+            [(time.time(), p) for p in pages],
+        )
+        conn.execute("COMMIT")
+
+    def retry_failed(self, pages):
+        """Put failed pages back to pending with fresh attempts; returns how many."""
+        cur = self._conn().executemany(
+            "UPDATE pages SET state = 'pending', attempts = 0, updated_at = ? "
+            "WHERE page = ? AND state = 'failed'",
+            [(time.time(), p) for p in pages],
+        )
+        return cur.rowcount
+
+    def invalidate(self, input_hashes):
+        """Put done pages whose stored input hash differs from {page: hash} back to pending.
+
+        Returns the pages reset. Workers of the same run pass the same
+        hashes, so they never reset each other's results.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute("SELECT page, input_hash FROM pages WHERE state = 'done'").fetchall()
+        stale = [page for page, stored in rows if page in input_hashes and stored != input_hashes[page]]
+        conn.executemany(
+            "UPDATE pages SET state = 'pending', attempts = 0, result = NULL, input_hash = NULL, "
+            "updated_at = ? WHERE page = ?",
+            [(time.time(), p) for p in stale],
+        )
+        conn.execute("COMMIT")
+        return stale
+
+    def lease(self, worker, pages=None):
+        """Lease the next available page (pending, or leased with an expired lease).
+
+        If pages is given, only those pages are considered. Returns the page
+        number, or None if nothing is available right now.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT page FROM pages WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) ORDER BY page",
+                (now,),
+            ).fetchall()
+            wanted = set(pages) if pages is not None else None
+            page = next((r[0] for r in rows if wanted is None or r[0] in wanted), None)
+            if page is not None:
+                conn.execute(
+                    "UPDATE pages SET state = 'leased', worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE page = ?",
+                    (worker, now + self.lease_seconds, now, page),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return page
+
+    def heartbeat(self, page, worker):
+        """Extend a lease. Returns False if the lease was lost to another worker."""
+        now = time.time()
+        cur = self._conn().execute(
+            "UPDATE pages SET lease_expires = ?, updated_at = ? "
+            "WHERE page = ? AND worker = ? AND state = 'leased'",
+            (now + self.lease_seconds, now, page, worker),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, page, worker, entries, input_hash=None):
+        """Store a page's entries (and the hash of the inputs they came from) and mark it done.
+
+        Returns False if the lease had already passed to another worker (the
+        result is still kept unless the page is already done).
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        cur = conn.execute(
+            "UPDATE pages SET state = 'done', result = ?, input_hash = ?, worker = ?, lease_expires = NULL, "
+            "updated_at = ? WHERE page = ? AND state != 'done'",
+            (dumps(entries), input_hash, worker, now, page),
+        )
+        conn.execute("COMMIT")
+        return cur.rowcount == 1
+
+    def release(self, page, worker):
+        """Give a page back after a failed attempt (marked failed after max_attempts)."""
+        self._conn().execute(
+            "UPDATE pages SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE page = ? AND worker = ? AND state = 'leased'",
+            (self.max_attempts, time.time(), page, worker),
+        )
+
+    def counts(self, pages=None):
+        """Return {state: count}, optionally restricted to the given pages."""
+        rows = self._conn().execute("SELECT page, state FROM pages").fetchall()
+        wanted = set(pages) if pages is not None else None
+        counts = {}
+        for page, state in rows:
+            if wanted is None or page in wanted:
+                counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def results(self, pages=None):
+        """Return {page: entries} for done pages, optionally restricted to the given pages."""
+        rows = self._conn().execute(
+            "SELECT page, result FROM pages WHERE state = 'done' ORDER BY page"
+        ).fetchall()
+        wanted = set(pages) if pages is not None else None
+        return {page: loads(result) for page, result in rows if wanted is None or page in wanted}
+
+
+class LeaseKeeper:
+    """Background thread that heartbeats every page this process holds."""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self._held = {}  # page -> worker id holding the lease
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def hold(self, page, worker):
+        with self._lock:
+            self._held[page] = worker
+
+    def drop(self, page):
+        with self._lock:
+            self._held.pop(page, None)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        interval = self.queue.lease_seconds / 3
+        while not self._stop.wait(interval):
+            with self._lock:
+                held = list(self._held.items())
+            for page, worker in held:
+                if not self.queue.heartbeat(page, worker):
+                    print(f"  Page {page}: lease lost to another worker")
@@ -3,6 +3,9 @@
 
   let ENTRIES = [];
   let ICAROS = [];
+  let ENTRY_BY_ID = {};
+  // Shipibo word -> entry ids, resolved at build time (scripts/word_links.py)
+  let WORD_LINKS = null;
   const app = document.getElementById("app");
 
   // --- Config ---
@@ -506,9 +509,35 @@
     var res = await fetch(API_URL + "/api/entries");
     if (res.ok) {
       ENTRIES = await res.json();
+      ENTRY_BY_ID = {};
+      ENTRIES.forEach(function (e) { ENTRY_BY_ID[e.id] = e; });
     }
   }
 
+  async function loadWordLinks() {
+    // Optional: without the file, lookups fall back to scanning ENTRIES
+    try {
+      var res = await fetch("/data/versions.json");
+      if (!res.ok) return;
+      var file = (await res.json()).files["word_links.json"];
+      if (!file) return;
+      res = await fetch("/" + file.path);
+      if (res.ok) WORD_LINKS = (await res.json()).words;
+    } catch (e) {
+      WORD_LINKS = null;
+    }
+  }
+
+  // Key of a word in WORD_LINKS: accents folded, lowercase, letters and digits only
+  function linkKey(word) {
+    return word.normalize("NFD").replace(/[\u0300-\u036f]/g, "").toLowerCase().replace(/[^a-z0-9]/g, "");
+  }
+
+  function linkedEntries(word) {
+    var ids = WORD_LINKS[linkKey(word)] || [];
+    return ids.map(function (id) { return ENTRY_BY_ID[id]; }).filter(Boolean);
+  }
+
   async function loadIcaros() {
     var res = await fetch(API_URL + "/api/icaros");
     if (res.ok) {
@@ -520,7 +549,7 @@
 
   async function ensureDataLoaded() {
     if (dataLoaded) return;
-    await Promise.all([loadEntries(), loadIcaros()]);
+    await Promise.all([loadEntries(), loadIcaros(), loadWordLinks()]);
     await Promise.all([loadProgress(), loadBookmarks()]);
     dataLoaded = true;
   }
@@ -544,7 +573,7 @@
         setToken(data.token);
         currentUser = data.user;
         renderNav();
-        await Promise.all([loadEntries(), loadIcaros()]);
+        await Promise.all([loadEntries(), loadIcaros(), loadWordLinks()]);
         await Promise.all([loadProgress(), loadBookmarks()]);
         dataLoaded = true;
         route();
@@ -569,7 +598,7 @@
       return; // devLogin calls route() after loading data
     }
     if (currentUser) {
-      await Promise.all([loadEntries(), loadIcaros()]);
+      await Promise.all([loadEntries(), loadIcaros(), loadWordLinks()]);
       await Promise.all([loadProgress(), loadBookmarks()]);
       dataLoaded = true;
     }
@@ -1022,6 +1051,15 @@
   function findDictEntry(word) {
     if (!word) return null;
     var lower = word.toLowerCase().replace(/^[-\u2014]/, "");
+    if (WORD_LINKS) {
+      var ids = WORD_LINKS[linkKey(word)];
+      if (ids && ENTRY_BY_ID[ids[0]]) {
+        // The key folds accents, dashes and spaces: prefer the entry spelled as the word
+        var linked = ids.map(function (id) { return ENTRY_BY_ID[id]; }).filter(Boolean);
+        return linked.find(function (e) { return e.headword.toLowerCase() === lower; }) || linked[0];
+      }
+      // Not linked, or an id missing from ENTRIES (links from another build): scan
+    }
     return ENTRIES.find(function (e) {
       return e.headword.toLowerCase() === lower;
     }) || null;
@@ -2593,22 +2631,35 @@
     if (lastUserMsg && ENTRIES.length) {
       var words = lastUserMsg.toLowerCase().split(/\s+/);
       var matchedEntries = [];
-      ENTRIES.forEach(function (entry) {
-        var hw = entry.headword.toLowerCase();
-        for (var w = 0; w < words.length; w++) {
-          if (words[w].length > 2 && (hw.includes(words[w]) || words[w].includes(hw))) {
-            matchedEntries.push({
-              headword: entry.headword,
-              part_of_speech: entry.part_of_speech,
-              definitions_english: entry.definitions_english,
-              examples: entry.examples ? entry.examples.slice(0, 2).map(function (ex) {
-                return { shipibo: ex.shipibo, english: ex.english };
-              }) : []
-            });
-            break;
+      var seen = {};
+      var addMatch = function (entry) {
+        if (seen[entry.id]) return;
+        seen[entry.id] = true;
+        matchedEntries.push({
+          headword: entry.headword,
+          part_of_speech: entry.part_of_speech,
+          definitions_english: entry.definitions_english,
+          examples: entry.examples ? entry.examples.slice(0, 2).map(function (ex) {
+            return { shipibo: ex.shipibo, english: ex.english };
+          }) : []
+        });
+      };
+      if (WORD_LINKS) {
+        // One lookup per word instead of testing every headword
+        words.forEach(function (word) {
+          if (word.length > 2) linkedEntries(word).forEach(addMatch);
+        });
+      } else {
+        ENTRIES.forEach(function (entry) {
+          var hw = entry.headword.toLowerCase();
+          for (var w = 0; w < words.length; w++) {
+            if (words[w].length > 2 && (hw.includes(words[w]) || words[w].includes(hw))) {
+              addMatch(entry);
+              break;
+            }
           }
-        }
-      });
+        });
+      }
       if (matchedEntries.length > 0) {
         context.entries = matchedEntries.slice(0, 10);
       }
@@ -1,4 +1,8 @@
 var CACHE_NAME = "onanti-v3";
+// Site data lives in its own cache, kept across deploys: content-hashed
+// files (data/v/, listed in data/versions.json) are downloaded again only
+// when their hash changes
+var DATA_CACHE = "onanti-data";
 var ASSETS = [
   "/",
   "/index.html",
@@ -24,7 +28,7 @@ self.addEventListener("activate", function (event) {
   event.waitUntil(
     caches.keys().then(function (names) {
       return Promise.all(
-        names.filter(function (name) { return name !== CACHE_NAME; })
+        names.filter(function (name) { return name !== CACHE_NAME && name !== DATA_CACHE; })
           .map(function (name) { return caches.delete(name); })
       );
     })
@@ -32,12 +36,61 @@ self.addEventListener("activate", function (event) {
   self.clients.claim();
 });
 
+// Drop cached data files that the current versions.json no longer lists
+function pruneDataCache(versions) {
+  var current = new Set(Object.keys(versions.files).map(function (name) {
+    return "/" + versions.files[name].path;
+  }));
+  return caches.open(DATA_CACHE).then(function (cache) {
+    return cache.keys().then(function (requests) {
+      return Promise.all(requests.filter(function (request) {
+        var path = new URL(request.url).pathname;
+        return path.indexOf("/data/v/") === 0 && !current.has(path);
+      }).map(function (request) { return cache.delete(request); }));
+    });
+  });
+}
+
 self.addEventListener("fetch", function (event) {
   // Don't cache API calls or OAuth callbacks
   if (event.request.url.includes("/api/") || event.request.url.includes("/auth/callback")) {
     return;
   }
 
+  // Site data: the manifest is network-first, hashed files cache-first
+  var url = new URL(event.request.url);
+  if (url.pathname === "/data/versions.json") {
+    event.respondWith(
+      fetch(event.request).then(function (response) {
+        if (response.ok) {
+          response.clone().json().then(pruneDataCache).catch(function () {});
+        }
+        return caches.open(DATA_CACHE).then(function (cache) {
+          cache.put(event.request, response.clone());
+          return response;
+        });
+      }).catch(function () {
+        return caches.match(event.request);
+      })
+    );
+    return;
+  }
+  if (url.pathname.indexOf("/data/v/") === 0) {
+    event.respondWith(
+      caches.match(event.request).then(function (cached) {
+        if (cached) return cached;
+        return fetch(event.request).then(function (response) {
+          if (!response.ok) return response;
+          return caches.open(DATA_CACHE).then(function (cache) {
+            cache.put(event.request, response.clone());
+            return response;
+          });
+        });
+      })
+    );
+    return;
+  }
+
   // For navigation requests, use network-first
   if (event.request.mode === "navigate") {
     event.respondWith(